@@ -1,9 +1,14 @@
 import unittest
 import os
+import numpy as np
 import pandas as pd
 from pingouin import welch_anova
 from scripts.dataset_loader import load_dataset
 from scripts.dataset_cleaner import clean_dataset
+from scripts.aggregate_cube import build_cube
+from scripts.streaming_stats import GroupAccumulator
+from scripts.Welchs_ANOVA_Test import (compute_welch_anova, compute_welch_anova_from_cube,
+                                       compute_welch_anova_from_statistics, welch_anova_from_summary)
 
 class TestWelchsANOVA(unittest.TestCase):
     def setUp(self):
@@ -44,6 +49,50 @@ class TestWelchsANOVA(unittest.TestCase):
         self.assertIn('mean', desc_stats.columns, "'mean' column missing in descriptive statistics.")
         self.assertIn('std', desc_stats.columns, "'std' column missing in descriptive statistics.")
 
+    def test_native_welch_matches_pingouin(self):
+        """Test if the native Welch's ANOVA reproduces pingouin's results."""
+        filtered_data = self.cleaned_data[['nkill', 'attacktype1_txt']].dropna()
+        expected = welch_anova(data=filtered_data, dv='nkill', between='attacktype1_txt')
+        # Newer pingouin releases name the p-value column p_unc
+        expected = expected.rename(columns={'p_unc': 'p-unc'})
+        desc_stats, welch_results = compute_welch_anova(self.cleaned_data)
+
+        self.assertListEqual(list(welch_results.columns), ['Source', 'ddof1', 'ddof2', 'F', 'p-unc', 'np2'])
+        self.assertEqual(welch_results['Source'][0], expected['Source'][0], "Source label differs from pingouin.")
+        self.assertEqual(welch_results['ddof1'][0], expected['ddof1'][0], "ddof1 differs from pingouin.")
+        for column in ['ddof2', 'F', 'p-unc', 'np2']:
+            np.testing.assert_allclose(welch_results[column], expected[column], rtol=1e-9, atol=1e-300,
+                                       err_msg=f"'{column}' differs from pingouin.")
+
+        expected_desc = filtered_data.groupby('attacktype1_txt')['nkill'].agg(['count', 'mean', 'std']).round(2)
+        pd.testing.assert_frame_equal(desc_stats, expected_desc, check_dtype=False)
+
+    def test_welch_from_sufficient_statistics(self):
+        """Test if the cube and streamed accumulators give the same results as the cleaned rows."""
+        desc_stats, welch_results = compute_welch_anova(self.cleaned_data)
+
+        cube_desc, cube_results = compute_welch_anova_from_cube(build_cube(self.cleaned_data))
+        pd.testing.assert_frame_equal(cube_desc, desc_stats, check_dtype=False)
+        pd.testing.assert_frame_equal(cube_results, welch_results, check_exact=False, rtol=1e-9)
+
+        # Accumulators folded in over two halves, as the streaming engine does
+        halves = np.array_split(np.arange(self.cleaned_data.shape[0]), 2)
+        accumulator = GroupAccumulator()
+        for half in halves:
+            rows = self.cleaned_data.iloc[half]
+            accumulator.merge(GroupAccumulator().update(rows['attacktype1_txt'], rows['nkill']))
+        stream_desc, stream_results = compute_welch_anova_from_statistics(accumulator.to_frame())
+        pd.testing.assert_frame_equal(stream_desc, desc_stats, check_dtype=False, check_index_type=False,
+                                      check_categorical=False)
+        pd.testing.assert_frame_equal(stream_results, welch_results, check_exact=False, rtol=1e-9)
+
+    def test_welch_rejects_degenerate_groups(self):
+        """Test if groups with fewer than two observations or zero variance are rejected."""
+        with self.assertRaises(ValueError):
+            welch_anova_from_summary([1, 5], [2.0, 3.0], [0.5, 1.0])
+        with self.assertRaises(ValueError):
+            welch_anova_from_summary([4, 5], [2.0, 3.0], [0.0, 1.0])
+
     def test_statistics_file_update(self):
         """Test if results are appended to the statistics.txt file."""
         # Path to the statistics.txt file
@@ -0,0 +1,88 @@
+import unittest
+import contextlib
+import importlib
+import io
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from scripts.dataset_loader import load_dataset
+from scripts.dataset_cleaner import clean_dataset
+from scripts.aggregate_cube import CUBE_DIMENSIONS, build_cube, load_cube, load_or_build_cube, rollup, save_cube
+
+class TestAggregateCube(unittest.TestCase):
+    def setUp(self):
+        # Load and clean the dataset
+        self.raw_data = load_dataset()
+        if self.raw_data is None:
+            self.fail("Dataset could not be loaded. Ensure the dataset file exists and the path is correct.")
+        self.cleaned_data = clean_dataset(self.raw_data)
+        self.cube = build_cube(self.cleaned_data)
+
+    def test_cube_grain(self):
+        """Test if the cube has one row per observed year, region and attack type cell."""
+        cells = self.cleaned_data.groupby(CUBE_DIMENSIONS).ngroups
+        self.assertEqual(self.cube.shape[0], cells, "Cube does not have one row per observed cell.")
+        self.assertEqual(self.cube['count'].sum(), self.cleaned_data.shape[0], "Cube counts do not add up to the row count.")
+
+    def test_rollup_matches_groupby(self):
+        """Test if rolling up to attack type reproduces the count, mean and std of the full data."""
+        rolled = rollup(self.cube, ['attacktype1_txt'])
+        expected = self.cleaned_data.groupby('attacktype1_txt')['nkill'].agg(['count', 'mean', 'std'])
+        np.testing.assert_array_equal(rolled['count'], expected['count'])
+        np.testing.assert_array_equal(rolled['nkill_mean'], expected['mean'])
+        np.testing.assert_allclose(rolled['nkill_std'], expected['std'], rtol=1e-12)
+
+    def test_rollup_to_several_dimensions(self):
+        """Test if rolling up to region and year reproduces success and fatality sums."""
+        rolled = rollup(self.cube, ['region_txt', 'iyear'])
+        expected = self.cleaned_data.groupby(['region_txt', 'iyear']).agg(
+            success_sum=('success', 'sum'),
+            nkill_sum=('nkill', 'sum')
+        )
+        np.testing.assert_array_equal(rolled['success_sum'], expected['success_sum'])
+        np.testing.assert_array_equal(rolled['nkill_sum'], expected['nkill_sum'])
+
+    def test_save_and_load(self):
+        """Test if the cube survives a round trip through Parquet."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cube_path = os.path.join(temp_dir, 'cube.parquet')
+            save_cube(self.cube, cube_path)
+            pd.testing.assert_frame_equal(load_cube(cube_path), self.cube)
+
+    def test_corrupt_sidecar_rebuilds_cube(self):
+        """Test if a corrupt sidecar is treated as stale, so the cube is rebuilt rather than failing."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cube_path = os.path.join(temp_dir, 'cube.parquet')
+            with contextlib.redirect_stdout(io.StringIO()):
+                load_or_build_cube(cube_path=cube_path)
+            with open(cube_path + '.json', 'w') as f:
+                f.write('{"sha256": ')
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                cube = load_or_build_cube(cube_path=cube_path)
+            self.assertIn("Aggregate cube built", output.getvalue())
+            pd.testing.assert_frame_equal(cube, self.cube)
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                load_or_build_cube(cube_path=cube_path)
+            self.assertIn("Aggregate cube loaded", output.getvalue())
+
+    def test_analyses_from_cube(self):
+        """Test if the analyses computed from the cube match those computed from the cleaned rows."""
+        attack = importlib.import_module('scripts.Attacktype_Frequency_And_Success')
+        pd.testing.assert_frame_equal(attack.compute_attacktype_success_from_cube(self.cube),
+                                      attack.compute_attacktype_success(self.cleaned_data), check_dtype=False)
+        region = importlib.import_module('scripts.No_Incidents_And_Success_Rate_By_Region')
+        pd.testing.assert_frame_equal(region.compute_region_success_from_cube(self.cube),
+                                      region.compute_region_success(self.cleaned_data), check_dtype=False)
+        model_fit = importlib.import_module('scripts.Terrorism_Fatalities_Over_Years_ModelFit')
+        from_cube = model_fit.compute_model_fit_from_cube(self.cube)
+        from_rows = model_fit.compute_model_fit(self.cleaned_data)
+        self.assertEqual(from_cube['a'], from_rows['a'], "Model parameter 'a' differs from the cube.")
+        self.assertEqual(from_cube['b'], from_rows['b'], "Model parameter 'b' differs from the cube.")
+        confidence = importlib.import_module('scripts.95_ConfidenceInterval_Fatalities_By_Attacktype')
+        pd.testing.assert_frame_equal(confidence.compute_confidence_intervals_from_cube(self.cube),
+                                      confidence.compute_confidence_intervals(self.cleaned_data),
+                                      check_dtype=False, rtol=1e-12)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import json
+import os
+import tempfile
+from unittest import mock
+import matplotlib.pyplot as plt
+import pandas as pd
+from scripts.dataset_cleaner import clean_dataset
+from benchmarks.synthetic_gtd import ATTACK_TYPES, COLUMNS, REGIONS, generate_csv
+from benchmarks.run_benchmarks import benchmark_size, compare_results, run_benchmarks
+
+class TestBenchmarks(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Generate one small dataset for the whole class
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.csv_path = os.path.join(cls.temp_dir.name, 'synthetic.csv')
+        generate_csv(cls.csv_path, 6000, seed=1, chunk_rows=2500)
+        cls.data = pd.read_csv(cls.csv_path, low_memory=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def test_gtd_layout(self):
+        """Test if the synthetic dataset has the full GTD column layout and unique eventids."""
+        self.assertEqual(self.data.shape, (6000, 135), "Synthetic dataset has the wrong shape.")
+        self.assertListEqual(list(self.data.columns), list(COLUMNS), "Columns are not in GTD order.")
+        self.assertTrue(self.data['eventid'].is_unique, "Eventids are not unique.")
+
+    def test_distributions(self):
+        """Test if categories, null rates and the fatality skew follow the real GTD."""
+        self.assertTrue(set(self.data['attacktype1_txt']) <= set(ATTACK_TYPES), "Unknown attack type generated.")
+        self.assertTrue(set(self.data['region_txt']) <= set(REGIONS), "Unknown region generated.")
+        self.assertNotIn(1993, set(self.data['iyear']), "1993 is missing from the real GTD.")
+        self.assertAlmostEqual(self.data['nkill'].isna().mean(), COLUMNS['nkill'][2], delta=0.015)
+        self.assertAlmostEqual(self.data['summary'].isna().mean(), COLUMNS['summary'][2], delta=0.03)
+        # Code and label columns are missing together
+        pd.testing.assert_series_equal(self.data['claimmode'].isna(), self.data['claimmode_txt'].isna(),
+                                       check_names=False)
+        nkill = self.data['nkill'].dropna()
+        self.assertGreater(nkill.std(), 2 * nkill.mean(), "Fatalities are not skewed.")
+        self.assertGreater((nkill == 0).mean(), 0.3, "Fatalities lack the real share of zeros.")
+
+    def test_reproducible(self):
+        """Test if a seed reproduces the same dataset."""
+        other_path = os.path.join(self.temp_dir.name, 'again.csv')
+        generate_csv(other_path, 6000, seed=1, chunk_rows=2500)
+        with open(self.csv_path, 'rb') as f, open(other_path, 'rb') as g:
+            self.assertEqual(f.read(), g.read(), "Same seed produced a different dataset.")
+
+    def test_cleaner_runs_on_synthetic_data(self):
+        """Test if the cleaner keeps the rows with fatalities and success recorded."""
+        cleaned_data = clean_dataset(self.data)
+        self.assertEqual(cleaned_data.shape[0], self.data['nkill'].notna().sum(), "Unexpected rows were dropped.")
+
+    def test_results_file(self):
+        """Test if a benchmark run records every step with the commit and compares with an earlier run."""
+        output = os.path.join(self.temp_dir.name, 'results.json')
+        run_benchmarks([2000], data_dir=self.temp_dir.name, output=output, stages=['model_fit', 'welch_anova'])
+        with open(output, 'r') as f:
+            report = json.load(f)
+        self.assertIn('commit', report, "Results do not record the commit.")
+        steps = [record['step'] for record in report['results']]
+        for step in ['load_dataset', 'clean_dataset', 'aggregate:welch_anova', 'render:plot_model_fit']:
+            self.assertIn(step, steps, f"Step '{step}' was not benchmarked.")
+        for record in report['results']:
+            self.assertGreaterEqual(record['seconds'], 0, "Negative timing recorded.")
+            self.assertGreater(record['peak_rss_mb'], 0, "Peak RSS was not recorded.")
+        comparison = compare_results(output, output)
+        self.assertTrue((comparison['time_ratio'] == 1).all(), "A run does not compare equal to itself.")
+
+    def test_render_steps_render(self):
+        """Test if every timed and traced run of a render step writes the figure instead of hitting the cache."""
+        written = []
+        savefig = plt.savefig
+
+        def record_savefig(figure_path, *args, **kwargs):
+            savefig(figure_path, *args, **kwargs)
+            written.append((os.path.basename(figure_path), os.path.getsize(figure_path)))
+
+        with mock.patch.object(plt, 'savefig', record_savefig):
+            records = benchmark_size(self.csv_path, 6000, repeat=2, stages=['model_fit'])
+        self.assertIn('render:plot_model_fit', [record['step'] for record in records])
+        # Two timed repetitions and one traced run of each of the model fit's two figures
+        self.assertEqual(len(written), 6, "A render step timed a cached figure.")
+        self.assertTrue(all(size > 0 for _, size in written), "A render step wrote an empty figure.")
+
+if __name__ == "__main__":
+    unittest.main()
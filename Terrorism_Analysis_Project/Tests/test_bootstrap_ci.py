@@ -0,0 +1,52 @@
+import unittest
+import numpy as np
+from scipy.stats import norm
+from scripts.dataset_loader import load_dataset
+from scripts.dataset_cleaner import clean_dataset
+from scripts.bootstrap_ci import bootstrap_confidence_intervals, bootstrap_means, value_histograms
+
+class TestBootstrapCI(unittest.TestCase):
+    def setUp(self):
+        # Load and clean the dataset
+        self.raw_data = load_dataset()
+        if self.raw_data is None:
+            self.fail("Dataset could not be loaded. Ensure the dataset file exists and the path is correct.")
+        self.cleaned_data = clean_dataset(self.raw_data)
+
+    def test_histograms_describe_groups(self):
+        """Test if the value histograms reproduce each attack type's count, mean and std."""
+        intervals = bootstrap_confidence_intervals(self.cleaned_data, n_resamples=100, workers=1)
+        expected = self.cleaned_data.groupby('attacktype1_txt')['nkill'].agg(['mean', 'count', 'std'])
+        self.assertListEqual(intervals['attacktype1_txt'].tolist(), expected.index.tolist(), "Attack types differ.")
+        np.testing.assert_array_equal(intervals['count'], expected['count'])
+        np.testing.assert_allclose(intervals['mean'], expected['mean'], rtol=1e-12)
+        np.testing.assert_allclose(intervals['std'], expected['std'], rtol=1e-9)
+
+    def test_resampled_means_distribution(self):
+        """Test if the multinomial resample means centre on the sample mean with the standard error as spread."""
+        values, counts = value_histograms(self.cleaned_data)['Armed Assault']
+        n = counts.sum()
+        mean = counts @ values / n
+        standard_error = np.sqrt(counts @ (values - mean) ** 2 / (n - 1) / n)
+        means = bootstrap_means(values, counts, n_resamples=4000, seed=1)
+        self.assertAlmostEqual(means.mean(), mean, delta=4 * standard_error / np.sqrt(4000))
+        self.assertAlmostEqual(means.std(), standard_error, delta=0.1 * standard_error)
+
+    def test_reproducible_across_workers(self):
+        """Test if a seed gives identical intervals in-process and across worker processes."""
+        in_process = bootstrap_confidence_intervals(self.cleaned_data, n_resamples=500, seed=7, workers=1)
+        in_pool = bootstrap_confidence_intervals(self.cleaned_data, n_resamples=500, seed=7, workers=2)
+        other_seed = bootstrap_confidence_intervals(self.cleaned_data, n_resamples=500, seed=8, workers=1)
+        np.testing.assert_array_equal(in_process[['ci_lower', 'ci_upper']], in_pool[['ci_lower', 'ci_upper']])
+        self.assertFalse(np.array_equal(in_process['ci_lower'], other_seed['ci_lower']), "Seed has no effect.")
+
+    def test_interval_brackets_mean(self):
+        """Test if every bootstrap interval contains the mean and is close in width to the normal interval."""
+        intervals = bootstrap_confidence_intervals(self.cleaned_data, n_resamples=2000, workers=1)
+        self.assertTrue((intervals['ci_lower'] < intervals['mean']).all(), "Lower bound above the mean.")
+        self.assertTrue((intervals['ci_upper'] > intervals['mean']).all(), "Upper bound below the mean.")
+        normal_width = 2 * norm.ppf(0.975) * intervals['std'] / np.sqrt(intervals['count'])
+        np.testing.assert_allclose(intervals['ci_upper'] - intervals['ci_lower'], normal_width, rtol=0.2)
+
+if __name__ == "__main__":
+    unittest.main()
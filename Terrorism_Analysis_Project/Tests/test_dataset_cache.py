@@ -0,0 +1,66 @@
+import unittest
+import os
+import tempfile
+from unittest import mock
+import pandas as pd
+import scripts.dataset_cache as cache
+from scripts.dataset_cache import load_cleaned_dataset
+
+class TestDatasetCache(unittest.TestCase):
+    def setUp(self):
+        # Write a small GTD-shaped CSV into a temporary directory
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.temp_dir.name, 'cache')
+        self.csv_path = os.path.join(self.temp_dir.name, 'gtd.csv')
+        self.raw_data = pd.DataFrame({
+            'eventid': [1, 2, 3, 4],
+            'iyear': [1970, 1970, 1971, 1972],
+            'region_txt': ['South Asia', None, 'Western Europe', 'South Asia'],
+            'attacktype1_txt': ['Bombing/Explosion', 'Armed Assault', None, 'Armed Assault'],
+            'success': [1, 0, 1, 1],
+            'nkill': [2.0, None, 0.0, 5.0],
+            'city': ['a', 'b', 'c', 'd'],
+        })
+        self.raw_data.to_csv(self.csv_path, index=False)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_cache_miss_writes_snapshot(self):
+        """Test if the first call cleans the CSV and writes a Parquet snapshot."""
+        data = load_cleaned_dataset(self.csv_path, cache_dir=self.cache_dir)
+        self.assertEqual(data.shape[0], 3, "Cleaned data has the wrong number of rows.")
+        snapshots = [name for name in os.listdir(self.cache_dir) if name.endswith('.parquet')]
+        self.assertEqual(len(snapshots), 1, "Snapshot was not written to the cache directory.")
+
+    def test_cache_hit_skips_loading(self):
+        """Test if a repeated call is served from the snapshot without parsing the CSV."""
+        first = load_cleaned_dataset(self.csv_path, cache_dir=self.cache_dir)
+        with mock.patch.object(cache, 'load_dataset', side_effect=AssertionError("CSV was parsed again")):
+            second = load_cleaned_dataset(self.csv_path, cache_dir=self.cache_dir)
+        pd.testing.assert_frame_equal(first, second, check_dtype=False)
+
+    def test_rebuild_when_source_changes(self):
+        """Test if the snapshot is rebuilt when the CSV content changes."""
+        load_cleaned_dataset(self.csv_path, cache_dir=self.cache_dir)
+        self.raw_data.iloc[:2].to_csv(self.csv_path, index=False)
+        data = load_cleaned_dataset(self.csv_path, cache_dir=self.cache_dir)
+        self.assertEqual(data.shape[0], 1, "Stale snapshot was returned after the CSV changed.")
+        snapshots = [name for name in os.listdir(self.cache_dir) if name.endswith('.parquet')]
+        self.assertEqual(len(snapshots), 1, "Superseded snapshot was not removed.")
+
+    def test_rebuild_when_cleaning_rules_change(self):
+        """Test if the snapshot is rebuilt when the cleaning rules change."""
+        load_cleaned_dataset(self.csv_path, cache_dir=self.cache_dir)
+        with mock.patch.object(cache, 'cleaning_rules_hash', return_value='f' * 64), \
+                mock.patch.object(cache, 'load_dataset', wraps=cache.load_dataset) as loader:
+            load_cleaned_dataset(self.csv_path, cache_dir=self.cache_dir)
+        loader.assert_called_once()
+
+    def test_missing_file(self):
+        """Test if a missing source file returns None."""
+        data = load_cleaned_dataset(os.path.join(self.temp_dir.name, 'missing.csv'), cache_dir=self.cache_dir)
+        self.assertIsNone(data, "Function did not return None for missing file.")
+
+if __name__ == "__main__":
+    unittest.main()
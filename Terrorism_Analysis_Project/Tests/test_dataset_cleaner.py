@@ -1,6 +1,6 @@
 import unittest
 import pandas as pd
-from scripts.dataset_loader import load_dataset
+from scripts.dataset_loader import load_dataset, GTD_SCHEMA
 from scripts.dataset_cleaner import clean_dataset
 
 class TestDatasetCleanerWithActualData(unittest.TestCase):
@@ -40,5 +40,52 @@ class TestDatasetCleanerWithActualData(unittest.TestCase):
         expected_columns = ['nkill', 'success', 'attacktype1_txt', 'iyear', 'region_txt', 'eventid']
         self.assertListEqual(list(cleaned_data.columns), expected_columns, "Irrelevant columns were not removed.")
 
+    def test_cleaning_schema_loaded_data(self):
+        """Test if schema-loaded data is cleaned without widening its compact dtypes."""
+        schema_data = load_dataset(schema=GTD_SCHEMA)
+        cleaned_data = clean_dataset(schema_data)
+        self.assertEqual(cleaned_data['success'].dtype, 'int8', "'success' was widened during cleaning.")
+        self.assertEqual(cleaned_data['iyear'].dtype, 'int16', "'iyear' was widened during cleaning.")
+        self.assertEqual(cleaned_data.shape[0], clean_dataset(self.raw_data).shape[0], "Schema-loaded data cleaned to a different row count.")
+        self.assertFalse(cleaned_data[['attacktype1_txt', 'region_txt']].isnull().any().any(), "Missing textual values were not handled.")
+
+    def test_cleaning_does_not_mutate_input(self):
+        """Test if cleaning leaves the input DataFrame unchanged."""
+        original = self.raw_data.copy()
+        clean_dataset(self.raw_data)
+        pd.testing.assert_frame_equal(self.raw_data, original)
+
+    def test_cleaning_compact_dtypes(self):
+        """Test if numeric columns are converted to compact integer dtypes."""
+        cleaned_data = clean_dataset(self.raw_data)
+        self.assertEqual(cleaned_data['success'].dtype, 'int8', "'success' is not int8.")
+        self.assertEqual(cleaned_data['iyear'].dtype, 'int16', "'iyear' is not int16.")
+        self.assertEqual(cleaned_data['nkill'].dtype, 'int32', "'nkill' is not int32.")
+        self.assertEqual(cleaned_data['eventid'].dtype, 'int64', "'eventid' is not int64.")
+
+    def test_cleaning_removes_duplicate_events(self):
+        """Test if duplicated incidents are removed on eventid."""
+        duplicated = pd.concat([self.raw_data, self.raw_data.iloc[:50]], ignore_index=True)
+        cleaned_data = clean_dataset(duplicated)
+        self.assertFalse(cleaned_data['eventid'].duplicated().any(), "Duplicate incidents were not removed.")
+        self.assertEqual(cleaned_data.shape[0], clean_dataset(self.raw_data).shape[0], "Duplicates changed the cleaned row count.")
+
+    def test_cleaning_report(self):
+        """Test if the cleaning report accounts for every dropped row."""
+        cleaned_data, report = clean_dataset(self.raw_data, return_report=True)
+        self.assertListEqual(list(report.columns), ['step', 'rows_before', 'rows_dropped', 'seconds'], "Report columns are wrong.")
+        self.assertEqual(report['rows_dropped'].sum(), self.raw_data.shape[0] - cleaned_data.shape[0], "Report does not account for every dropped row.")
+        self.assertTrue((report['seconds'] >= 0).all(), "Report contains negative step times.")
+
+    def test_cleaning_extra_columns(self):
+        """Test if extra columns are carried through unchanged for the kept rows, after the relevant columns."""
+        duplicated = pd.concat([self.raw_data, self.raw_data.iloc[:50]], ignore_index=True)
+        cleaned_data = clean_dataset(duplicated, extra_columns=['latitude', 'longitude'])
+        plain_data = clean_dataset(duplicated)
+        self.assertListEqual(list(cleaned_data.columns), list(plain_data.columns) + ['latitude', 'longitude'])
+        pd.testing.assert_frame_equal(cleaned_data[plain_data.columns], plain_data)
+        pd.testing.assert_frame_equal(cleaned_data[['latitude', 'longitude']],
+                                      duplicated.loc[cleaned_data.index, ['latitude', 'longitude']])
+
 if __name__ == "__main__":
     unittest.main()
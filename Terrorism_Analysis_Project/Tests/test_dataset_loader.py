@@ -1,5 +1,11 @@
 import unittest
-from scripts.dataset_loader import load_dataset
+import contextlib
+import io
+import os
+import tempfile
+import pandas as pd
+from scripts.dataset_cleaner import clean_dataset
+from scripts.dataset_loader import load_dataset, GTD_SCHEMA
 
 class TestDatasetLoader(unittest.TestCase):
     def test_load_success(self):
@@ -30,5 +36,40 @@ class TestDatasetLoader(unittest.TestCase):
             # Restore the original pd.read_csv after the test
             loader.pd.read_csv = original_read_csv
 
+    def test_schema_projection(self):
+        """Test if loading with a schema reads only the schema columns in their compact dtypes."""
+        data = load_dataset(schema=GTD_SCHEMA)
+        self.assertIsNotNone(data, "Dataset failed to load with a schema.")
+        self.assertListEqual(list(data.columns), list(GTD_SCHEMA), "Columns outside the schema were loaded.")
+        for column, dtype in GTD_SCHEMA.items():
+            self.assertEqual(data[column].dtype.name, pd.api.types.pandas_dtype(dtype).name, f"'{column}' was not parsed as {dtype}.")
+
+    def test_schema_with_blank_cells(self):
+        """Test if blank cells in the schema's integer columns load as missing and are cleaned as on the plain path."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            csv_path = os.path.join(temp_dir, 'gtd.csv')
+            with open(csv_path, 'w') as f:
+                f.write("eventid,iyear,region_txt,attacktype1_txt,success,nkill\n"
+                        "1,1990,South Asia,Armed Assault,1,2\n"
+                        "2,1991,South Asia,Armed Assault,,3\n"
+                        "3,,Western Europe,Hijacking,0,\n")
+            with contextlib.redirect_stdout(io.StringIO()):
+                typed = load_dataset(csv_path, schema=GTD_SCHEMA)
+                plain = load_dataset(csv_path)
+        self.assertIsNotNone(typed, "A blank integer cell failed the schema load.")
+        self.assertEqual(int(typed['success'].isna().sum()), 1)
+        cleaned = clean_dataset(typed, verbose=False)
+        self.assertEqual(cleaned['success'].dtype, 'int8')
+        self.assertEqual(cleaned['iyear'].dtype, 'int16')
+        pd.testing.assert_frame_equal(cleaned.astype(str), clean_dataset(plain, verbose=False).astype(str))
+
+    def test_report_memory(self):
+        """Test if peak memory is reported when requested."""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            data = load_dataset(schema=GTD_SCHEMA, report_memory=True)
+        self.assertIsNotNone(data, "Dataset failed to load with memory reporting.")
+        self.assertIn("Peak memory during load", output.getvalue(), "Peak memory was not reported.")
+
 if __name__ == "__main__":
     unittest.main()
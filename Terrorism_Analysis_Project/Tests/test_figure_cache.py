@@ -0,0 +1,98 @@
+import unittest
+import contextlib
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+import matplotlib
+import matplotlib.pyplot as plt
+import scripts.figure_cache as figure_cache
+from scripts.figure_cache import sidecar_path
+from scripts.pipeline import STAGES, load_stage, run_pipeline
+from scripts.dataset_loader import load_dataset
+from scripts.dataset_cleaner import clean_dataset
+
+class TestFigureCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Load and clean the dataset
+        with contextlib.redirect_stdout(io.StringIO()):
+            cls.cleaned_data = clean_dataset(load_dataset())
+        cls.stage = load_stage('attacktype_frequency')
+        cls.attack_stats = cls.stage.compute_attacktype_success(cls.cleaned_data)
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.figure_path = os.path.join(self.temp_dir.name, 'Attacktype_Frequency_And_Success.png')
+
+    def tearDown(self):
+        figure_cache.set_force(False)
+        self.temp_dir.cleanup()
+
+    def count_renders(self, *args, **kwargs):
+        """Call the attack type plot function and return how many figures it saved."""
+        with mock.patch.object(plt, 'savefig', wraps=plt.savefig) as savefig:
+            self.stage.plot_attacktype_success(*args, **kwargs)
+        return savefig.call_count
+
+    def test_identical_figure_is_skipped(self):
+        """Test if the first call renders the figure and its sidecar, and an identical second call skips rendering."""
+        self.assertEqual(self.count_renders(self.attack_stats, self.figure_path), 1)
+        with open(sidecar_path(self.figure_path), 'r') as f:
+            sidecar = json.load(f)
+        self.assertEqual(sidecar['matplotlib'], matplotlib.__version__)
+        modified = os.stat(self.figure_path).st_mtime_ns
+        self.assertEqual(self.count_renders(self.attack_stats.copy(), self.figure_path), 0, "An unchanged figure was re-rendered.")
+        self.assertEqual(os.stat(self.figure_path).st_mtime_ns, modified, "An unchanged figure was rewritten.")
+
+    def test_changes_trigger_render(self):
+        """Test if changed input tables or matplotlib style re-render the figure."""
+        self.count_renders(self.attack_stats, self.figure_path)
+        changed = self.attack_stats.assign(successful_incidents=self.attack_stats['successful_incidents'] - 1)
+        self.assertEqual(self.count_renders(changed, self.figure_path), 1, "Changed inputs did not re-render.")
+        with matplotlib.rc_context({'savefig.dpi': 50}):
+            self.assertEqual(self.count_renders(changed, self.figure_path), 1, "A changed style did not re-render.")
+
+    def test_modified_png_is_rerendered(self):
+        """Test if a PNG overwritten since its render is rendered again."""
+        self.count_renders(self.attack_stats, self.figure_path)
+        with open(self.figure_path, 'wb') as f:
+            f.write(b'not the cached figure')
+        self.assertEqual(self.count_renders(self.attack_stats, self.figure_path), 1)
+        os.remove(self.figure_path)
+        self.assertEqual(self.count_renders(self.attack_stats, self.figure_path), 1)
+
+    def test_force(self):
+        """Test if force=True, or forcing all figures, renders an unchanged figure again."""
+        self.count_renders(self.attack_stats, self.figure_path)
+        self.assertEqual(self.count_renders(self.attack_stats, self.figure_path, force=True), 1)
+        figure_cache.set_force(True)
+        self.assertEqual(self.count_renders(self.attack_stats, self.figure_path), 1)
+
+    def test_repeat_pipeline_run_skips_renders(self):
+        """Test if a repeat pipeline run on unchanged data renders no figures, unless forced."""
+        patches = []
+        for name in STAGES:
+            module = load_stage(name)
+            for attribute in ('FIGURE_PATH', 'RESIDUALS_FIGURE_PATH', 'STATISTICS_FILE'):
+                if hasattr(module, attribute):
+                    target = os.path.join(self.temp_dir.name, os.path.basename(getattr(module, attribute)))
+                    patches.append(mock.patch.object(module, attribute, target))
+        for p in patches:
+            p.start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                run_pipeline(data=self.cleaned_data)
+                with mock.patch.object(plt, 'savefig', wraps=plt.savefig) as savefig:
+                    run_pipeline(data=self.cleaned_data)
+                self.assertEqual(savefig.call_count, 0, "A repeat run re-rendered figures.")
+                with mock.patch.object(plt, 'savefig', wraps=plt.savefig) as savefig:
+                    run_pipeline(data=self.cleaned_data, force_render=True)
+                self.assertEqual(savefig.call_count, 5, "A forced run did not render every figure.")
+        finally:
+            for p in patches:
+                p.stop()
+
+if __name__ == '__main__':
+    unittest.main()
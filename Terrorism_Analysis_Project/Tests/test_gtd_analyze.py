@@ -0,0 +1,115 @@
+import unittest
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+from unittest import mock
+import pandas as pd
+from scripts.dataset_loader import GTD_SCHEMA, load_dataset, row_filter_mask
+from scripts.dataset_cleaner import clean_dataset
+from scripts.partition_store import update_partitions
+from scripts.pipeline import STAGES, load_stage
+from scripts.gtd_analyze import analyze, load_filtered_dataset, main, parse_years
+
+REGIONS = ['South Asia', 'Western Europe']
+ATTACKTYPES = ['Bombing/Explosion', 'Armed Assault']
+
+def normalised(frame):
+    """Order rows by eventid and compare text columns as plain strings, whatever dtype a loader produced."""
+    frame = frame.sort_values('eventid').reset_index(drop=True)
+    return frame.assign(region_txt=frame['region_txt'].astype(str),
+                        attacktype1_txt=frame['attacktype1_txt'].astype(str)).astype({'nkill': 'int64'})
+
+class TestGtdAnalyze(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Load and clean the dataset once; every filtered load is compared with filtering it afterwards
+        with contextlib.redirect_stdout(io.StringIO()):
+            cls.raw_data = load_dataset()
+            cls.cleaned_data = clean_dataset(cls.raw_data)
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def expected(self, years=None, regions=None, attacktypes=None):
+        return normalised(self.cleaned_data[row_filter_mask(self.cleaned_data, years, regions, attacktypes)])
+
+    def test_parse_years(self):
+        """Test if single years and ranges parse, and malformed or inverted ranges are rejected."""
+        self.assertEqual(parse_years('2001'), (2001, 2001))
+        self.assertEqual(parse_years('1990-2000'), (1990, 2000))
+        for text in ['199x', '2000-1990', '1990-']:
+            with self.assertRaises(argparse.ArgumentTypeError):
+                parse_years(text)
+
+    def test_loader_filters_chunks(self):
+        """Test if filtering while reading the CSV in chunks keeps exactly the matching rows."""
+        with contextlib.redirect_stdout(io.StringIO()):
+            filtered = load_dataset(years=(1990, 2000), regions=REGIONS, chunksize=3000)
+            typed = load_dataset(schema=GTD_SCHEMA, attacktypes=ATTACKTYPES, chunksize=3000)
+        expected = self.raw_data[row_filter_mask(self.raw_data, (1990, 2000), REGIONS)].reset_index(drop=True)
+        pd.testing.assert_frame_equal(filtered, expected, check_dtype=False)
+        self.assertTrue(typed['attacktype1_txt'].isin(ATTACKTYPES).all())
+        self.assertEqual(len(typed), self.raw_data['attacktype1_txt'].isin(ATTACKTYPES).sum())
+        self.assertDictEqual({column: str(dtype) for column, dtype in typed.dtypes.items()}, GTD_SCHEMA)
+
+    def test_csv_source_matches_filtering_after_cleaning(self):
+        """Test if the pushed-down CSV filters give the same cleaned rows as filtering the full cleaned dataset."""
+        filters = [((1990, 2000), None, None), (None, REGIONS, ATTACKTYPES), ((2005, 2005), ['South Asia'], None)]
+        for years, regions, attacktypes in filters:
+            with contextlib.redirect_stdout(io.StringIO()):
+                loaded = load_filtered_dataset(years, regions, attacktypes)
+            pd.testing.assert_frame_equal(normalised(loaded), self.expected(years, regions, attacktypes),
+                                          check_dtype=False)
+
+    def test_partition_source_reads_selected_years(self):
+        """Test if the partition source reads only the selected years' partitions and pushes the other filters down."""
+        store_dir = os.path.join(self.temp_dir.name, 'partitions')
+        with contextlib.redirect_stdout(io.StringIO()):
+            update_partitions(store_dir=store_dir)
+        with mock.patch('scripts.partition_store.pd.read_parquet', wraps=pd.read_parquet) as read_parquet:
+            loaded = load_filtered_dataset((1990, 1994), REGIONS, ['Bombing/Explosion'], source='partitions',
+                                           store_dir=store_dir)
+        self.assertEqual(read_parquet.call_count, 5, "Partitions outside the year range were read.")
+        self.assertIsNotNone(read_parquet.call_args.kwargs['filters'], "Filters were not pushed down to Parquet.")
+        pd.testing.assert_frame_equal(normalised(loaded), self.expected((1990, 1994), REGIONS, ['Bombing/Explosion']),
+                                      check_dtype=False)
+
+    def test_analyze_writes_to_output_dir(self):
+        """Test if a filtered query writes its outputs to its own directory and leaves the stage paths unchanged."""
+        defaults = {name: getattr(load_stage(name), 'FIGURE_PATH', None) for name in STAGES}
+        output_dir = os.path.join(self.temp_dir.name, 'south_asia')
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = analyze(['attacktype_frequency', 'welch_anova'], years=(1990, 2010), regions=['South Asia'],
+                              output_dir=output_dir)
+        self.assertListEqual(list(results), ['attacktype_frequency', 'welch_anova'])
+        self.assertEqual(results['attacktype_frequency']['total_incidents'].sum(),
+                         len(self.expected((1990, 2010), ['South Asia'])))
+        for file_name in ['Attacktype_Frequency_And_Success.png', 'statistics.txt']:
+            self.assertTrue(os.path.exists(os.path.join(output_dir, file_name)), f"{file_name} was not written.")
+        self.assertDictEqual(defaults, {name: getattr(load_stage(name), 'FIGURE_PATH', None) for name in STAGES},
+                             "Stage output paths were not restored.")
+
+    def test_untestable_stage_is_skipped(self):
+        """Test if a stage that cannot run on a tiny subset is skipped while the others still run."""
+        output_dir = os.path.join(self.temp_dir.name, 'tiny')
+        with contextlib.redirect_stdout(io.StringIO()) as output, \
+                mock.patch.object(load_stage('welch_anova'), 'welch_anova_from_summary',
+                                  side_effect=ValueError("too few observations")):
+            results = analyze(['region_success', 'welch_anova'], years=(2000, 2000), output_dir=output_dir)
+        self.assertListEqual(list(results), ['region_success'])
+        self.assertIn("Stage welch_anova skipped", output.getvalue())
+
+    def test_no_matches(self):
+        """Test if a query matching no incidents fails cleanly."""
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            status = main(['--region', 'Atlantis', '--output-dir', self.temp_dir.name])
+        self.assertEqual(status, 1)
+        self.assertIn("No incidents match the filters.", output.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
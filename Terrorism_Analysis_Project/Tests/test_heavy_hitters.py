@@ -0,0 +1,133 @@
+import unittest
+import contextlib
+import io
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from scripts.dataset_cleaner import clean_dataset
+from scripts.heavy_hitters import HeavyHitterSketch, SlicedHeavyHitters, stream_heavy_hitters
+
+class TestHeavyHitters(unittest.TestCase):
+    def setUp(self):
+        # Write a GTD-shaped CSV whose perpetrator groups follow a heavy-tailed (Zipf) distribution
+        rng = np.random.default_rng(0)
+        n = 5000
+        self.raw_data = pd.DataFrame({
+            'eventid': np.arange(n),
+            'iyear': rng.integers(1990, 1996, n),
+            'region_txt': rng.choice(['South Asia', 'Western Europe', 'Sub-Saharan Africa'], n),
+            'attacktype1_txt': rng.choice(['Bombing/Explosion', 'Armed Assault'], n),
+            'success': rng.integers(0, 2, n),
+            'nkill': np.where(rng.random(n) < 0.1, np.nan, rng.negative_binomial(0.3, 0.1, n)),
+            'gname': np.char.add('Group ', (rng.zipf(1.5, n) % 2000).astype(str)),
+            'targtype1_txt': rng.choice(['Military', 'Police', 'Business', 'Private Citizens & Property'], n),
+        })
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.temp_dir.name, 'gtd.csv')
+        self.raw_data.to_csv(self.csv_path, index=False)
+        cleaned = clean_dataset(pd.read_csv(self.csv_path, low_memory=False), verbose=False)
+        self.data = cleaned.join(self.raw_data[['gname', 'targtype1_txt']])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def exact(self, data, measure='incidents'):
+        weights = data['nkill'] if measure == 'nkill' else pd.Series(1, index=data.index)
+        return weights.groupby(data['gname']).sum()
+
+    def assert_bounds_hold(self, sketch, exact, capacity):
+        self.assertLessEqual(len(sketch.counts), capacity)
+        self.assertLessEqual(sketch.offset, sketch.total / (capacity + 1) + 1e-9)
+        self.assertAlmostEqual(sketch.total, exact.sum())
+        for item, weight in exact.items():
+            lower, upper = sketch.estimate(item)
+            self.assertLessEqual(lower, weight, f"The lower bound of {item} is too high.")
+            self.assertGreaterEqual(upper, weight, f"The upper bound of {item} is too low.")
+
+    def test_bounds_hold_over_chunks(self):
+        """Test if chunk-by-chunk updates keep every weight within its bounds and the error below total / (k + 1)."""
+        for measure in ('incidents', 'nkill'):
+            sketch = HeavyHitterSketch(capacity=20)
+            for start in range(0, len(self.data), 700):
+                chunk = self.data.iloc[start:start + 700]
+                sketch.update(chunk['gname'], None if measure == 'incidents' else chunk['nkill'])
+            self.assert_bounds_hold(sketch, self.exact(self.data, measure), 20)
+
+    def test_merge_in_any_order(self):
+        """Test if sketches of separate parts merged pairwise or all at once keep the bounds."""
+        parts = np.array_split(np.arange(len(self.data)), 5)
+        sketches = [HeavyHitterSketch(capacity=20).update(self.data['gname'].iloc[part]) for part in parts]
+        exact = self.exact(self.data)
+        pairwise = HeavyHitterSketch(capacity=20)
+        for sketch in reversed(sketches):
+            pairwise.merge(sketch)
+        self.assert_bounds_hold(pairwise, exact, 20)
+        self.assert_bounds_hold(HeavyHitterSketch.combine(sketches, capacity=20), exact, 20)
+
+    def test_top_items_are_guaranteed(self):
+        """Test if the guaranteed items of a sketched top table are the true heaviest items."""
+        sketch = HeavyHitterSketch(capacity=50).update(self.data['gname'])
+        top = sketch.top(5)
+        exact = self.exact(self.data).sort_values(ascending=False)
+        self.assertTrue(top['guaranteed'].iloc[:3].all(), "The heaviest groups of a Zipf stream are not guaranteed.")
+        for item in top.index[top['guaranteed']]:
+            self.assertGreaterEqual(exact[item], exact.iloc[5], f"{item} is not in the true top 5.")
+        self.assertEqual(top.attrs['max_error'], sketch.offset)
+
+    def test_exact_mode(self):
+        """Test if capacity=None counts every item exactly and guarantees the whole top table."""
+        sketch = HeavyHitterSketch(capacity=None).update(self.data['gname'], self.data['nkill'])
+        exact = self.exact(self.data, 'nkill')
+        exact = exact[exact > 0]
+        self.assertEqual(sketch.offset, 0)
+        pd.testing.assert_series_equal(sketch.counts.sort_index(), exact.astype('float64').sort_index(),
+                                       check_names=False, check_index_type=False)
+        top = sketch.top(3)
+        np.testing.assert_array_equal(top['lower'], top['upper'])
+        with self.assertRaises(ValueError):
+            HeavyHitterSketch(capacity=0)
+
+    def test_slices(self):
+        """Test if the top items of selected years and regions match a group-by of those incidents."""
+        exact = SlicedHeavyHitters('gname', 'nkill', capacity=None).update(self.data)
+        sketched = SlicedHeavyHitters('gname', 'nkill', capacity=10)
+        halves = np.array_split(np.arange(len(self.data)), 2)
+        sketched.update(self.data.iloc[halves[0]]).merge(SlicedHeavyHitters('gname', 'nkill', 10).update(
+            self.data.iloc[halves[1]]))
+        selected = self.data[self.data['iyear'].between(1991, 1993) & (self.data['region_txt'] == 'South Asia')]
+        weights = self.exact(selected, 'nkill')
+
+        top = exact.top(5, years=(1991, 1993), regions=['South Asia'])
+        expected = weights.sort_values(ascending=False, kind='stable').iloc[:5]
+        np.testing.assert_array_equal(top['lower'], expected.to_numpy(dtype='float64'))
+        self.assertEqual(top.index.name, 'gname')
+        self.assert_bounds_hold(sketched.sketch(years=(1991, 1993), regions=['South Asia']), weights, 10)
+        with self.assertRaises(ValueError):
+            SlicedHeavyHitters('gname', 'success')
+
+    def test_stream_from_csv(self):
+        """Test if one chunked pass over the CSV builds the sketches of every item column and measure."""
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = stream_heavy_hitters(self.csv_path, capacity=None, chunksize=900)
+        self.assertSetEqual(set(results), {('gname', 'incidents'), ('gname', 'nkill'),
+                                           ('targtype1_txt', 'incidents'), ('targtype1_txt', 'nkill')})
+        targets = results[('targtype1_txt', 'incidents')].top(10)
+        expected = self.data['targtype1_txt'].value_counts()
+        self.assertDictEqual(targets['lower'].to_dict(), expected.astype('float64').to_dict())
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            self.assertIsNone(stream_heavy_hitters(os.path.join(self.temp_dir.name, 'missing.csv')))
+        self.assertIn("File not found", output.getvalue())
+
+    def test_stream_deduplication_is_opt_in(self):
+        """Test if an incident repeated in a later chunk is only dropped from the sketches with deduplicate=True."""
+        repeated = self.raw_data[self.raw_data['eventid'] == self.data['eventid'].iloc[0]]
+        pd.concat([self.raw_data, repeated], ignore_index=True).to_csv(self.csv_path, index=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            streamed = stream_heavy_hitters(self.csv_path, capacity=None, chunksize=900)
+            deduplicated = stream_heavy_hitters(self.csv_path, capacity=None, chunksize=900, deduplicate=True)
+        self.assertEqual(streamed[('gname', 'incidents')].sketch().total, len(self.data) + 1)
+        self.assertEqual(deduplicated[('gname', 'incidents')].sketch().total, len(self.data))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import json
+import os
+import subprocess
+import sys
+from scripts.pipeline import STAGES
+
+# Project directory (holding scripts/) and the repository root the default dataset paths are relative to
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_DIR = os.path.dirname(PROJECT_DIR)
+
+# Cold-start budget of importing the pipeline, which only needs the standard library until a stage runs
+PIPELINE_IMPORT_BUDGET_SECONDS = 0.3
+
+HEAVY_MODULES = ['pandas', 'numpy', 'scipy', 'matplotlib', 'matplotlib.pyplot', 'pingouin']
+
+def run_fresh(code, *flags):
+    """Run code in a fresh interpreter and return the completed process."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([PROJECT_DIR, os.environ.get('PYTHONPATH', '')]))
+    env.pop('MPLBACKEND', None)
+    return subprocess.run([sys.executable, *flags, '-c', code], cwd=REPO_DIR, env=env,
+                          capture_output=True, text=True, check=True)
+
+def loaded_after(code):
+    """Return which heavy modules are loaded after running code in a fresh interpreter."""
+    check = f"import sys, json\n{code}\nprint(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    return json.loads(run_fresh(check).stdout.strip().splitlines()[-1])
+
+class TestImportTime(unittest.TestCase):
+    def test_pipeline_imports_no_scientific_stack(self):
+        """Test if importing the pipeline loads none of pandas, numpy, scipy or matplotlib."""
+        self.assertListEqual(loaded_after("import scripts.pipeline"), [])
+
+    def test_pipeline_import_budget(self):
+        """Test if the cold import of the pipeline stays within its time budget."""
+        stderr = run_fresh("import scripts.pipeline", '-X', 'importtime').stderr
+        # Lines read 'import time: self [us] | cumulative | module'; the top-level module is not indented
+        cumulative = [int(line.split('|')[1]) for line in stderr.splitlines()
+                      if line.startswith('import time:') and line.split('|')[2] == ' scripts.pipeline']
+        self.assertEqual(len(cumulative), 1, "The pipeline import was not timed.")
+        self.assertLess(cumulative[0] / 1e6, PIPELINE_IMPORT_BUDGET_SECONDS,
+                        "Importing the pipeline exceeded its cold-start budget.")
+
+    def test_stage_imports_defer_plotting_and_scipy(self):
+        """Test if importing any stage loads neither matplotlib nor scipy."""
+        for name in STAGES:
+            loaded = loaded_after(f"from scripts.pipeline import load_stage\nload_stage({name!r})")
+            self.assertNotIn('matplotlib', loaded, f"Importing stage '{name}' loaded matplotlib.")
+            self.assertNotIn('scipy', loaded, f"Importing stage '{name}' loaded scipy.")
+            self.assertNotIn('pingouin', loaded, f"Importing stage '{name}' loaded pingouin.")
+
+    def test_statistics_stage_never_loads_matplotlib(self):
+        """Test if computing Welch's ANOVA loads scipy but never matplotlib."""
+        loaded = loaded_after("from scripts.pipeline import load_stage\n"
+                              "from scripts.dataset_cache import load_cleaned_dataset\n"
+                              "load_stage('welch_anova').compute_welch_anova(load_cleaned_dataset(use_cache=False))")
+        self.assertIn('scipy', loaded)
+        self.assertNotIn('matplotlib', loaded)
+
+    def test_plotting_selects_agg(self):
+        """Test if the first figure selects the Agg backend."""
+        stdout = run_fresh("from scripts.figure_cache import pyplot\nprint(pyplot().get_backend())").stdout
+        self.assertEqual(stdout.strip().lower(), 'agg')
+
+if __name__ == '__main__':
+    unittest.main()
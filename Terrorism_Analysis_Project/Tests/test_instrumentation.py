@@ -0,0 +1,153 @@
+import unittest
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+from unittest import mock
+import scripts.instrumentation as instrumentation
+import scripts.pipeline as pipeline
+from scripts.pipeline import STAGES, load_stage
+import scripts.dataset_loader as dataset_loader
+from scripts.dataset_loader import GTD_SCHEMA, load_dataset
+from scripts.dataset_cleaner import clean_dataset
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        instrumentation.disable()
+        self.temp_dir.cleanup()
+
+    def test_disabled_records_nothing(self):
+        """Test if stages record nothing while instrumentation is off, and cost next to nothing."""
+        instrumentation.enable()
+        instrumentation.disable()
+        with instrumentation.stage('ignored', rows=10) as timing:
+            timing.rows = 20
+        self.assertEqual(instrumentation.records(), [], "A disabled stage was recorded.")
+
+        started = time.perf_counter()
+        for _ in range(100_000):
+            with instrumentation.stage('ignored'):
+                pass
+        # Generous bound: a disabled stage is one call and a shared no-op context manager
+        self.assertLess((time.perf_counter() - started) / 100_000, 5e-6, "Disabled stages are too slow.")
+
+    def test_nested_stages(self):
+        """Test if nested stages record their parent, depth and rows, and parents take their children's peaks."""
+        instrumentation.enable()
+        with instrumentation.stage('outer'):
+            with instrumentation.stage('inner', rows=5) as timing:
+                timing.rows = 7
+        records = {record['stage']: record for record in instrumentation.records()}
+        self.assertEqual(records['inner']['parent'], 'outer')
+        self.assertEqual(records['inner']['depth'], 1)
+        self.assertEqual(records['inner']['rows'], 7)
+        self.assertGreaterEqual(records['outer']['peak_rss_mb'], records['inner']['peak_rss_mb'])
+        self.assertGreaterEqual(records['outer']['wall_seconds'], records['inner']['wall_seconds'])
+        self.assertFalse(records['outer']['failed'])
+
+    def test_parent_peak_before_child_is_kept(self):
+        """Test if the peak a parent reached before a child stage reset the counter is still its peak."""
+        peaks = []
+        instrumentation.enable()
+        with mock.patch.object(instrumentation, 'peak_rss_mb', lambda: peaks[-1]), \
+                mock.patch.object(instrumentation, 'reset_peak_rss', lambda: peaks.append(100.0)):
+            with instrumentation.stage('outer'):
+                peaks.append(500.0)
+                with instrumentation.stage('inner'):
+                    pass
+        records = {record['stage']: record for record in instrumentation.records()}
+        self.assertEqual(records['inner']['peak_rss_mb'], 100.0)
+        self.assertEqual(records['outer']['peak_rss_mb'], 500.0, "The parent lost its peak before the child.")
+
+    def test_memory_report_keeps_parent_peak(self):
+        """Test if loading with report_memory=True inside a stage leaves the stage's earlier peak in place."""
+        peaks = []
+        instrumentation.enable()
+        reset = lambda: peaks.append(100.0)
+        with mock.patch.object(instrumentation, 'peak_rss_mb', lambda: peaks[-1]), \
+                mock.patch.object(instrumentation, 'reset_peak_rss', reset), \
+                mock.patch.object(dataset_loader, 'reset_peak_rss', reset, create=True), \
+                mock.patch.object(dataset_loader, 'peak_rss_mb', lambda: peaks[-1]), \
+                contextlib.redirect_stdout(io.StringIO()):
+            with instrumentation.stage('outer'):
+                peaks.append(500.0)
+                load_dataset(schema=GTD_SCHEMA, report_memory=True)
+        records = {record['stage']: record for record in instrumentation.records()}
+        self.assertEqual(records['outer']['peak_rss_mb'], 500.0, "Loading reset the peak of the enclosing stage.")
+
+    def test_failed_stage_is_recorded(self):
+        """Test if a stage that raises is still recorded, marked as failed, and the error propagates."""
+        instrumentation.enable()
+        with self.assertRaises(RuntimeError):
+            with instrumentation.stage('broken'):
+                raise RuntimeError("boom")
+        self.assertTrue(instrumentation.records()[0]['failed'])
+
+    def test_loader_cleaner_and_stage_records(self):
+        """Test if loading, cleaning and an analysis stage record their steps with row counts."""
+        module = load_stage('attacktype_frequency')
+        target = os.path.join(self.temp_dir.name, 'figure.png')
+        instrumentation.enable()
+        with mock.patch.object(module, 'FIGURE_PATH', target), contextlib.redirect_stdout(io.StringIO()):
+            raw_data = load_dataset()
+            data = clean_dataset(raw_data)
+            module.run(data)
+        records = {record['stage']: record for record in instrumentation.records()}
+        self.assertEqual(records['load_dataset']['rows'], len(raw_data))
+        self.assertEqual(records['clean_dataset']['rows'], len(raw_data))
+        self.assertEqual(records['attacktype_frequency.compute']['rows'], len(data))
+        self.assertIn('attacktype_frequency.plot_attacktype_success', records)
+
+    def test_summary_and_trace(self):
+        """Test if the summary lists the stages indented by depth and the trace holds stages and trace events."""
+        instrumentation.enable()
+        with instrumentation.stage('outer', rows=1234):
+            with instrumentation.stage('inner'):
+                pass
+        summary = instrumentation.format_summary()
+        self.assertIn('outer', summary)
+        self.assertIn('  inner', summary)
+        self.assertIn('1,234', summary)
+        self.assertListEqual(list(instrumentation.summary_table()['stage']), ['outer', '  inner'])
+
+        trace_path = os.path.join(self.temp_dir.name, 'trace.json')
+        instrumentation.write_trace(trace_path)
+        with open(trace_path, 'r') as f:
+            trace = json.load(f)
+        self.assertEqual(len(trace['stages']), 2)
+        self.assertEqual({event['name'] for event in trace['traceEvents']}, {'outer', 'inner'})
+        self.assertTrue(all(event['ph'] == 'X' for event in trace['traceEvents']))
+
+    def test_pipeline_trace_option(self):
+        """Test if the pipeline's --trace option writes a trace covering the whole run and its stages."""
+        patches = []
+        for name in STAGES:
+            module = load_stage(name)
+            for attribute in ('FIGURE_PATH', 'RESIDUALS_FIGURE_PATH', 'STATISTICS_FILE'):
+                if hasattr(module, attribute):
+                    target = os.path.join(self.temp_dir.name, os.path.basename(getattr(module, attribute)))
+                    patches.append(mock.patch.object(module, attribute, target))
+        trace_path = os.path.join(self.temp_dir.name, 'trace.json')
+        for p in patches:
+            p.start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                status = pipeline.main(['--stages', 'welch_anova', '--trace', trace_path])
+        finally:
+            for p in patches:
+                p.stop()
+        self.assertEqual(status, 0)
+        self.assertFalse(instrumentation.is_enabled(), "Instrumentation was left on after the run.")
+        with open(trace_path, 'r') as f:
+            stages = [record['stage'] for record in json.load(f)['stages']]
+        for name in ('pipeline', 'load_dataset', 'clean_dataset', 'welch_anova.compute'):
+            self.assertIn(name, stages)
+        self.assertIn('welch_anova.compute', output.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from scripts.dataset_cleaner import clean_dataset
+from scripts.aggregate_cube import build_cube, rollup
+from scripts.partition_store import (group_statistics, load_partitions, partition_path, update_partitions,
+                                     yearly_fatalities)
+
+class TestPartitionStore(unittest.TestCase):
+    def setUp(self):
+        # Write a GTD-shaped release covering 1970-1974
+        rng = np.random.default_rng(1)
+        n = 400
+        self.release = pd.DataFrame({
+            'eventid': np.arange(n) + 197000000000,
+            'iyear': np.repeat(np.arange(1970, 1975), n // 5),
+            'region_txt': rng.choice(['South Asia', 'Western Europe'], n),
+            'attacktype1_txt': rng.choice(['Bombing/Explosion', 'Armed Assault'], n),
+            'success': rng.integers(0, 2, n),
+            'nkill': rng.negative_binomial(0.3, 0.1, n).astype(float),
+        })
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store_dir = os.path.join(self.temp_dir.name, 'partitions')
+        self.csv_path = os.path.join(self.temp_dir.name, 'gtd.csv')
+        self.release.to_csv(self.csv_path, index=False)
+        update_partitions(self.csv_path, self.store_dir)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def new_release(self):
+        """Revise one 1973 incident, drop 1970 and add 1975."""
+        release = self.release[self.release['iyear'] != 1970].copy()
+        revised = release.index[release['iyear'] == 1973][0]
+        release.loc[revised, 'nkill'] += 5
+        added = self.release[self.release['iyear'] == 1974].copy()
+        added['iyear'] = 1975
+        added['eventid'] = added['eventid'] + 1000
+        release = pd.concat([release, added], ignore_index=True)
+        release.to_csv(self.csv_path, index=False)
+        return release
+
+    def test_initial_load_partitions_every_year(self):
+        """Test if the first update writes one partition per year holding all cleaned rows."""
+        for year in range(1970, 1975):
+            self.assertTrue(os.path.exists(partition_path(self.store_dir, year)), f"Partition for {year} is missing.")
+        self.assertEqual(load_partitions(self.store_dir).shape[0], self.release.shape[0], "Stored rows do not match the release.")
+
+    def test_update_rewrites_only_changed_years(self):
+        """Test if an update rewrites the changed, added and removed years and leaves the others alone."""
+        untouched = os.path.getmtime(partition_path(self.store_dir, 1971))
+        self.new_release()
+        report = update_partitions(self.csv_path, self.store_dir).set_index('iyear')
+        self.assertEqual(report.loc[1973, 'status'], 'changed', "Revised year was not rewritten.")
+        self.assertEqual(report.loc[1973, 'modified'], 1, "Revised incident was not detected by eventid.")
+        self.assertEqual(report.loc[1975, 'status'], 'added', "New year was not added.")
+        self.assertEqual(report.loc[1970, 'status'], 'removed', "Dropped year was not removed.")
+        self.assertEqual(report.loc[1971, 'status'], 'unchanged', "Unchanged year was rewritten.")
+        self.assertEqual(os.path.getmtime(partition_path(self.store_dir, 1971)), untouched, "Unchanged partition was rewritten.")
+        self.assertFalse(os.path.exists(partition_path(self.store_dir, 1970)), "Removed partition still exists.")
+
+    def test_incremental_aggregates_match_full_recompute(self):
+        """Test if the incrementally updated yearly sums and group statistics equal a full recompute."""
+        release = self.new_release()
+        update_partitions(self.csv_path, self.store_dir)
+        cleaned_data = clean_dataset(release)
+        expected_yearly = cleaned_data.groupby('iyear')['nkill'].sum()
+        np.testing.assert_array_equal(yearly_fatalities(self.store_dir).index, expected_yearly.index)
+        np.testing.assert_array_equal(yearly_fatalities(self.store_dir), expected_yearly)
+        expected_groups = rollup(build_cube(cleaned_data), ['attacktype1_txt'])
+        pd.testing.assert_frame_equal(group_statistics(['attacktype1_txt'], self.store_dir), expected_groups, check_dtype=False)
+
+    def test_load_selected_years(self):
+        """Test if loading selected years reads only those partitions."""
+        data = load_partitions(self.store_dir, years=[1971, 1972])
+        self.assertListEqual(sorted(data['iyear'].unique().tolist()), [1971, 1972], "Unselected years were loaded.")
+
+if __name__ == "__main__":
+    unittest.main()
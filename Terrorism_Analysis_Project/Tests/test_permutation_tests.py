@@ -0,0 +1,91 @@
+import unittest
+import numpy as np
+import pandas as pd
+from scipy.stats import binomtest
+import scripts.permutation_tests as permutation_tests
+from scripts.dataset_loader import load_dataset
+from scripts.dataset_cleaner import clean_dataset
+from scripts.permutation_tests import between_group_ss, clopper_pearson, permutation_test, run_permutation_tests
+
+class TestPermutationTests(unittest.TestCase):
+    def setUp(self):
+        # Load and clean the dataset
+        self.raw_data = load_dataset()
+        if self.raw_data is None:
+            self.fail("Dataset could not be loaded. Ensure the dataset file exists and the path is correct.")
+        self.cleaned_data = clean_dataset(self.raw_data)
+        # A small skewed sample with a strong and a null grouping
+        rng = np.random.default_rng(3)
+        self.values = rng.negative_binomial(0.3, 0.1, 1500).astype(float)
+        self.null_labels = rng.choice(['a', 'b', 'c'], 1500)
+        self.shifted_values = self.values + np.repeat([0, 0, 20], 500)
+        self.shifted_labels = np.repeat(['a', 'b', 'c'], 500)
+
+    def test_statistic_matches_groupby(self):
+        """Test if the bincount statistic equals the between-group sum of squares of a group-by."""
+        data = self.cleaned_data
+        codes, _ = pd.factorize(data['attacktype1_txt'], sort=True)
+        values = data['nkill'].to_numpy(dtype=float)
+        grouped = data.groupby('attacktype1_txt')['nkill'].agg(['count', 'mean'])
+        expected = (grouped['count'] * (grouped['mean'] - values.mean()) ** 2).sum()
+        sizes = np.bincount(codes).astype(float)
+        self.assertAlmostEqual(between_group_ss(codes, values, sizes)[0], expected, delta=1e-6 * expected)
+
+        # A batch of labellings gives one statistic per row
+        batch = np.stack([codes, codes[::-1]])
+        statistics = between_group_ss(batch, values, sizes)
+        self.assertEqual(statistics.shape, (2,), "Batch statistics have the wrong shape.")
+        self.assertAlmostEqual(statistics[1], between_group_ss(codes[::-1], values, sizes)[0], places=6)
+
+    def test_detects_and_rejects_effects(self):
+        """Test if a real group difference gets the smallest p-value and random labels do not."""
+        shifted = permutation_test(self.shifted_labels, self.shifted_values, n_permutations=2000, workers=1,
+                                   alpha=None)
+        self.assertEqual(shifted['p_value'], 1 / 2001, "Real group difference was not detected.")
+        null = permutation_test(self.null_labels, self.values, n_permutations=2000, workers=1, alpha=None)
+        self.assertGreater(null['p_value'], 0.01, "Random labels gave a significant difference.")
+        self.assertFalse(null['stopped_early'], "Test stopped early with early stopping disabled.")
+
+    def test_reproducible_across_workers(self):
+        """Test if a seed gives the same result in-process and across worker processes."""
+        in_process = permutation_test(self.null_labels, self.values, n_permutations=1000, seed=5, workers=1,
+                                      alpha=None)
+        in_pool = permutation_test(self.null_labels, self.values, n_permutations=1000, seed=5, workers=2,
+                                   alpha=None)
+        self.assertDictEqual(in_process, in_pool, "Result depends on the number of workers.")
+
+    def test_in_process_run_keeps_no_state(self):
+        """Test if an in-process test leaves no arrays behind in the module for a later test to read."""
+        permutation_test(self.shifted_labels, self.shifted_values, n_permutations=200, workers=1, alpha=None)
+        self.assertDictEqual(permutation_tests._worker_data, {}, "The in-process test left its arrays behind.")
+        null = permutation_test(self.null_labels, self.values, n_permutations=2000, workers=1, alpha=None)
+        self.assertGreater(null['p_value'], 0.01, "A later test read the arrays of an earlier one.")
+
+    def test_early_stopping(self):
+        """Test if the test stops once the p-value interval excludes alpha or is tight enough."""
+        decided = permutation_test(self.shifted_labels, self.shifted_values, n_permutations=10000, workers=1,
+                                   min_permutations=500)
+        self.assertTrue(decided['stopped_early'], "Clear result did not stop early.")
+        self.assertLess(decided['permutations'], 10000, "Clear result ran every permutation.")
+        self.assertLess(decided['p_upper'], 0.05, "Stopped before the interval excluded alpha.")
+        precise = permutation_test(self.null_labels, self.values, n_permutations=10000, workers=1, alpha=None,
+                                   tolerance=0.1, min_permutations=100)
+        self.assertTrue(precise['stopped_early'], "Tight interval did not stop early.")
+        self.assertLess(precise['p_upper'] - precise['p_lower'], 0.1, "Stopped before the interval was tight.")
+
+    def test_clopper_pearson(self):
+        """Test if the Clopper-Pearson interval matches scipy's exact binomial interval."""
+        for successes, trials in [(0, 50), (7, 50), (50, 50)]:
+            expected = binomtest(successes, trials).proportion_ci(confidence_level=0.99, method='exact')
+            lower, upper = clopper_pearson(successes, trials, 0.99)
+            self.assertAlmostEqual(lower, expected.low, places=10)
+            self.assertAlmostEqual(upper, expected.high, places=10)
+
+    def test_dataset_comparisons(self):
+        """Test if both dataset comparisons run and report a valid p-value."""
+        results = run_permutation_tests(self.cleaned_data, n_permutations=200, workers=1, alpha=None)
+        self.assertListEqual(results['test'].tolist(), ['attacktype_nkill', 'region_success'])
+        self.assertTrue(results['p_value'].between(0, 1).all(), "p-values are out of range.")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import unittest
+import os
+import tempfile
+from unittest import mock
+import pandas as pd
+import scripts.pipeline as pipeline
+from scripts.pipeline import STAGES, load_stage, run_pipeline
+from scripts.dataset_loader import load_dataset
+from scripts.dataset_cleaner import clean_dataset
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        # Load and clean the dataset
+        self.raw_data = load_dataset()
+        if self.raw_data is None:
+            self.fail("Dataset could not be loaded. Ensure the dataset file exists and the path is correct.")
+        self.cleaned_data = clean_dataset(self.raw_data)
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def redirect_outputs(self, module):
+        """Patch a stage module's output paths into the temporary directory."""
+        patches = []
+        for attribute in ('FIGURE_PATH', 'RESIDUALS_FIGURE_PATH', 'STATISTICS_FILE'):
+            if hasattr(module, attribute):
+                target = os.path.join(self.temp_dir.name, os.path.basename(getattr(module, attribute)))
+                patches.append(mock.patch.object(module, attribute, target))
+        return patches
+
+    def redirect_cube(self):
+        """Patch the persisted cube and the cleaned snapshot cache into the temporary directory."""
+        return [mock.patch('scripts.aggregate_cube.CUBE_PATH', os.path.join(self.temp_dir.name, 'cube.parquet')),
+                mock.patch('scripts.dataset_cache.CACHE_DIR', os.path.join(self.temp_dir.name, 'cache'))]
+
+    def test_stages_are_importable(self):
+        """Test if every registered stage imports without running and exposes run()."""
+        for name in STAGES:
+            self.assertTrue(callable(getattr(load_stage(name), 'run', None)), f"Stage '{name}' has no run function.")
+
+    def test_all_stages_write_outputs(self):
+        """Test if running every stage on the shared frame writes all figures and statistics."""
+        patches = [p for name in STAGES for p in self.redirect_outputs(load_stage(name))]
+        for p in patches:
+            p.start()
+        try:
+            results = run_pipeline(data=self.cleaned_data)
+        finally:
+            for p in patches:
+                p.stop()
+        self.assertListEqual(list(results), list(STAGES), "Not every stage was run.")
+        expected_files = ['95_ConfidenceInterval_Fatalities_By_Attacktype.png', 'Attacktype_Frequency_And_Success.png',
+                          'No_Incidents_And_Success_Rate_By_Region.png', 'Terrorism_Fatalities_Over_Years_ModelFit.png',
+                          'Boxplot_of_Residuals.png', 'statistics.txt']
+        for file_name in expected_files:
+            self.assertTrue(os.path.exists(os.path.join(self.temp_dir.name, file_name)), f"{file_name} was not written.")
+
+    def test_parallel_rendering_writes_figures(self):
+        """Test if parallel rendering writes the same figures from the aggregates alone."""
+        patches = [p for name in STAGES for p in self.redirect_outputs(load_stage(name))]
+        for p in patches:
+            p.start()
+        try:
+            results = run_pipeline(data=self.cleaned_data, parallel=True, workers=2)
+        finally:
+            for p in patches:
+                p.stop()
+        self.assertListEqual(list(results), list(STAGES), "Not every stage was run.")
+        for file_name in ['95_ConfidenceInterval_Fatalities_By_Attacktype.png', 'Attacktype_Frequency_And_Success.png',
+                          'No_Incidents_And_Success_Rate_By_Region.png', 'Terrorism_Fatalities_Over_Years_ModelFit.png',
+                          'Boxplot_of_Residuals.png']:
+            self.assertTrue(os.path.exists(os.path.join(self.temp_dir.name, file_name)), f"{file_name} was not rendered.")
+
+    def test_render_tasks_receive_aggregates(self):
+        """Test if render tasks carry only the small aggregate tables, never the cleaned frame."""
+        # run() still writes the statistics file and results store, so keep them in the temporary directory
+        patches = [p for name in STAGES for p in self.redirect_outputs(load_stage(name))]
+        for p in patches:
+            p.start()
+        try:
+            results = {name: load_stage(name).run(self.cleaned_data, render=False) for name in STAGES}
+        finally:
+            for p in patches:
+                p.stop()
+        for name in STAGES:
+            stage = load_stage(name)
+            for plot, args in stage.render_tasks(results[name]):
+                for argument in args:
+                    self.assertIsNot(argument, self.cleaned_data, f"Stage '{name}' passes the cleaned frame to a renderer.")
+                    if isinstance(argument, pd.DataFrame):
+                        self.assertLess(argument.shape[0], 100, f"Stage '{name}' passes a large table to a renderer.")
+
+    def test_cube_source_matches_frame(self):
+        """Test if running the stages from the aggregate cube gives the same tables as the cleaned rows."""
+        patches = [p for name in STAGES for p in self.redirect_outputs(load_stage(name))] + self.redirect_cube()
+        for p in patches:
+            p.start()
+        try:
+            from_cube = run_pipeline(['attacktype_frequency', 'region_success'], source='cube')
+            from_rows = run_pipeline(['attacktype_frequency', 'region_success'], data=self.cleaned_data)
+        finally:
+            for p in patches:
+                p.stop()
+        for name in from_rows:
+            pd.testing.assert_frame_equal(from_cube[name], from_rows[name], check_dtype=False)
+
+    def test_stage_options_run_on_rows(self):
+        """Test if stage options reach the stage's run function, which then runs on the cleaned rows."""
+        patches = self.redirect_outputs(load_stage('confidence_interval')) + self.redirect_cube()
+        for p in patches:
+            p.start()
+        try:
+            options = {'confidence_interval': {'method': 'bootstrap', 'n_resamples': 200, 'workers': 1}}
+            results = run_pipeline(['confidence_interval'], data=self.cleaned_data, source='cube', stage_options=options)
+        finally:
+            for p in patches:
+                p.stop()
+        grouped = results['confidence_interval']
+        self.assertIn('ci_lower', grouped.columns, "Bootstrap interval was not computed.")
+        self.assertTrue((grouped['ci_lower'] <= grouped['ci_upper']).all(), "Bootstrap bounds are inverted.")
+
+    def test_selected_stages_load_once(self):
+        """Test if only the selected stages run and the dataset is loaded and cleaned once."""
+        calls = []
+        with mock.patch('scripts.dataset_cache.load_cleaned_dataset', return_value=self.cleaned_data) as loader, \
+                mock.patch.object(load_stage('region_success'), 'run', side_effect=lambda data, render: calls.append('region_success')), \
+                mock.patch.object(load_stage('welch_anova'), 'run', side_effect=lambda data, render: calls.append('welch_anova')), \
+                mock.patch.object(load_stage('model_fit'), 'run', side_effect=lambda data, render: calls.append('model_fit')):
+            run_pipeline(['welch_anova', 'region_success'])
+        loader.assert_called_once()
+        self.assertListEqual(calls, ['welch_anova', 'region_success'], "Stages were not run as selected.")
+
+    @unittest.skipIf(int(pd.__version__.split('.')[0]) >= 3, "Copy-on-Write cannot be switched off from pandas 3.0.")
+    def test_copy_on_write_is_scoped(self):
+        """Test if Copy-on-Write is on while the stages run and the caller's setting is restored afterwards."""
+        seen = []
+        with pd.option_context('mode.copy_on_write', False), \
+                mock.patch.object(load_stage('region_success'), 'run',
+                                  side_effect=lambda data, render: seen.append(pd.get_option('mode.copy_on_write'))):
+            run_pipeline(['region_success'], data=self.cleaned_data)
+            self.assertFalse(pd.get_option('mode.copy_on_write'), "Copy-on-Write leaked out of the pipeline.")
+        self.assertListEqual(seen, [True], "Stages did not run with Copy-on-Write.")
+
+    def test_unknown_stage(self):
+        """Test if an unknown stage name is rejected."""
+        with self.assertRaises(ValueError):
+            run_pipeline(['not_a_stage'], data=self.cleaned_data)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+import unittest
+import contextlib
+import io
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from scripts.dataset_cleaner import clean_dataset
+from scripts.figure_cache import sidecar_path
+from scripts.partition_store import update_partitions
+from scripts.quantile_sketches import (KLLSketch, build_quantile_sketches, merge_quantile_sketches, quantile_summary,
+                                       render_boxplots, stream_quantile_sketches)
+
+QUANTILES = np.linspace(0.01, 0.99, 99)
+
+class TestQuantileSketches(unittest.TestCase):
+    def setUp(self):
+        # Write a GTD-shaped CSV with heavy-tailed fatalities over several years
+        rng = np.random.default_rng(0)
+        n = 6000
+        self.raw_data = pd.DataFrame({
+            'eventid': np.arange(n),
+            'iyear': rng.integers(1990, 1996, n),
+            'region_txt': rng.choice(['South Asia', 'Western Europe', 'Sub-Saharan Africa'], n),
+            'attacktype1_txt': rng.choice(['Bombing/Explosion', 'Armed Assault', 'Hijacking'], n),
+            'success': rng.integers(0, 2, n),
+            'nkill': np.where(rng.random(n) < 0.05, np.nan, rng.negative_binomial(0.3, 0.05, n)),
+        })
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.temp_dir.name, 'gtd.csv')
+        self.raw_data.to_csv(self.csv_path, index=False)
+        self.data = clean_dataset(pd.read_csv(self.csv_path, low_memory=False), verbose=False)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def assert_rank_error(self, sketch, values, quantiles=QUANTILES, error=0.02):
+        # Ties make a value cover a range of ranks; the requested rank must lie within error of that range
+        values = np.sort(values)
+        for q, estimate in zip(quantiles, sketch.quantile(quantiles)):
+            below = np.searchsorted(values, estimate, side='left') / values.size
+            at_most = np.searchsorted(values, estimate, side='right') / values.size
+            self.assertTrue(below - error <= q <= at_most + error, f"The {q:.2f} quantile {estimate} is off.")
+
+    def test_small_streams_are_exact(self):
+        """Test if a stream that fits in the top compactor gives exact (inverted CDF) quantiles."""
+        values = np.random.default_rng(1).integers(0, 50, 150)
+        sketch = KLLSketch(k=200).update(values)
+        np.testing.assert_array_equal(sketch.quantile(QUANTILES), np.quantile(values, QUANTILES, method='inverted_cdf'))
+        self.assertEqual(sketch.quantile(0), values.min())
+        self.assertEqual(sketch.quantile(1), values.max())
+        self.assertAlmostEqual(sketch.rank(np.median(values)), np.mean(values <= np.median(values)))
+
+    def test_rank_error_and_memory_are_bounded(self):
+        """Test if a long heavy-tailed stream keeps under 3k values and every quantile within the rank error."""
+        values = np.random.default_rng(2).lognormal(0, 2, 200_000)
+        sketch = KLLSketch(k=200)
+        for chunk in np.array_split(values, 37):
+            sketch.update(chunk)
+        self.assertLess(sketch.retained(), 3 * 200)
+        self.assertEqual(len(sketch), values.size)
+        self.assertEqual(sketch.min, values.min())
+        self.assertEqual(sketch.max, values.max())
+        self.assert_rank_error(sketch, values)
+        weights = sum(level.size * 2 ** height for height, level in enumerate(sketch.levels))
+        self.assertEqual(weights, values.size, "Compaction changed the total weight.")
+
+    def test_merge_in_any_order(self):
+        """Test if sketches of separate parts keep the rank error when merged in any order."""
+        values = np.random.default_rng(3).lognormal(0, 2, 60_000)
+        parts = [KLLSketch(k=200, seed=seed).update(part) for seed, part in enumerate(np.array_split(values, 6))]
+        for order in ([0, 1, 2, 3, 4, 5], [5, 3, 1, 0, 4, 2]):
+            merged = KLLSketch(k=200)
+            for index in order:
+                merged.merge(parts[index])
+            self.assertEqual(len(merged), values.size)
+            self.assertLess(merged.retained(), 3 * 200)
+            self.assert_rank_error(merged, values)
+
+    def test_grouped_sketches_match_data(self):
+        """Test if the per-group sketches built chunk by chunk have exact counts and accurate quantiles."""
+        chunks = [self.data.iloc[start:start + 1500] for start in range(0, len(self.data), 1500)]
+        sketches = build_quantile_sketches(chunks, k=100)
+        self.assertListEqual(sorted(sketches), ['attacktype1_txt', 'iyear', 'region_txt'])
+        for column, groups in sketches.items():
+            for group, values in self.data.groupby(column)['nkill']:
+                self.assertEqual(len(groups[group]), len(values))
+                self.assert_rank_error(groups[group], values.to_numpy(), error=0.04)
+
+        summary = quantile_summary(sketches['attacktype1_txt'])
+        self.assertListEqual(list(summary.columns), ['count', 'min', 'p25', 'median', 'p75', 'iqr', 'p99', 'max'])
+        np.testing.assert_array_equal(summary['iqr'], summary['p75'] - summary['p25'])
+        np.testing.assert_array_equal(summary['max'], self.data.groupby('attacktype1_txt')['nkill'].max())
+
+    def test_partitions_match_csv(self):
+        """Test if sketching the yearly partitions one at a time gives the same groups and counts as the CSV."""
+        store_dir = os.path.join(self.temp_dir.name, 'partitions')
+        with contextlib.redirect_stdout(io.StringIO()):
+            update_partitions(self.csv_path, store_dir)
+            from_csv = stream_quantile_sketches('csv', self.csv_path, chunksize=1000)
+            from_partitions = stream_quantile_sketches('partitions', store_dir=store_dir)
+        for column in from_csv:
+            self.assertListEqual(sorted(from_csv[column]), sorted(from_partitions[column]))
+            for group, sketch in from_partitions[column].items():
+                self.assertEqual(len(sketch), len(from_csv[column][group]))
+                values = self.data.loc[self.data[column] == group, 'nkill'].to_numpy()
+                self.assert_rank_error(sketch, values, error=0.03)
+        with self.assertRaises(ValueError):
+            stream_quantile_sketches('sql')
+
+    def test_csv_deduplication_is_opt_in(self):
+        """Test if an incident repeated in a later CSV chunk is only dropped from the sketches with deduplicate=True."""
+        repeated = self.raw_data[self.raw_data['eventid'] == self.data['eventid'].iloc[0]]
+        pd.concat([self.raw_data, repeated], ignore_index=True).to_csv(self.csv_path, index=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            streamed = stream_quantile_sketches('csv', self.csv_path, chunksize=1000)
+            deduplicated = stream_quantile_sketches('csv', self.csv_path, chunksize=1000, deduplicate=True)
+        self.assertEqual(sum(map(len, streamed['iyear'].values())), len(self.data) + 1)
+        self.assertEqual(sum(map(len, deduplicated['iyear'].values())), len(self.data))
+
+    def test_boxplots(self):
+        """Test if the boxplot statistics follow Tukey's rule and render once to a cached figure."""
+        values = np.random.default_rng(4).negative_binomial(0.5, 0.1, 120).astype(float)
+        stats = KLLSketch().update(values).boxplot_stats('values')
+        q1, q3 = np.quantile(values, [0.25, 0.75], method='inverted_cdf')
+        self.assertEqual((stats['q1'], stats['q3']), (q1, q3))
+        inside = values[(values >= q1 - 1.5 * (q3 - q1)) & (values <= q3 + 1.5 * (q3 - q1))]
+        self.assertEqual(stats['whishi'], inside.max())
+        np.testing.assert_array_equal(stats['fliers'], np.unique(values[values > inside.max()]))
+
+        figure_path = os.path.join(self.temp_dir.name, 'boxplots.png')
+        groups = build_quantile_sketches([self.data], ['attacktype1_txt'])['attacktype1_txt']
+        render_boxplots(groups, figure_path)
+        self.assertTrue(os.path.exists(figure_path) and os.path.exists(sidecar_path(figure_path)))
+        rendered = os.path.getmtime(figure_path)
+        render_boxplots(groups, figure_path)
+        self.assertEqual(os.path.getmtime(figure_path), rendered, "An unchanged figure was re-rendered.")
+
+    def test_invalid_arguments(self):
+        """Test if invalid sketch sizes and quantiles are rejected, and an empty sketch has no quantiles."""
+        with self.assertRaises(ValueError):
+            KLLSketch(k=1)
+        with self.assertRaises(ValueError):
+            KLLSketch().quantile(1.5)
+        self.assertTrue(np.isnan(KLLSketch().quantile(0.5)))
+        merged = merge_quantile_sketches({}, {'iyear': {1990: KLLSketch().update([1, 2, 3])}})
+        self.assertEqual(len(merged['iyear'][1990]), 3)
+
+if __name__ == '__main__':
+    unittest.main()
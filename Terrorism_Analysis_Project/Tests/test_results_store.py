@@ -0,0 +1,135 @@
+import unittest
+import contextlib
+import io
+import os
+import tempfile
+from unittest import mock
+import numpy as np
+import pandas as pd
+import scripts.Welchs_ANOVA_Test as welch
+import scripts.Terrorism_Fatalities_Over_Years_ModelFit as model_fit
+from scripts.results_store import get_or_compute, input_hash, store_path_for, write_statistics_view
+from scripts.dataset_loader import load_dataset
+from scripts.dataset_cleaner import clean_dataset
+
+class TestResultsStore(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Load and clean the dataset
+        with contextlib.redirect_stdout(io.StringIO()):
+            cls.cleaned_data = clean_dataset(load_dataset())
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.statistics_file = os.path.join(self.temp_dir.name, 'statistics.txt')
+        self.store_path = store_path_for(self.statistics_file)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def run_analyses(self, data):
+        """Run both statistics-writing analyses with their outputs in the temporary directory."""
+        patches = [mock.patch.object(welch, 'STATISTICS_FILE', self.statistics_file),
+                   mock.patch.object(model_fit, 'STATISTICS_FILE', self.statistics_file)]
+        for p in patches:
+            p.start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                welch.run(data)
+                model_fit.run(data, render=False)
+        finally:
+            for p in patches:
+                p.stop()
+        with open(self.statistics_file, 'r') as f:
+            return f.read()
+
+    def test_input_hash(self):
+        """Test if the key depends on the input values and parameters, but not on how they were computed."""
+        frame = pd.DataFrame({'count': [3, 4], 'mean': [1.0, 2.0]}, index=pd.Index(['a', 'b'], name='group'))
+        self.assertEqual(input_hash([frame]), input_hash([frame.copy()]))
+        self.assertNotEqual(input_hash([frame]), input_hash([frame.assign(mean=[1.0, 2.5])]))
+        self.assertNotEqual(input_hash([frame]), input_hash([frame], {'confidence': 0.99}))
+        self.assertEqual(input_hash([np.arange(3)]), input_hash([np.arange(3)]))
+        self.assertNotEqual(input_hash([np.arange(3)]), input_hash([np.arange(3).astype('float64')]))
+        # Arrays inside a dict are hashed in full, so a change the truncated repr would hide still changes the key
+        values = np.arange(10_000.0)
+        changed = values.copy()
+        changed[5_000] += 1
+        self.assertNotEqual(input_hash([{'residuals': values}]), input_hash([{'residuals': changed}]))
+        # The source of the modules a computation depends on is part of the key
+        self.assertNotEqual(input_hash([frame], compute=input_hash),
+                            input_hash([frame], compute=input_hash, depends=(np.mean,)))
+
+    def test_stored_result_is_reused(self):
+        """Test if an analysis with an existing key returns the stored result without recomputing."""
+        compute = mock.Mock(side_effect=lambda values, scale: {'total': values.sum() * scale})
+        compute.__module__ = __name__
+        inputs = (np.arange(5),)
+        with contextlib.redirect_stdout(io.StringIO()):
+            first = get_or_compute('total', inputs, compute, str, self.store_path, {'scale': 2})
+            second = get_or_compute('total', inputs, compute, str, self.store_path, {'scale': 2})
+            third = get_or_compute('total', inputs, compute, str, self.store_path, {'scale': 3})
+        self.assertEqual(compute.call_count, 2, "A stored result was recomputed.")
+        self.assertEqual(first, second)
+        self.assertEqual(third['total'], 30)
+
+    def test_statistics_view_is_idempotent(self):
+        """Test if rerunning the analyses leaves the statistics file unchanged instead of appending duplicates."""
+        first = self.run_analyses(self.cleaned_data)
+        second = self.run_analyses(self.cleaned_data)
+        self.assertEqual(first, second, "Rerunning the analyses changed the statistics file.")
+        self.assertEqual(first.count("--- Welch ANOVA Results ---"), 1)
+        self.assertEqual(first.count("--- Exponential Model Equation ---"), 1)
+
+    def test_changed_input_replaces_section(self):
+        """Test if new input aggregates replace an analysis' section, and switching back reuses the stored result."""
+        full = self.run_analyses(self.cleaned_data)
+        subset = self.run_analyses(self.cleaned_data[self.cleaned_data['iyear'] < 2010])
+        self.assertNotEqual(full, subset)
+        self.assertEqual(subset.count("--- Welch ANOVA Results ---"), 1)
+        with mock.patch.object(welch, 'compute_welch_anova_from_statistics',
+                               wraps=welch.compute_welch_anova_from_statistics) as compute:
+            # Keep the key of the real compute function, which includes the source of its module
+            compute.__module__ = welch.__name__
+            self.assertEqual(self.run_analyses(self.cleaned_data), full)
+        compute.assert_not_called()
+
+    def test_stored_results_match_direct_computation(self):
+        """Test if stored results equal the results computed directly from the dataset."""
+        self.run_analyses(self.cleaned_data)
+        with contextlib.redirect_stdout(io.StringIO()):
+            desc_stats, welch_results = welch.stored_welch_anova(welch.attacktype_statistics(self.cleaned_data),
+                                                                 self.statistics_file)
+            fit = model_fit.stored_model_fit(*model_fit.yearly_fatalities(self.cleaned_data), self.statistics_file)
+        expected_desc, expected_welch = welch.compute_welch_anova(self.cleaned_data)
+        pd.testing.assert_frame_equal(desc_stats, expected_desc)
+        pd.testing.assert_frame_equal(welch_results, expected_welch)
+        expected_fit = model_fit.compute_model_fit(self.cleaned_data)
+        self.assertAlmostEqual(fit['a'], expected_fit['a'])
+        np.testing.assert_allclose(fit['residuals'], expected_fit['residuals'])
+
+    def test_view_keeps_sections_the_store_does_not_own(self):
+        """Test if writing the view from a fresh store keeps the file's other sections and replaces only its own."""
+        committed = ("\n--- Descriptive Statistics of fatalities by Attack Type ---\nold table\n"
+                     "\n--- Welch ANOVA Results ---\nold results\n"
+                     "\n--- Exponential Model Equation ---\nkept fit\n\n")
+        with open(self.statistics_file, 'w') as f:
+            f.write(committed)
+        patch = mock.patch.object(welch, 'STATISTICS_FILE', self.statistics_file)
+        with patch, contextlib.redirect_stdout(io.StringIO()):
+            desc_stats, welch_results = welch.run(self.cleaned_data)
+        with open(self.statistics_file, 'r') as f:
+            view = f.read()
+        self.assertNotIn("old", view)
+        self.assertTrue(view.startswith(welch.format_welch_statistics((desc_stats, welch_results))))
+        self.assertTrue(view.endswith("\n--- Exponential Model Equation ---\nkept fit\n\n"))
+        self.assertEqual(view.count("--- Welch ANOVA Results ---"), 1)
+
+    def test_view_from_empty_store(self):
+        """Test if the view of an empty store is an empty statistics file."""
+        write_statistics_view(self.statistics_file)
+        with open(self.statistics_file, 'r') as f:
+            self.assertEqual(f.read(), "")
+
+if __name__ == '__main__':
+    unittest.main()
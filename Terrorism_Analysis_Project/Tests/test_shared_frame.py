@@ -0,0 +1,116 @@
+import unittest
+import contextlib
+import glob
+import io
+import mmap
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from scripts.dataset_loader import GTD_SCHEMA, load_dataset
+from scripts.dataset_cleaner import clean_dataset
+from scripts.permutation_tests import permutation_test
+import scripts.shared_frame as shared_frame
+
+def is_mapped(array):
+    """Returns True if the array is a view on a memory-mapped file."""
+    while array is not None and not isinstance(array, mmap.mmap):
+        array = getattr(array, 'base', None)
+    return array is not None
+
+def column_array(series):
+    return series.array.codes if isinstance(series.dtype, pd.CategoricalDtype) else series.to_numpy()
+
+def attached_summary(directory):
+    # Runs in a worker process: attaches the published frame and reports what it sees
+    frame = shared_frame.attach_frame(directory)
+    return (int(frame['nkill'].sum()), frame['region_txt'].value_counts().to_dict(),
+            all(is_mapped(column_array(frame[column])) for column in frame))
+
+class TestSharedFrame(unittest.TestCase):
+    def setUp(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.cleaned_data = clean_dataset(load_dataset()).reset_index(drop=True)
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_round_trip(self):
+        """Test if an attached frame holds the published values, with text columns as compact categoricals."""
+        with shared_frame.shared_frame(self.cleaned_data) as directory:
+            frame = shared_frame.attach_frame(directory)
+            self.assertListEqual(list(frame.columns), list(self.cleaned_data.columns))
+            for column in ('attacktype1_txt', 'region_txt'):
+                self.assertIsInstance(frame[column].dtype, pd.CategoricalDtype)
+                self.assertEqual(frame[column].array.codes.dtype, np.int8, "Text codes are not compact.")
+            restored = frame.astype({'attacktype1_txt': str, 'region_txt': str})
+            pd.testing.assert_frame_equal(restored, self.cleaned_data)
+
+            subset = shared_frame.attach_frame(directory, columns=['nkill', 'region_txt'])
+            self.assertListEqual(list(subset.columns), ['nkill', 'region_txt'])
+
+    def test_categorical_input(self):
+        """Test if categorical columns keep their categories, including unused ones and missing values."""
+        data = pd.DataFrame({'label': pd.Categorical(['b', None, 'a', 'b'], categories=['b', 'a', 'c'])})
+        with shared_frame.shared_frame(data) as directory:
+            frame = shared_frame.attach_frame(directory)
+        self.assertListEqual(list(frame['label'].cat.categories), ['b', 'a', 'c'])
+        self.assertListEqual(frame['label'].astype(object).where(frame['label'].notna(), None).tolist(),
+                             ['b', None, 'a', 'b'])
+
+    def test_schema_typed_frame(self):
+        """Test if a frame loaded with GTD_SCHEMA, whose nullable integer columns hold missing values, round-trips."""
+        with contextlib.redirect_stdout(io.StringIO()):
+            typed = load_dataset(schema=GTD_SCHEMA)
+        self.assertGreater(int(typed['nkill'].isna().sum()), 0, "The dataset has no missing fatalities to share.")
+        with shared_frame.shared_frame(typed) as directory:
+            frame = shared_frame.attach_frame(directory)
+            self.assertEqual(frame['nkill'].dtype, 'Int16')
+            pd.testing.assert_frame_equal(frame.astype({'attacktype1_txt': str, 'region_txt': str}),
+                                          typed.astype({'attacktype1_txt': str, 'region_txt': str}))
+        with self.assertRaises(ValueError):
+            shared_frame.publish_frame(pd.DataFrame({'sparse': pd.arrays.SparseArray([1.0, 0.0, 2.0])}),
+                                       os.path.join(self.temp_dir.name, 'sparse'))
+
+    def test_columns_are_read_only_views(self):
+        """Test if every attached column is a read-only view on the mapped files rather than a copy."""
+        with shared_frame.shared_frame(self.cleaned_data) as directory:
+            frame = shared_frame.attach_frame(directory)
+            for column in frame:
+                array = column_array(frame[column])
+                self.assertTrue(is_mapped(array), f"Column {column} was copied.")
+                self.assertFalse(array.flags.writeable, f"Column {column} is writeable.")
+            with self.assertRaises(ValueError):
+                frame['nkill'].to_numpy()[0] = 1
+
+    def test_workers_attach(self):
+        """Test if worker processes attach to the published frame and see the same data as views."""
+        expected = (int(self.cleaned_data['nkill'].sum()), self.cleaned_data['region_txt'].value_counts().to_dict())
+        with shared_frame.shared_frame(self.cleaned_data) as directory, ProcessPoolExecutor(max_workers=2) as pool:
+            summaries = list(pool.map(attached_summary, [directory] * 2))
+        for total, regions, mapped in summaries:
+            self.assertEqual((total, regions), expected)
+            self.assertTrue(mapped, "A worker received a copy instead of a mapped view.")
+
+    def test_release(self):
+        """Test if publishing to a given directory works and releasing removes it."""
+        directory = os.path.join(self.temp_dir.name, 'frame')
+        self.assertEqual(shared_frame.publish_frame(self.cleaned_data, directory), directory)
+        self.assertTrue(os.path.exists(os.path.join(directory, shared_frame.MANIFEST_NAME)))
+        shared_frame.release_frame(directory)
+        self.assertFalse(os.path.exists(directory))
+
+    def test_permutation_workers_share_one_copy(self):
+        """Test if a pooled permutation test gives the in-process result and removes the frame it published."""
+        pattern = os.path.join(shared_frame._base_dir(), 'gtd_frame_*')
+        before = set(glob.glob(pattern))
+        labels, values = self.cleaned_data['region_txt'], self.cleaned_data['success']
+        in_pool = permutation_test(labels, values, n_permutations=400, seed=3, workers=2, alpha=None)
+        in_process = permutation_test(labels, values, n_permutations=400, seed=3, workers=1, alpha=None)
+        self.assertDictEqual(in_pool, in_process)
+        self.assertSetEqual(set(glob.glob(pattern)), before, "The published frame was not released.")
+
+if __name__ == '__main__':
+    unittest.main()
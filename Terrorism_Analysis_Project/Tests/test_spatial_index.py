@@ -0,0 +1,101 @@
+import unittest
+import contextlib
+import io
+import time
+import numpy as np
+import pandas as pd
+from scripts.spatial_index import (GridIndex, haversine_km, hotspot_aggregates, load_spatial_dataset,
+                                   multi_resolution_hotspots, valid_coordinates)
+
+class TestSpatialIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with contextlib.redirect_stdout(io.StringIO()):
+            data = load_spatial_dataset()
+        if data is None:
+            raise unittest.SkipTest("Dataset could not be loaded.")
+        # Missing and corrupt coordinates, as found in the real GTD
+        data = data.reset_index(drop=True)
+        data.loc[:9, 'latitude'] = np.nan
+        data.loc[10:14, 'longitude'] = -86185896.0
+        cls.data = data
+        cls.index = GridIndex(data, cell_size=1.0)
+        cls.latitude = data['latitude'].to_numpy()
+        cls.longitude = data['longitude'].to_numpy()
+        cls.valid = valid_coordinates(data)
+
+    def brute_force_bbox(self, min_lat, max_lat, min_lon, max_lon):
+        if min_lon <= max_lon:
+            in_lon = (self.longitude >= min_lon) & (self.longitude <= max_lon)
+        else:
+            in_lon = (self.longitude >= min_lon) | (self.longitude <= max_lon)
+        return np.flatnonzero(self.valid & (self.latitude >= min_lat) & (self.latitude <= max_lat) & in_lon)
+
+    def test_invalid_coordinates_are_not_indexed(self):
+        """Test if missing and out-of-range coordinates are left out of the index."""
+        self.assertEqual(len(self.index), int(self.valid.sum()))
+        self.assertEqual(int((~self.valid).sum()), 15)
+        self.assertEqual(self.index.bbox(-90, 90, -180, 180).size, len(self.index))
+
+    def test_bbox_matches_scan(self):
+        """Test if bounding box queries, including boxes crossing the antimeridian, match a full scan."""
+        rng = np.random.default_rng(0)
+        for _ in range(200):
+            min_lat, max_lat = np.sort(rng.uniform(-90, 90, 2))
+            min_lon, max_lon = rng.uniform(-180, 180, 2)
+            np.testing.assert_array_equal(self.index.bbox(min_lat, max_lat, min_lon, max_lon),
+                                          self.brute_force_bbox(min_lat, max_lat, min_lon, max_lon))
+        self.assertEqual(self.index.bbox(10, 5, 0, 10).size, 0, "An empty box returned incidents.")
+
+    def test_radius_matches_scan(self):
+        """Test if radius queries, including circles around a pole or across the antimeridian, match a full scan."""
+        rng = np.random.default_rng(1)
+        centers = [(rng.uniform(-80, 80), rng.uniform(-180, 180), rng.uniform(1, 2000)) for _ in range(200)]
+        centers += [(88.0, 0.0, 1500.0), (-60.0, 179.5, 800.0), (0.0, -179.9, 300.0), (10.0, 20.0, 25000.0)]
+        for latitude, longitude, radius_km in centers:
+            distances = haversine_km(self.latitude, self.longitude, latitude, longitude)
+            np.testing.assert_array_equal(self.index.radius(latitude, longitude, radius_km),
+                                          np.flatnonzero(self.valid & (distances <= radius_km)))
+
+    def test_rows(self):
+        """Test if query positions select the matching rows of the indexed frame."""
+        rows = self.index.rows(self.index.bbox(0, 30, 60, 100))
+        self.assertTrue(((rows['latitude'] >= 0) & (rows['latitude'] <= 30)).all())
+        self.assertTrue(((rows['longitude'] >= 60) & (rows['longitude'] <= 100)).all())
+
+    def test_queries_are_faster_than_scans(self):
+        """Test if small queries take well under a millisecond on average, without scanning the frame."""
+        rng = np.random.default_rng(2)
+        corners = rng.uniform([-80, -170], [70, 160], size=(200, 2))
+        started = time.perf_counter()
+        for latitude, longitude in corners:
+            self.index.bbox(latitude, latitude + 5, longitude, longitude + 5)
+        # Generous bound: a query only reads the few cells overlapping its box
+        self.assertLess((time.perf_counter() - started) / len(corners), 2e-3, "Bounding box queries are too slow.")
+
+    def test_hotspots_match_groupby(self):
+        """Test if the hotspot aggregates at several resolutions match a group-by on the cells of the valid rows."""
+        valid_data = self.data[self.valid]
+        hotspots = multi_resolution_hotspots(self.data, resolutions=(5.0, 0.5))
+        self.assertListEqual(sorted(hotspots['cell_size'].unique()), [0.5, 5.0])
+        for cell_size, cells in hotspots.groupby('cell_size'):
+            expected = valid_data.assign(
+                min_lat=np.floor((valid_data['latitude'] + 90) / cell_size) * cell_size - 90,
+                min_lon=np.floor((valid_data['longitude'] + 180) / cell_size) * cell_size - 180,
+            ).groupby(['min_lat', 'min_lon']).agg(incidents=('eventid', 'size'), nkill_sum=('nkill', 'sum'),
+                                                  success_sum=('success', 'sum'))
+            actual = cells.set_index(['min_lat', 'min_lon'])[['incidents', 'nkill_sum', 'success_sum']].sort_index()
+            pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+            self.assertTrue(cells['incidents'].is_monotonic_decreasing, "Hotspots are not ordered by incidents.")
+            np.testing.assert_allclose(cells['success_rate'], cells['success_sum'] / cells['incidents'])
+
+    def test_hotspot_edges(self):
+        """Test if coordinates on the north pole and the antimeridian fall in the last grid row and column."""
+        edges = pd.DataFrame({'latitude': [90.0, -90.0], 'longitude': [180.0, -180.0], 'nkill': [2, 3],
+                              'success': [1, 0]})
+        hotspots = hotspot_aggregates(edges, cell_size=10.0).sort_values('min_lat').reset_index(drop=True)
+        self.assertListEqual(hotspots['min_lat'].tolist(), [-90.0, 80.0])
+        self.assertListEqual(hotspots['min_lon'].tolist(), [-180.0, 170.0])
+
+if __name__ == '__main__':
+    unittest.main()
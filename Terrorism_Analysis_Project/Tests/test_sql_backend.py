@@ -0,0 +1,112 @@
+import unittest
+import contextlib
+import importlib.util
+import io
+import os
+import tempfile
+import pandas as pd
+from unittest import mock
+from scripts.dataset_loader import load_dataset
+from scripts.dataset_cleaner import clean_dataset
+from scripts.aggregate_cube import build_cube
+from scripts.partition_store import update_partitions
+from scripts.pipeline import STAGES, load_stage, run_pipeline
+import scripts.sql_backend as sql_backend
+
+DUCKDB_INSTALLED = importlib.util.find_spec('duckdb') is not None
+
+@unittest.skipUnless(DUCKDB_INSTALLED, "DuckDB is not installed.")
+class TestSqlBackend(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.cleaned_data = clean_dataset(load_dataset())
+        self.cube = build_cube(self.cleaned_data)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_csv(self, text):
+        path = os.path.join(self.temp_dir.name, 'edge_cases.csv')
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def test_cube_from_csv_matches_pandas(self):
+        """Test if the cube computed by SQL over the CSV equals the pandas cube of the cleaned rows."""
+        pd.testing.assert_frame_equal(sql_backend.build_cube(), self.cube)
+
+    def test_cleaning_rules_match_pandas(self):
+        """Test if missing, unparseable, fractional and duplicate values are cleaned as clean_dataset does."""
+        path = self.write_csv(
+            "eventid,iyear,region_txt,attacktype1_txt,success,nkill,extra\n"
+            "1,2001,South Asia,Bombing/Explosion,1,2.7,a\n"
+            "2,2001,,Armed Assault,0,abc,b\n"
+            "3,2002,NA,Armed Assault,1,,c\n"
+            "1,2001,South Asia,Assassination,0,5,d\n"
+            "4,2002,Western Europe,,1,-1.5,e\n"
+            "5,x,Western Europe,Hijacking,N/A,3,f\n"
+            ",2003,Western Europe,Hijacking,1,4,g\n"
+            "6,2003,\"\",Hijacking,1,1e1,h\n"
+        )
+        expected = build_cube(clean_dataset(pd.read_csv(path, low_memory=False), verbose=False))
+        pd.testing.assert_frame_equal(sql_backend.build_cube(path), expected)
+
+    def test_cube_from_parquet_sources(self):
+        """Test if the cube computed from a cleaned Parquet snapshot or a partition store equals the pandas cube."""
+        snapshot_path = os.path.join(self.temp_dir.name, 'snapshot.parquet')
+        self.cleaned_data.to_parquet(snapshot_path)
+        pd.testing.assert_frame_equal(sql_backend.build_cube(snapshot_path), self.cube)
+
+        store_dir = os.path.join(self.temp_dir.name, 'partitions')
+        with contextlib.redirect_stdout(io.StringIO()):
+            update_partitions(store_dir=store_dir)
+        pd.testing.assert_frame_equal(sql_backend.build_cube(store_dir), self.cube)
+
+    def test_missing_source_or_duckdb(self):
+        """Test if a missing source, or DuckDB not being installed, is reported and returns None."""
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            self.assertIsNone(sql_backend.build_cube(os.path.join(self.temp_dir.name, 'missing.csv')))
+        self.assertIn('File not found', output.getvalue())
+        with mock.patch.dict('sys.modules', {'duckdb': None}), contextlib.redirect_stdout(io.StringIO()) as output:
+            self.assertIsNone(sql_backend.build_cube())
+        self.assertIn('DuckDB is not installed', output.getvalue())
+
+    def test_pipeline_backends_agree(self):
+        """Test if every stage gives identical results with the DuckDB backend and the pandas cube."""
+        patches = []
+        for name in STAGES:
+            module = load_stage(name)
+            for attribute in ('FIGURE_PATH', 'RESIDUALS_FIGURE_PATH', 'STATISTICS_FILE'):
+                if hasattr(module, attribute):
+                    target = os.path.join(self.temp_dir.name, os.path.basename(getattr(module, attribute)))
+                    patches.append(mock.patch.object(module, attribute, target))
+        for p in patches:
+            p.start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()), \
+                    mock.patch('scripts.aggregate_cube.load_or_build_cube', return_value=self.cube):
+                pandas_results = run_pipeline(source='cube')
+                duckdb_results = run_pipeline(backend='duckdb')
+        finally:
+            for p in patches:
+                p.stop()
+        for name in STAGES:
+            pandas_result, duckdb_result = pandas_results[name], duckdb_results[name]
+            if isinstance(pandas_result, pd.DataFrame):
+                pd.testing.assert_frame_equal(duckdb_result, pandas_result)
+            elif isinstance(pandas_result, tuple):
+                for duckdb_frame, pandas_frame in zip(duckdb_result, pandas_result):
+                    pd.testing.assert_frame_equal(duckdb_frame, pandas_frame)
+            else:
+                self.assertEqual(duckdb_result.keys(), pandas_result.keys())
+                for key in pandas_result:
+                    pd.testing.assert_series_equal(pd.Series(duckdb_result[key]), pd.Series(pandas_result[key]))
+
+    def test_unknown_backend(self):
+        """Test if an unknown backend is rejected."""
+        with self.assertRaises(ValueError):
+            run_pipeline(backend='spark')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from scripts.dataset_cleaner import clean_dataset
+from scripts.streaming_stats import GroupAccumulator, stream_grouped_statistics
+
+class TestStreamingStatistics(unittest.TestCase):
+    def setUp(self):
+        # Write a GTD-shaped CSV with missing values and a duplicated row
+        rng = np.random.default_rng(0)
+        n = 500
+        self.raw_data = pd.DataFrame({
+            'eventid': np.arange(n),
+            'iyear': rng.integers(1970, 1980, n),
+            'region_txt': rng.choice(['South Asia', 'Western Europe', None], n),
+            'attacktype1_txt': rng.choice(['Bombing/Explosion', 'Armed Assault', 'Hijacking'], n),
+            'success': rng.integers(0, 2, n),
+            'nkill': np.where(rng.random(n) < 0.1, np.nan, rng.negative_binomial(0.3, 0.1, n)),
+            'city': rng.choice(['a', 'b'], n),
+        })
+        self.raw_data = pd.concat([self.raw_data, self.raw_data.iloc[[10]]], ignore_index=True)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.temp_dir.name, 'gtd.csv')
+        self.raw_data.to_csv(self.csv_path, index=False)
+        self.cleaned_data = clean_dataset(pd.read_csv(self.csv_path, low_memory=False))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_attacktype_statistics_match(self):
+        """Test if streamed mean, count and std by attack type match the in-memory group-by."""
+        results = stream_grouped_statistics(self.csv_path, chunksize=37, deduplicate=True)
+        expected = self.cleaned_data.groupby('attacktype1_txt')['nkill'].agg(['mean', 'count', 'std'])
+        streamed = results['attacktype_nkill']
+        np.testing.assert_array_equal(streamed['count'], expected['count'])
+        np.testing.assert_array_equal(streamed['mean'], expected['mean'])
+        np.testing.assert_allclose(streamed['std'], expected['std'], rtol=1e-12)
+
+    def test_region_and_yearly_statistics_match(self):
+        """Test if streamed region success rates and yearly fatality sums match the in-memory group-by."""
+        results = stream_grouped_statistics(self.csv_path, chunksize=37, deduplicate=True)
+        region_data = self.cleaned_data.groupby('region_txt').agg(
+            incidents=('eventid', 'count'),
+            success_rate=('success', 'mean')
+        )
+        np.testing.assert_array_equal(results['region_success']['count'], region_data['incidents'])
+        np.testing.assert_array_equal(results['region_success']['mean'], region_data['success_rate'])
+        yearly_data = self.cleaned_data.groupby('iyear')['nkill'].sum()
+        np.testing.assert_array_equal(results['yearly_nkill']['sum'], yearly_data)
+
+    def test_accumulators_merge(self):
+        """Test if accumulators built over separate halves merge to the whole-data result."""
+        first, second = self.cleaned_data.iloc[:200], self.cleaned_data.iloc[200:]
+        merged = GroupAccumulator().update(first['iyear'], first['nkill'])
+        merged.merge(GroupAccumulator().update(second['iyear'], second['nkill']))
+        whole = GroupAccumulator().update(self.cleaned_data['iyear'], self.cleaned_data['nkill'])
+        np.testing.assert_allclose(merged.to_frame()['var'], whole.to_frame()['var'], rtol=1e-12)
+
+    def test_deduplication_across_chunks_is_opt_in(self):
+        """Test if an incident repeated in a later chunk is only dropped with deduplicate=True."""
+        # Repeat the first kept incident at the end of the file, far from its first chunk
+        repeated = self.raw_data[self.raw_data['eventid'] == self.cleaned_data['eventid'].iloc[0]].iloc[[0]]
+        pd.concat([self.raw_data, repeated], ignore_index=True).to_csv(self.csv_path, index=False)
+        streamed = stream_grouped_statistics(self.csv_path, chunksize=37)
+        self.assertEqual(streamed['yearly_nkill']['count'].sum(), len(self.cleaned_data) + 1)
+        deduplicated = stream_grouped_statistics(self.csv_path, chunksize=37, deduplicate=True)
+        self.assertEqual(deduplicated['yearly_nkill']['count'].sum(), len(self.cleaned_data))
+
+    def test_missing_file(self):
+        """Test if a missing file returns None."""
+        self.assertIsNone(stream_grouped_statistics(os.path.join(self.temp_dir.name, 'missing.csv')))
+
+if __name__ == "__main__":
+    unittest.main()
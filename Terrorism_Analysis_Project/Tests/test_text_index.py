@@ -0,0 +1,144 @@
+import unittest
+import contextlib
+import io
+import os
+import re
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from scripts.dataset_loader import DATASET_PATH, load_dataset
+from scripts.dataset_cleaner import clean_dataset
+from scripts.gtd_analyze import analyze, main
+from scripts.text_index import (TEXT_COLUMNS, TextIndex, build_index, decode_varints, encode_varints,
+                                load_or_build_index)
+
+class TestTextIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.index_dir = os.path.join(cls.temp_dir.name, 'text_index')
+        with contextlib.redirect_stdout(io.StringIO()):
+            raw_data = load_dataset()
+            if raw_data is None:
+                raise unittest.SkipTest("Dataset could not be loaded.")
+            cls.data = clean_dataset(raw_data, extra_columns=TEXT_COLUMNS)
+            cls.index = load_or_build_index(DATASET_PATH, cls.index_dir)
+        # Incidents written by hand to cover phrases, prefixes and words split by punctuation
+        cls.small = pd.DataFrame({
+            'eventid': [5, 3, 9, 7],
+            'summary': ['A car bomb exploded at the market.', 'Gunmen attacked the car before bomb squads came.',
+                        'Al-Qaida claimed the bombing.', np.nan],
+            'motive': ['Retaliation for arrests.', 'Unknown', 'retaliation', 'Car'],
+            'weapdetail': ['Car bomb', np.nan, 'Explosives', 'bomb'],
+        })
+        cls.small_index = build_index(cls.small, os.path.join(cls.temp_dir.name, 'small'))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def scan(self, pattern, columns=TEXT_COLUMNS):
+        # Sorted eventids of the incidents whose text matches a regular expression, by a full scan
+        regex = re.compile(pattern, re.IGNORECASE)
+        matches = np.zeros(len(self.data), dtype=bool)
+        for column in columns:
+            matches |= self.data[column].map(lambda text: isinstance(text, str) and bool(regex.search(text))).to_numpy()
+        return np.sort(self.data.loc[matches, 'eventid'].to_numpy())
+
+    def test_varints_round_trip(self):
+        """Test if LEB128 varints decode to the values encoded, across byte-length boundaries."""
+        values = np.array([0, 1, 127, 128, 255, 16383, 16384, 2 ** 32, 2 ** 53 + 7], dtype='int64')
+        encoded, lengths = encode_varints(values)
+        self.assertListEqual(lengths.tolist(), [1, 1, 1, 2, 2, 2, 3, 5, 8])
+        np.testing.assert_array_equal(decode_varints(encoded), values)
+        self.assertEqual(decode_varints(np.empty(0, dtype='uint8')).size, 0)
+
+    def test_queries_match_scan(self):
+        """Test if words, phrases, prefixes and boolean queries match a regular expression scan of the text."""
+        bomb = self.scan(r'\bbomb\b')
+        market = self.scan(r'\bmarket\b')
+        np.testing.assert_array_equal(self.index.search('bomb'), bomb)
+        np.testing.assert_array_equal(self.index.search('"bomb exploded"'), self.scan(r'\bbomb exploded\b'))
+        np.testing.assert_array_equal(self.index.search('kidnap*'), self.scan(r'\bkidnap\w*'))
+        np.testing.assert_array_equal(self.index.search('bomb AND market'), np.intersect1d(bomb, market))
+        np.testing.assert_array_equal(self.index.search('bomb market'), np.intersect1d(bomb, market))
+        np.testing.assert_array_equal(self.index.search('bomb OR market'), np.union1d(bomb, market))
+        np.testing.assert_array_equal(self.index.search('bomb AND NOT market'), np.setdiff1d(bomb, market))
+        np.testing.assert_array_equal(self.index.search('weapdetail:"ak 47"'),
+                                      self.scan(r'\bak\W47\b', ['weapdetail']))
+
+    def test_handcrafted_queries(self):
+        """Test field qualifiers, parentheses, punctuation and phrases that must not span two fields."""
+        search = self.small_index.search
+        self.assertListEqual(search('"car bomb"').tolist(), [5])
+        self.assertListEqual(search('car bomb').tolist(), [3, 5, 7])
+        self.assertListEqual(search('summary:"car bomb"').tolist(), [5])
+        self.assertListEqual(search('weapdetail:"car bomb"').tolist(), [5])
+        # 'Car' in the motive and 'bomb' in the weapon detail are not a phrase
+        self.assertListEqual(search('motive:car AND weapdetail:bomb').tolist(), [7])
+        self.assertListEqual(search('"car bomb" OR "bomb car"').tolist(), [5])
+        self.assertListEqual(search('al-qaida').tolist(), [9])
+        self.assertListEqual(search('"qaida claimed"').tolist(), [9])
+        self.assertListEqual(search('bomb*').tolist(), [3, 5, 7, 9])
+        self.assertListEqual(search('retaliation AND NOT (car OR explosives)').tolist(), [])
+        self.assertListEqual(search('NOT retaliation').tolist(), [3, 7])
+        self.assertListEqual(search('(bomb OR explosives) AND motive:retaliation').tolist(), [5, 9])
+        self.assertListEqual(search('RETALIATION').tolist(), search('retaliation').tolist())
+        self.assertEqual(search('zeppelin').size, 0)
+
+    def test_malformed_queries(self):
+        """Test if malformed queries raise a ValueError and fail cleanly on the command line."""
+        for query in ['', 'bomb AND', '(bomb OR car', 'bomb)', 'NOT', '"?!"']:
+            with self.assertRaises(ValueError, msg=f"{query!r} was accepted."):
+                self.small_index.search(query)
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()) as errors, \
+                self.assertRaises(SystemExit):
+            main(['--text', 'bomb AND', '--index-dir', self.index_dir, '--output-dir', self.temp_dir.name])
+        self.assertIn("Malformed text query", errors.getvalue())
+
+    def test_index_is_reused_and_rebuilt(self):
+        """Test if the index is reopened while the CSV is unchanged, and rebuilt when it changes or is corrupt."""
+        csv_path = os.path.join(self.temp_dir.name, 'gtd.csv')
+        index_dir = os.path.join(self.temp_dir.name, 'rebuilt')
+        pd.read_csv(DATASET_PATH, encoding='ISO-8859-1', nrows=200).to_csv(csv_path, index=False)
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            first = load_or_build_index(csv_path, index_dir)
+            load_or_build_index(csv_path, index_dir)
+        self.assertEqual(output.getvalue().count("Text index built"), 1, "An unchanged CSV was re-indexed.")
+
+        pd.read_csv(DATASET_PATH, encoding='ISO-8859-1', nrows=100).to_csv(csv_path, index=False)
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            second = load_or_build_index(csv_path, index_dir)
+        self.assertIn("Text index built", output.getvalue())
+        self.assertLess(len(second), len(first))
+        self.assertEqual(len(TextIndex(index_dir)), len(second))
+
+        # A corrupt manifest is treated as stale
+        with open(os.path.join(index_dir, 'manifest.json'), 'w') as f:
+            f.write('{"sha256": ')
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            third = load_or_build_index(csv_path, index_dir)
+        self.assertIn("Text index built", output.getvalue())
+        self.assertEqual(len(third), len(second))
+
+    def test_analyze_text_filter(self):
+        """Test if a text query narrows the analyses to the matching incidents."""
+        output_dir = os.path.join(self.temp_dir.name, 'bombings')
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = analyze(['attacktype_frequency'], text='"bomb exploded" AND market',
+                              index_dir=self.index_dir, output_dir=output_dir)
+        expected = np.intersect1d(self.scan(r'\bbomb exploded\b'), self.scan(r'\bmarket\b'))
+        self.assertEqual(results['attacktype_frequency']['total_incidents'].sum(), expected.size)
+
+    def test_queries_are_fast(self):
+        """Test if queries over the opened index take well under a second."""
+        queries = ['bomb', '"bomb exploded" AND market', 'kidnap* OR assail*', 'NOT (bomb OR police)',
+                   'weapdetail:"ak 47" AND NOT summary:journalist']
+        started = time.perf_counter()
+        for query in queries:
+            self.index.search(query)
+        self.assertLess((time.perf_counter() - started) / len(queries), 0.1, "Text queries are too slow.")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import contextlib
+import io
+import numpy as np
+import pandas as pd
+from scripts.time_series import incident_index, load_dated_dataset, window_statistics, window_sums
+
+class TestTimeSeries(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with contextlib.redirect_stdout(io.StringIO()):
+            cls.data = load_dated_dataset()
+        if cls.data is None:
+            raise unittest.SkipTest("Dataset could not be loaded.")
+        cls.monthly = incident_index(cls.data, freq='M')
+        cls.daily_by_region = incident_index(cls.data, freq='D', by='region_txt')
+
+    def test_monthly_index_is_dense(self):
+        """Test if the monthly index has every month between the first and last incident and matches a group-by."""
+        index = self.monthly.index
+        self.assertEqual(len(index), (index[-1] - index[0]).n + 1, "Months are missing from the index.")
+        known = self.data[self.data['imonth'].between(1, 12)]
+        self.assertEqual(self.monthly.attrs['undated'], len(self.data) - len(known))
+        expected = known.groupby([known['iyear'], known['imonth']]).agg(
+            incidents=('eventid', 'size'), nkill=('nkill', 'sum'), success=('success', 'sum'))
+        expected.index = pd.PeriodIndex([pd.Period(year=y, month=m, freq='M') for y, m in expected.index])
+        actual = self.monthly[self.monthly['incidents'] > 0]
+        np.testing.assert_array_equal(actual.to_numpy(), expected.to_numpy())
+        self.assertTrue(actual.index.equals(expected.index))
+
+    def test_unknown_and_invalid_dates(self):
+        """Test if unknown months and days, and days past the end of their month, are dropped or placed first."""
+        data = pd.DataFrame({
+            'iyear': [2000, 2000, 2000, 2001, 2000],
+            'imonth': [2, 2, 0, 3, 2],
+            'iday': [29, 30, 5, 0, 3],
+            'nkill': [1, 2, 4, 8, 16],
+            'success': [1, 1, 0, 1, 0],
+        })
+        daily = incident_index(data, freq='D')
+        self.assertEqual(daily.attrs['undated'], 3)
+        self.assertEqual(daily.index[0], pd.Period('2000-02-03', freq='D'))
+        self.assertEqual(daily.loc[pd.Period('2000-02-29', freq='D'), 'nkill'], 1)
+        self.assertEqual(daily['nkill'].sum(), 17)
+
+        placed = incident_index(data, freq='D', unknown='first')
+        self.assertEqual(placed.attrs['undated'], 0)
+        self.assertEqual(placed.loc[pd.Period('2000-01-01', freq='D'), 'nkill'], 4)
+        self.assertEqual(placed.loc[pd.Period('2000-02-01', freq='D'), 'nkill'], 2)
+        self.assertEqual(placed.loc[pd.Period('2001-03-01', freq='D'), 'nkill'], 8)
+
+        monthly = incident_index(data, freq='M')
+        self.assertEqual(monthly.attrs['undated'], 1)
+        self.assertEqual(monthly.loc[pd.Period('2000-02', freq='M'), 'incidents'], 3)
+        with self.assertRaises(ValueError):
+            incident_index(data, freq='W')
+        with self.assertRaises(ValueError):
+            incident_index(data, unknown='spread')
+
+    def test_per_group_index_adds_up(self):
+        """Test if the per-region daily index sums to the overall daily index."""
+        overall = incident_index(self.data, freq='D')
+        totals = self.daily_by_region.T.groupby(level='measure', sort=False).sum().T
+        pd.testing.assert_frame_equal(totals, overall, check_names=False)
+
+    def test_window_sums_match_pandas(self):
+        """Test if the cumulative-sum windows equal pandas rolling and expanding sums."""
+        for window in (1, 7, 30, 365, len(self.daily_by_region) + 5):
+            pd.testing.assert_frame_equal(window_sums(self.daily_by_region, window),
+                                          self.daily_by_region.rolling(window).sum())
+        pd.testing.assert_frame_equal(window_sums(self.daily_by_region, 30, min_periods=5),
+                                      self.daily_by_region.rolling(30, min_periods=5).sum())
+        pd.testing.assert_frame_equal(window_sums(self.monthly), self.monthly.expanding().sum().astype('float64'))
+        with self.assertRaises(ValueError):
+            window_sums(self.monthly, 0)
+
+    def test_window_statistics(self):
+        """Test if window means and rates follow from the window sums, per region too."""
+        statistics = window_statistics(self.monthly, window=12)
+        sums = self.monthly.rolling(12).sum()
+        np.testing.assert_allclose(statistics['incidents_mean'], sums['incidents'] / 12)
+        np.testing.assert_allclose(statistics['success_rate'], sums['success'] / sums['incidents'])
+        np.testing.assert_allclose(statistics['nkill_per_incident'], sums['nkill'] / sums['incidents'])
+
+        expanding = window_statistics(self.monthly)
+        self.assertAlmostEqual(expanding['incidents_mean'].iloc[-1], self.monthly['incidents'].mean())
+
+        by_region = window_statistics(self.daily_by_region, window=30)
+        self.assertListEqual(list(by_region.columns.get_level_values(0).unique()),
+                             ['incidents_sum', 'incidents_mean', 'nkill_sum', 'nkill_mean', 'success_sum',
+                              'success_mean', 'success_rate', 'nkill_per_incident'])
+        # A region without incidents in a window has no success rate rather than a division by zero
+        empty = by_region['incidents_sum'] == 0
+        self.assertTrue(by_region['success_rate'][empty].isna().all().all())
+
+if __name__ == '__main__':
+    unittest.main()
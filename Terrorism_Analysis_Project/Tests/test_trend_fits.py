@@ -0,0 +1,81 @@
+import unittest
+import importlib
+import numpy as np
+from scipy.stats import linregress
+from scripts.dataset_loader import load_dataset
+from scripts.dataset_cleaner import clean_dataset
+from scripts.aggregate_cube import build_cube
+from scripts.trend_fits import ALL_LABEL, fit_log_linear, fit_segment_trends
+
+class TestTrendFits(unittest.TestCase):
+    def setUp(self):
+        # Load and clean the dataset
+        self.raw_data = load_dataset()
+        if self.raw_data is None:
+            self.fail("Dataset could not be loaded. Ensure the dataset file exists and the path is correct.")
+        self.cleaned_data = clean_dataset(self.raw_data)
+        self.cube = build_cube(self.cleaned_data)
+        self.years = np.sort(self.cleaned_data['iyear'].unique())
+
+    def assert_matches_linregress(self, fit, years, log_y):
+        """Compare one batched fit with scipy's single regression on the same points."""
+        expected = linregress(years - 1970, log_y)
+        self.assertEqual(fit['n_years'], len(years), "Wrong number of years fitted.")
+        np.testing.assert_allclose(np.log(fit['a']), expected.intercept, rtol=1e-9)
+        np.testing.assert_allclose(fit['b'], expected.slope, rtol=1e-9, atol=1e-12)
+        np.testing.assert_allclose(fit['se_ln_a'], expected.intercept_stderr, rtol=1e-9)
+        np.testing.assert_allclose(fit['se_b'], expected.stderr, rtol=1e-9)
+        np.testing.assert_allclose(fit['r'], expected.rvalue, rtol=1e-9, atol=1e-12)
+        np.testing.assert_allclose(fit['p_value'], expected.pvalue, rtol=1e-6)
+
+    def test_segment_fits_match_single_regressions(self):
+        """Test if every region and every region x attack type fit equals a separate regression."""
+        trends = fit_segment_trends(self.cube)
+        self.assertEqual(trends.shape[0], 1 + self.cleaned_data['region_txt'].nunique()
+                         + self.cleaned_data['attacktype1_txt'].nunique()
+                         + self.cleaned_data.groupby(['region_txt', 'attacktype1_txt']).ngroups,
+                         "Not every segment was fitted.")
+        segments = trends[(trends['region_txt'] != ALL_LABEL)].head(20)
+        for _, fit in segments.iterrows():
+            rows = self.cleaned_data[self.cleaned_data['region_txt'] == fit['region_txt']]
+            if fit['attacktype1_txt'] != ALL_LABEL:
+                rows = rows[rows['attacktype1_txt'] == fit['attacktype1_txt']]
+            yearly = rows.groupby('iyear')['nkill'].sum()
+            yearly = yearly[yearly > 0]
+            self.assert_matches_linregress(fit, yearly.index.to_numpy(), np.log(yearly.to_numpy()))
+
+    def test_global_fit_matches_model_fit(self):
+        """Test if the global segment equals the exponential model of the model fit script."""
+        model_fit = importlib.import_module('scripts.Terrorism_Fatalities_Over_Years_ModelFit')
+        fit = model_fit.compute_model_fit(self.cleaned_data)
+        trends = fit_segment_trends(self.cube, segmentations=[[]])
+        self.assertAlmostEqual(trends.loc[0, 'a'], fit['a'], places=6)
+        self.assertAlmostEqual(trends.loc[0, 'b'], fit['b'], places=12)
+        self.assertAlmostEqual(trends.loc[0, 'r'], fit['correlation_coefficient'], places=12)
+
+    def test_zero_handling(self):
+        """Test if zero years are dropped or offset instead of breaking the fit."""
+        years = np.arange(1970, 1980)
+        y = np.array([3, 0, 5, 8, 0, 13, 21, 34, 0, 89], dtype=float)
+        dropped = fit_log_linear(years, y).iloc[0]
+        self.assert_matches_linregress(dropped, years[y > 0], np.log(y[y > 0]))
+        offset = fit_log_linear(years, y, zero_handling='offset').iloc[0]
+        self.assert_matches_linregress(offset, years, np.log1p(y))
+        with self.assertRaises(ValueError):
+            fit_log_linear(years, y, zero_handling='ignore')
+
+    def test_model_fit_with_zero_year(self):
+        """Test if the global model fit stays finite when a year has no fatalities."""
+        model_fit = importlib.import_module('scripts.Terrorism_Fatalities_Over_Years_ModelFit')
+        fit = model_fit.fit_exponential_model(np.arange(1970, 1976), np.array([10, 0, 14, 17, 20, 26]))
+        self.assertTrue(np.isfinite(fit['a']) and np.isfinite(fit['b']), "Zero year broke the model fit.")
+        self.assertTrue(np.isfinite(fit['residuals']).all(), "Residuals are not finite.")
+
+    def test_too_few_years(self):
+        """Test if segments with fewer than three usable years get NaN parameters."""
+        fits = fit_log_linear(np.arange(1970, 1975), np.array([[0, 4, 0, 9, 0], [1, 2, 4, 8, 16]]))
+        self.assertTrue(fits.loc[0, ['a', 'b', 'se_b', 'r']].isna().all(), "Unfittable segment has parameters.")
+        np.testing.assert_allclose(fits.loc[1, 'b'], np.log(2), rtol=1e-12)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,202 @@
+import argparse
+import contextlib
+import datetime
+import functools
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Make the scripts and benchmarks packages importable when run as a script
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+import pandas as pd
+
+from scripts.dataset_loader import GTD_SCHEMA, load_dataset
+from scripts.instrumentation import peak_rss_mb, reset_peak_rss
+from scripts.dataset_cleaner import clean_dataset
+from scripts.aggregate_cube import build_cube
+from scripts.pipeline import STAGES, load_stage
+from benchmarks.synthetic_gtd import generate_csv
+
+# Generated datasets (reused between runs) and benchmark results
+DATA_DIR = os.path.join(PROJECT_DIR, 'benchmarks', 'data')
+RESULTS_DIR = os.path.join(PROJECT_DIR, 'benchmarks', 'results')
+DEFAULT_SIZES = [100_000]
+
+# Aggregation timed for each pipeline stage: stage name -> compute function of its module
+AGGREGATIONS = {
+    'confidence_interval': 'compute_confidence_intervals',
+    'attacktype_frequency': 'compute_attacktype_success',
+    'region_success': 'compute_region_success',
+    'model_fit': 'compute_model_fit',
+    'welch_anova': 'compute_welch_anova',
+}
+
+def measure(step, rows, func, *args, repeat=1):
+    """
+    Runs func(*args) `repeat` times for timing, then once more under tracemalloc for memory.
+
+    Returns the result and a record with the best wall and CPU seconds, the peak traced allocation
+    and the process peak RSS of the step. Output printed by func is suppressed.
+    """
+    wall_times, cpu_times = [], []
+    for _ in range(repeat):
+        started_wall, started_cpu = time.perf_counter(), time.process_time()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = func(*args)
+        wall_times.append(time.perf_counter() - started_wall)
+        cpu_times.append(time.process_time() - started_cpu)
+
+    reset_peak_rss()
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = func(*args)
+        _, traced_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, {
+        'step': step,
+        'rows': rows,
+        'seconds': min(wall_times),
+        'cpu_seconds': min(cpu_times),
+        'peak_traced_mb': traced_peak / (1024 * 1024),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+def dataset_for(rows, seed=0, data_dir=DATA_DIR):
+    """
+    Returns the path of the synthetic dataset of the given size, generating it on first use.
+    """
+    file_path = os.path.join(data_dir, f'synthetic_gtd_{rows}_seed{seed}.csv')
+    if not os.path.exists(file_path):
+        print(f"Generating synthetic dataset with {rows} rows.")
+        generate_csv(file_path, rows, seed)
+    return file_path
+
+def benchmark_size(file_path, rows, repeat=1, stages=None):
+    """
+    Times and memory-profiles loading, cleaning, and the aggregation and figure renders of every stage
+    (or the given stages) on one dataset.
+    """
+    records = []
+    raw_data, record = measure('load_dataset', rows, load_dataset, file_path, repeat=repeat)
+    records.append(record)
+    _, record = measure('load_dataset_schema', rows, load_dataset, file_path, GTD_SCHEMA, repeat=repeat)
+    records.append(record)
+    data, record = measure('clean_dataset', rows, clean_dataset, raw_data, repeat=repeat)
+    records.append(record)
+    del raw_data
+
+    _, record = measure('build_cube', rows, build_cube, data, repeat=repeat)
+    records.append(record)
+    with tempfile.TemporaryDirectory() as figure_dir:
+        for name in stages or STAGES:
+            stage = load_stage(name)
+            result, record = measure(f'aggregate:{name}', rows, getattr(stage, AGGREGATIONS[name]), data, repeat=repeat)
+            records.append(record)
+            for plot, args in stage.render_tasks(result):
+                # The last argument of every render task is its output path. force=True renders every
+                # repetition, rather than timing the figure cache's hit after the first one
+                figure_path = os.path.join(figure_dir, os.path.basename(args[-1]))
+                _, record = measure(f'render:{plot.__name__}', rows, functools.partial(plot, force=True),
+                                    *args[:-1], figure_path, repeat=repeat)
+                records.append(record)
+    return records
+
+def git_commit():
+    """
+    Returns the commit the benchmarked tree is at, and whether it has uncommitted changes.
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=PROJECT_DIR, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=PROJECT_DIR,
+                                capture_output=True, text=True, check=True).stdout
+        return commit, bool(status.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', None
+
+def run_benchmarks(sizes=DEFAULT_SIZES, repeat=1, seed=0, data_dir=DATA_DIR, output=None, stages=None):
+    """
+    Benchmarks every size and writes the results, with the commit and environment, to a JSON file.
+
+    Returns the path of the results file.
+    """
+    commit, dirty = git_commit()
+    records = []
+    for rows in sizes:
+        print(f"Benchmarking {rows} rows.")
+        records.extend(benchmark_size(dataset_for(rows, seed, data_dir), rows, repeat, stages))
+
+    timestamp = datetime.datetime.now(datetime.timezone.utc)
+    report = {
+        'commit': commit,
+        'dirty': dirty,
+        'timestamp': timestamp.isoformat(timespec='seconds'),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'versions': {'pandas': pd.__version__, 'numpy': np.__version__, 'matplotlib': matplotlib.__version__},
+        'seed': seed,
+        'repeat': repeat,
+        'results': records,
+    }
+    if output is None:
+        output = os.path.join(RESULTS_DIR, f"{timestamp.strftime('%Y%m%dT%H%M%S')}_{commit[:12]}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Benchmark results written to {output}")
+    return output
+
+def compare_results(baseline_path, current_path):
+    """
+    Returns the per-step seconds and peak traced memory of two results files side by side, with their ratios.
+    """
+    frames = []
+    for path in (baseline_path, current_path):
+        with open(path, 'r') as f:
+            frames.append(pd.DataFrame(json.load(f)['results']).set_index(['step', 'rows']))
+    baseline, current = frames
+    comparison = pd.DataFrame({
+        'baseline_seconds': baseline['seconds'],
+        'current_seconds': current['seconds'],
+        'baseline_peak_mb': baseline['peak_traced_mb'],
+        'current_peak_mb': current['peak_traced_mb'],
+    }).dropna()
+    comparison['time_ratio'] = comparison['current_seconds'] / comparison['baseline_seconds']
+    comparison['memory_ratio'] = comparison['current_peak_mb'] / comparison['baseline_peak_mb']
+    return comparison
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the analysis pipeline on synthetic GTD-shaped datasets.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Dataset sizes in rows (default: 100000).")
+    parser.add_argument('--repeat', type=int, default=1, help="Timed runs per step; the best is kept.")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the synthetic datasets.")
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), metavar='STAGE',
+                        help=f"Stages to benchmark (default: all). Choices: {', '.join(STAGES)}")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Directory of the generated datasets.")
+    parser.add_argument('--output', default=None, help="Results file (default: results/<timestamp>_<commit>.json).")
+    parser.add_argument('--compare', default=None, metavar='BASELINE',
+                        help="Results file of an earlier run to compare this run against.")
+    args = parser.parse_args(argv)
+    output = run_benchmarks(args.sizes, args.repeat, args.seed, args.data_dir, args.output, args.stages)
+    if args.compare:
+        print(compare_results(args.compare, output).to_string(float_format=lambda value: f'{value:.3f}'))
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,232 @@
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+# Rows generated and written per chunk; memory stays bounded by this whatever the total size
+DEFAULT_CHUNK_ROWS = 250_000
+
+ATTACK_TYPES = ['Bombing/Explosion', 'Armed Assault', 'Assassination', 'Hostage Taking (Kidnapping)',
+                'Facility/Infrastructure Attack', 'Unknown', 'Unarmed Assault', 'Hostage Taking (Barricade Incident)',
+                'Hijacking']
+ATTACK_TYPE_SHARES = [0.480, 0.236, 0.106, 0.062, 0.055, 0.040, 0.0055, 0.0055, 0.0035]
+
+# Mean fatalities per attack type; nkill is negative binomial around these with a rare heavy tail
+ATTACK_TYPE_NKILL_MEAN = {
+    'Bombing/Explosion': 2.3, 'Armed Assault': 3.9, 'Assassination': 1.2, 'Hostage Taking (Kidnapping)': 1.9,
+    'Facility/Infrastructure Attack': 0.2, 'Unknown': 2.8, 'Unarmed Assault': 0.1,
+    'Hostage Taking (Barricade Incident)': 4.4, 'Hijacking': 5.4,
+}
+NKILL_DISPERSION = 0.2
+NKILL_TAIL_RATE = 2e-4
+NKILL_MAX = 1700
+
+REGIONS = ['Middle East & North Africa', 'South Asia', 'Sub-Saharan Africa', 'South America', 'Western Europe',
+           'Southeast Asia', 'Central America & Caribbean', 'Eastern Europe', 'North America', 'East Asia',
+           'Central Asia', 'Australasia & Oceania']
+REGION_SHARES = [0.276, 0.250, 0.105, 0.090, 0.081, 0.063, 0.049, 0.026, 0.018, 0.004, 0.003, 0.0014]
+
+# Approximate incidents per year (1993 is missing from the GTD), interpolated between these anchors
+YEAR_ANCHORS = {1970: 650, 1980: 2660, 1992: 5070, 1998: 930, 2004: 1170, 2008: 4800, 2014: 16900, 2017: 10900,
+                2020: 9300}
+
+TARGET_TYPES = ['Private Citizens & Property', 'Military', 'Police', 'Government (General)', 'Business',
+                'Transportation', 'Utilities', 'Religious Figures/Institutions', 'Unknown', 'Educational Institution',
+                'Government (Diplomatic)', 'Terrorists/Non-State Militia', 'Journalists & Media', 'Violent Political Party',
+                'Airports & Aircraft', 'Telecommunication', 'NGO', 'Tourists', 'Maritime', 'Food or Water Supply',
+                'Abortion Related', 'Other']
+WEAPON_TYPES = ['Explosives', 'Firearms', 'Unknown', 'Incendiary', 'Melee', 'Chemical', 'Sabotage Equipment',
+                'Vehicle (not to include vehicle-borne explosives, i.e., car or truck bombs)', 'Other', 'Biological',
+                'Fake Weapons', 'Radiological']
+CLAIM_MODES = ['Personal claim', 'Posted to website, blog, etc.', 'Call (post-incident)', 'Unknown', 'Note left at scene',
+               'Letter', 'Other', 'Video', 'E-mail', 'Call (pre-incident)']
+PROPERTY_EXTENTS = ['Minor (likely < $1 million)', 'Unknown', 'Major (likely >= $1 million but < $1 billion)',
+                    'Catastrophic (likely >= $1 billion)']
+HOSTAGE_OUTCOMES = ['Unknown', 'Hostage(s) released by perpetrators', 'Hostage(s) killed (not during rescue attempt)',
+                    'Successful Rescue', 'Hostage(s) escaped (not during rescue attempt)', 'Combination',
+                    'Attempted Rescue']
+ALTERNATIVES = ['Insurgency/Guerilla Action', 'Other Crime Type', 'Intra/Inter-group Conflict', 'Lack of Intentionality',
+                'State Actors']
+DBSOURCES = ['START Primary Collection', 'PGIS', 'ISVG', 'CETIS', 'Hewitt Project', 'UMD Schmid 2012', 'CAIN']
+PHRASES = ['assailants attacked', 'an explosive device detonated', 'near a checkpoint', 'in the city centre',
+           'targeting security forces', 'no group claimed responsibility', 'the victims were civilians',
+           'the attack was part of a series', 'authorities attributed the attack', 'several people were wounded',
+           'the specific motive is unknown', 'sources reported', 'gunmen opened fire', 'a vehicle was set ablaze']
+
+def _labels(prefix, count):
+    return [f'{prefix} {i}' for i in range(1, count + 1)]
+
+# Real-GTD-like cardinalities of the high-cardinality text columns
+COUNTRIES = _labels('Country', 205)
+PROVINCES = _labels('Province', 2800)
+CITIES = _labels('City', 36000)
+GROUPS = ['Unknown'] + _labels('Group', 3500)
+TARGET_SUBTYPES = _labels('Target subtype', 110)
+WEAPON_SUBTYPES = _labels('Weapon subtype', 30)
+
+# Full GTD column layout: column -> (kind, options, null rate)
+COLUMNS = {
+    'eventid': ('eventid', None, 0.0), 'iyear': ('year', None, 0.0), 'imonth': ('int', (0, 12), 0.0),
+    'iday': ('int', (0, 31), 0.0), 'approxdate': ('text', 3, 0.92), 'extended': ('flag', 0.05, 0.0),
+    'resolution': ('date', None, 0.98), 'country': ('code', COUNTRIES, 0.0), 'country_txt': ('label', 'country', 0.0),
+    'region': ('code', REGIONS, 0.0), 'region_txt': ('label', 'region', 0.0), 'provstate': ('choice', PROVINCES, 0.002),
+    'city': ('choice', CITIES, 0.003), 'latitude': ('float', (-50.0, 65.0), 0.025),
+    'longitude': ('float', (-160.0, 180.0), 0.025), 'specificity': ('int', (1, 5), 0.0),
+    'vicinity': ('flag', 0.07, 0.0), 'location': ('text', 8, 0.69), 'summary': ('text', 20, 0.35),
+    'crit1': ('flag', 0.99, 0.0), 'crit2': ('flag', 0.99, 0.0), 'crit3': ('flag', 0.88, 0.0),
+    'doubtterr': ('flag', 0.18, 0.0), 'alternative': ('code', ALTERNATIVES, 0.84),
+    'alternative_txt': ('label', 'alternative', 0.84), 'multiple': ('flag', 0.14, 0.0),
+    'success': ('flag', 0.89, 0.0), 'suicide': ('flag', 0.04, 0.0),
+    'attacktype1': ('code', ATTACK_TYPES, 0.0), 'attacktype1_txt': ('label', 'attacktype1', 0.0),
+    'attacktype2': ('code', ATTACK_TYPES, 0.96), 'attacktype2_txt': ('label', 'attacktype2', 0.96),
+    'attacktype3': ('code', ATTACK_TYPES, 0.997), 'attacktype3_txt': ('label', 'attacktype3', 0.997),
+    'targtype1': ('code', TARGET_TYPES, 0.0), 'targtype1_txt': ('label', 'targtype1', 0.0),
+    'targsubtype1': ('code', TARGET_SUBTYPES, 0.06), 'targsubtype1_txt': ('label', 'targsubtype1', 0.06),
+    'corp1': ('text', 4, 0.23), 'target1': ('text', 4, 0.004), 'natlty1': ('code', COUNTRIES, 0.009),
+    'natlty1_txt': ('label', 'natlty1', 0.009), 'targtype2': ('code', TARGET_TYPES, 0.94),
+    'targtype2_txt': ('label', 'targtype2', 0.94), 'targsubtype2': ('code', TARGET_SUBTYPES, 0.94),
+    'targsubtype2_txt': ('label', 'targsubtype2', 0.94), 'corp2': ('text', 4, 0.95), 'target2': ('text', 4, 0.94),
+    'natlty2': ('code', COUNTRIES, 0.94), 'natlty2_txt': ('label', 'natlty2', 0.94),
+    'targtype3': ('code', TARGET_TYPES, 0.99), 'targtype3_txt': ('label', 'targtype3', 0.99),
+    'targsubtype3': ('code', TARGET_SUBTYPES, 0.99), 'targsubtype3_txt': ('label', 'targsubtype3', 0.99),
+    'corp3': ('text', 4, 0.99), 'target3': ('text', 4, 0.99), 'natlty3': ('code', COUNTRIES, 0.99),
+    'natlty3_txt': ('label', 'natlty3', 0.99), 'gname': ('choice', GROUPS, 0.0), 'gsubname': ('text', 3, 0.97),
+    'gname2': ('choice', GROUPS, 0.99), 'gsubname2': ('text', 3, 0.999), 'gname3': ('choice', GROUPS, 0.998),
+    'gsubname3': ('text', 3, 0.9999), 'motive': ('text', 15, 0.72), 'guncertain1': ('flag', 0.09, 0.002),
+    'guncertain2': ('flag', 0.2, 0.99), 'guncertain3': ('flag', 0.2, 0.998), 'individual': ('flag', 0.003, 0.0),
+    'nperps': ('count', 2.0, 0.38), 'nperpcap': ('count', 0.2, 0.38), 'claimed': ('flag', 0.1, 0.36),
+    'claimmode': ('code', CLAIM_MODES, 0.89), 'claimmode_txt': ('label', 'claimmode', 0.89),
+    'claim2': ('flag', 0.3, 0.99), 'claimmode2': ('code', CLAIM_MODES, 0.997),
+    'claimmode2_txt': ('label', 'claimmode2', 0.997), 'claim3': ('flag', 0.3, 0.998),
+    'claimmode3': ('code', CLAIM_MODES, 0.999), 'claimmode3_txt': ('label', 'claimmode3', 0.999),
+    'compclaim': ('flag', 0.1, 0.97), 'weaptype1': ('code', WEAPON_TYPES, 0.0),
+    'weaptype1_txt': ('label', 'weaptype1', 0.0), 'weapsubtype1': ('code', WEAPON_SUBTYPES, 0.11),
+    'weapsubtype1_txt': ('label', 'weapsubtype1', 0.11), 'weaptype2': ('code', WEAPON_TYPES, 0.93),
+    'weaptype2_txt': ('label', 'weaptype2', 0.93), 'weapsubtype2': ('code', WEAPON_SUBTYPES, 0.94),
+    'weapsubtype2_txt': ('label', 'weapsubtype2', 0.94), 'weaptype3': ('code', WEAPON_TYPES, 0.99),
+    'weaptype3_txt': ('label', 'weaptype3', 0.99), 'weapsubtype3': ('code', WEAPON_SUBTYPES, 0.99),
+    'weapsubtype3_txt': ('label', 'weapsubtype3', 0.99), 'weaptype4': ('code', WEAPON_TYPES, 0.9996),
+    'weaptype4_txt': ('label', 'weaptype4', 0.9996), 'weapsubtype4': ('code', WEAPON_SUBTYPES, 0.9996),
+    'weapsubtype4_txt': ('label', 'weapsubtype4', 0.9996), 'weapdetail': ('text', 6, 0.38),
+    'nkill': ('nkill', None, 0.057), 'nkillus': ('count', 0.005, 0.35), 'nkillter': ('count', 0.5, 0.37),
+    'nwound': ('count', 3.2, 0.09), 'nwoundus': ('count', 0.03, 0.35), 'nwoundte': ('count', 0.1, 0.38),
+    'property': ('flag', 0.5, 0.0), 'propextent': ('code', PROPERTY_EXTENTS, 0.65),
+    'propextent_txt': ('label', 'propextent', 0.65), 'propvalue': ('float', (0.0, 1e6), 0.78),
+    'propcomment': ('text', 8, 0.68), 'ishostkid': ('flag', 0.08, 0.001), 'nhostkid': ('count', 5.0, 0.92),
+    'nhostkidus': ('count', 0.05, 0.92), 'nhours': ('count', 10.0, 0.98), 'ndays': ('count', 30.0, 0.96),
+    'divert': ('text', 2, 0.998), 'kidhijcountry': ('choice', COUNTRIES, 0.98), 'ransom': ('flag', 0.25, 0.57),
+    'ransomamt': ('float', (0.0, 5e6), 0.99), 'ransomamtus': ('float', (0.0, 5e5), 0.997),
+    'ransompaid': ('float', (0.0, 1e6), 0.996), 'ransompaidus': ('float', (0.0, 1e5), 0.997),
+    'ransomnote': ('text', 6, 0.997), 'hostkidoutcome': ('code', HOSTAGE_OUTCOMES, 0.94),
+    'hostkidoutcome_txt': ('label', 'hostkidoutcome', 0.94), 'nreleased': ('count', 3.0, 0.94),
+    'addnotes': ('text', 12, 0.84), 'scite1': ('text', 10, 0.36), 'scite2': ('text', 10, 0.56),
+    'scite3': ('text', 10, 0.75), 'dbsource': ('choice', DBSOURCES, 0.0), 'INT_LOG': ('int', (-9, 1), 0.0),
+    'INT_IDEO': ('int', (-9, 1), 0.0), 'INT_MISC': ('int', (-9, 1), 0.0), 'INT_ANY': ('int', (-9, 1), 0.0),
+    'related': ('text', 3, 0.86),
+}
+
+def year_weights():
+    """
+    Returns the years 1970-2020 and their share of incidents, following the shape of the real GTD.
+    """
+    years = np.arange(1970, 2021)
+    anchors = np.array(list(YEAR_ANCHORS))
+    weights = np.interp(years, anchors, [YEAR_ANCHORS[year] for year in anchors])
+    weights[years == 1993] = 0
+    return years, weights / weights.sum()
+
+def _with_nulls(rng, values, null_rate):
+    values = pd.Series(values)
+    if null_rate <= 0:
+        return values
+    return values.mask(rng.random(len(values)) < null_rate)
+
+def _text(rng, size, words):
+    """Draws sentences of roughly `words` words from a fixed pool of phrases."""
+    pool = np.array([' '.join(rng.choice(PHRASES, max(1, words // 3))) for _ in range(512)], dtype=object)
+    return pool[rng.integers(0, pool.size, size)]
+
+def _nkill(rng, attack_types):
+    """Skewed fatality counts: negative binomial per attack type plus a rare Pareto tail."""
+    means = pd.Series(attack_types).map(ATTACK_TYPE_NKILL_MEAN).to_numpy(dtype='float64')
+    counts = rng.negative_binomial(NKILL_DISPERSION, NKILL_DISPERSION / (NKILL_DISPERSION + means)).astype('float64')
+    tail = rng.random(counts.size) < NKILL_TAIL_RATE
+    counts[tail] = np.minimum(np.floor(50 * rng.pareto(1.1, tail.sum())), NKILL_MAX)
+    return counts
+
+def _shares(vocabulary):
+    # Explicit shares where the real distribution is known, Zipf-like otherwise
+    if vocabulary is ATTACK_TYPES:
+        shares = np.asarray(ATTACK_TYPE_SHARES)
+    elif vocabulary is REGIONS:
+        shares = np.asarray(REGION_SHARES)
+    else:
+        shares = 1 / np.arange(1, len(vocabulary) + 1)
+    return shares / shares.sum()
+
+def generate_chunk(rng, start, size):
+    """
+    Generates `size` synthetic GTD rows, numbering their eventids from row `start`.
+    """
+    years, year_shares = year_weights()
+    iyear = rng.choice(years, size, p=year_shares)
+    columns = {}
+    codes = {}
+    for column, (kind, options, null_rate) in COLUMNS.items():
+        if kind == 'eventid':
+            values = iyear.astype('int64') * 100_000_000 + start + np.arange(size)
+        elif kind == 'year':
+            values = iyear
+        elif kind == 'int':
+            values = rng.integers(options[0], options[1] + 1, size)
+        elif kind == 'float':
+            values = rng.uniform(options[0], options[1], size).round(6)
+        elif kind == 'flag':
+            values = (rng.random(size) < options).astype('int64')
+        elif kind == 'date':
+            values = pd.to_datetime(rng.integers(0, 18000, size), unit='D').strftime('%Y-%m-%d')
+        elif kind == 'code':
+            # Numeric code columns are drawn first; their _txt label column reuses the same draw
+            codes[column] = (options, rng.choice(len(options), size, p=_shares(options)))
+            values = codes[column][1] + 1
+        elif kind == 'label':
+            # Code and label columns are missing together, as in the real data
+            vocabulary, drawn = codes[options]
+            columns[column] = pd.Series(np.asarray(vocabulary, dtype=object)[drawn]).where(columns[options].notna())
+            continue
+        elif kind == 'choice':
+            values = np.asarray(options, dtype=object)[rng.choice(len(options), size, p=_shares(options))]
+        elif kind == 'text':
+            values = _text(rng, size, options)
+        elif kind == 'count':
+            values = rng.negative_binomial(NKILL_DISPERSION, NKILL_DISPERSION / (NKILL_DISPERSION + options), size)
+        elif kind == 'nkill':
+            values = _nkill(rng, columns['attacktype1_txt'])
+        columns[column] = _with_nulls(rng, values, null_rate)
+    return pd.DataFrame(columns)
+
+def generate_csv(file_path, rows, seed=0, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Writes a synthetic GTD-shaped CSV of `rows` rows, chunk by chunk, and returns its path.
+
+    The output depends only on rows, seed and chunk_rows: each chunk draws from its own child of SeedSequence(seed).
+    """
+    os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+    chunks = range(0, rows, chunk_rows)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    temp_path = file_path + '.tmp'
+    with open(temp_path, 'w', newline='') as f:
+        for child, start in zip(seeds, chunks):
+            chunk = generate_chunk(np.random.default_rng(child), start, min(chunk_rows, rows - start))
+            chunk.to_csv(f, index=False, header=start == 0)
+    os.replace(temp_path, file_path)
+    return file_path
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Write a synthetic CSV with the layout and distributions of the GTD.")
+    parser.add_argument('file_path', help="Output CSV path.")
+    parser.add_argument('--rows', type=int, default=100_000, help="Number of rows (default: 100000).")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed.")
+    args = parser.parse_args()
+    generate_csv(args.file_path, args.rows, args.seed)
+    print(f"Synthetic dataset with {args.rows} rows written to {args.file_path}")
@@ -1,32 +1,89 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import scipy.stats as stats
 import numpy as np
-from dataset_loader import load_dataset
-from dataset_cleaner import clean_dataset
+try:
+    from dataset_loader import load_dataset
+    from dataset_cleaner import clean_dataset
+    from instrumentation import stage
+    from figure_cache import cached_figure, pyplot
+    from aggregate_cube import rollup
+    from bootstrap_ci import DEFAULT_RESAMPLES, bootstrap_confidence_intervals
+except ImportError:
+    from scripts.dataset_loader import load_dataset
+    from scripts.dataset_cleaner import clean_dataset
+    from scripts.instrumentation import stage
+    from scripts.figure_cache import cached_figure, pyplot
+    from scripts.aggregate_cube import rollup
+    from scripts.bootstrap_ci import DEFAULT_RESAMPLES, bootstrap_confidence_intervals
 
-# Load and clean the dataset
-raw_data = load_dataset()
-if raw_data is not None:
-    data = clean_dataset(raw_data)
+# Output path of the confidence interval figure
+FIGURE_PATH = 'Terrorism_Analysis_Project/figures_and_statistics/95_ConfidenceInterval_Fatalities_By_Attacktype.png'
+
+# Supported confidence interval methods: normal z-interval or percentile bootstrap
+CI_METHODS = ['normal', 'bootstrap']
+
+def compute_confidence_intervals(data, method='normal', n_resamples=DEFAULT_RESAMPLES, seed=0, workers=None):
+    """
+    Returns the mean, count, std and 95% confidence interval of fatalities per attack type.
+
+    method='normal' adds the z-interval half-width as 'ci'; method='bootstrap' adds the percentile
+    bootstrap bounds 'ci_lower' and 'ci_upper' from n_resamples seeded resamples per attack type,
+    which do not assume the heavily skewed fatality counts are normally distributed.
+    """
+    if method not in CI_METHODS:
+        raise ValueError(f"method must be one of {', '.join(CI_METHODS)}, not {method!r}")
+    if method == 'bootstrap':
+        return bootstrap_confidence_intervals(data, n_resamples=n_resamples, confidence=0.95, seed=seed,
+                                              workers=workers)
 
     # Filter data for ANOVA visualisation
     filtered_data = data[['nkill', 'attacktype1_txt']].dropna()
 
     # Group by attack type to calculate mean and confidence intervals
     grouped = filtered_data.groupby('attacktype1_txt')['nkill'].agg(['mean', 'count', 'std']).reset_index()
+    return add_confidence_intervals(grouped)
+
+def compute_confidence_intervals_from_cube(cube):
+    """
+    Returns the same table as compute_confidence_intervals, rolled up from the aggregate cube.
+    """
+    rolled = rollup(cube, ['attacktype1_txt'])
+    grouped = pd.DataFrame({
+        'attacktype1_txt': rolled.index,
+        'mean': rolled['nkill_mean'].to_numpy(),
+        'count': rolled['count'].to_numpy(),
+        'std': rolled['nkill_std'].to_numpy(),
+    })
+    return add_confidence_intervals(grouped)
+
+def add_confidence_intervals(grouped):
+    """
+    Adds the 95% confidence interval half-width to per attack type mean, count and std.
+    """
     grouped = grouped[grouped['count'] > 1]  # Exclude groups with a single data point
 
     # Calculate the 95% confidence interval for each attack type
+    import scipy.stats as stats
     z_value = stats.norm.ppf(0.975)  # For 95% confidence
     grouped['ci'] = z_value * (grouped['std'] / np.sqrt(grouped['count']))
+    return grouped
 
+@cached_figure
+def plot_confidence_intervals(grouped, figure_path=FIGURE_PATH):
+    """
+    Plots the mean fatalities per attack type with their 95% confidence intervals and saves the figure.
+    """
+    plt = pyplot()
     # Plotting with adjusted y-axis
     plt.figure(figsize=(10, 6))
 
     # Bar plot with color palette optimised for color theory
     colors = plt.cm.viridis(np.linspace(0, 1, len(grouped['attacktype1_txt'])))
-    plt.bar(grouped['attacktype1_txt'], grouped['mean'], yerr=grouped['ci'], capsize=5, alpha=0.85, color=colors)
+    if 'ci' in grouped:
+        yerr = grouped['ci']
+    else:
+        # Bootstrap intervals are asymmetric around the mean
+        yerr = [grouped['mean'] - grouped['ci_lower'], grouped['ci_upper'] - grouped['mean']]
+    plt.bar(grouped['attacktype1_txt'], grouped['mean'], yerr=yerr, capsize=5, alpha=0.85, color=colors)
 
     # Adjust y-axis to start at 0 and have an upper bound of 12
     plt.ylim(bottom=0, top=12)
@@ -42,4 +99,41 @@ if raw_data is not None:
                 wrap=True, horizontalalignment='center', fontsize=10)
 
     # Save the figure in the correct directory
-    plt.savefig('Terrorism_Analysis_Project/figures_and_statistics/95_ConfidenceInterval_Fatalities_By_Attacktype.png', bbox_inches='tight')
+    plt.savefig(figure_path, bbox_inches='tight')
+    plt.close()
+
+def render_tasks(grouped):
+    """
+    Returns the (plot function, arguments) pairs that render this analysis' figure.
+    """
+    return [(plot_confidence_intervals, (grouped, FIGURE_PATH))]
+
+def run(data, render=True, method='normal', n_resamples=DEFAULT_RESAMPLES, seed=0, workers=None):
+    """
+    Computes the confidence intervals from the cleaned dataset and, unless render=False, saves the figure.
+    """
+    with stage('confidence_interval.compute', rows=len(data)):
+        grouped = compute_confidence_intervals(data, method, n_resamples, seed, workers)
+    if render:
+        for plot, args in render_tasks(grouped):
+            with stage(f'confidence_interval.{plot.__name__}'):
+                plot(*args)
+    return grouped
+
+def run_from_cube(cube, render=True):
+    """
+    Computes the confidence intervals from the aggregate cube and, unless render=False, saves the figure.
+    """
+    with stage('confidence_interval.compute', rows=len(cube)):
+        grouped = compute_confidence_intervals_from_cube(cube)
+    if render:
+        for plot, args in render_tasks(grouped):
+            with stage(f'confidence_interval.{plot.__name__}'):
+                plot(*args)
+    return grouped
+
+if __name__ == '__main__':
+    # Load and clean the dataset
+    raw_data = load_dataset()
+    if raw_data is not None:
+        run(clean_dataset(raw_data))
@@ -1,13 +1,24 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-from dataset_loader import load_dataset
-from dataset_cleaner import clean_dataset
+try:
+    from dataset_loader import load_dataset
+    from dataset_cleaner import clean_dataset
+    from instrumentation import stage
+    from figure_cache import cached_figure, pyplot
+    from aggregate_cube import rollup
+except ImportError:
+    from scripts.dataset_loader import load_dataset
+    from scripts.dataset_cleaner import clean_dataset
+    from scripts.instrumentation import stage
+    from scripts.figure_cache import cached_figure, pyplot
+    from scripts.aggregate_cube import rollup
 
-# Load and clean the dataset
-raw_data = load_dataset()
-if raw_data is not None:
-    data = clean_dataset(raw_data)
+# Output path of the attack type figure
+FIGURE_PATH = 'Terrorism_Analysis_Project/figures_and_statistics/Attacktype_Frequency_And_Success.png'
 
+def compute_attacktype_success(data):
+    """
+    Returns the total and successful incidents per attack type, sorted by total incidents.
+    """
     # Group data by attack type and calculate stats
     relevant_data = data[['attacktype1_txt', 'success']]
     attack_stats = relevant_data.groupby('attacktype1_txt').agg(
@@ -16,7 +27,28 @@ if raw_data is not None:
     ).reset_index()
 
     attack_stats.sort_values(by='total_incidents', ascending=False, inplace=True)
+    return attack_stats
 
+def compute_attacktype_success_from_cube(cube):
+    """
+    Returns the same table as compute_attacktype_success, rolled up from the aggregate cube.
+    """
+    rolled = rollup(cube, ['attacktype1_txt'])
+    attack_stats = pd.DataFrame({
+        'attacktype1_txt': rolled.index,
+        'total_incidents': rolled['count'].to_numpy(),
+        'successful_incidents': rolled['success_sum'].to_numpy(),
+    })
+
+    attack_stats.sort_values(by='total_incidents', ascending=False, inplace=True)
+    return attack_stats
+
+@cached_figure
+def plot_attacktype_success(attack_stats, figure_path=FIGURE_PATH):
+    """
+    Plots total and successful incidents per attack type and saves the figure.
+    """
+    plt = pyplot()
     plt.figure(figsize=(12, 8))
     bar_width = 0.4
     x = range(len(attack_stats['attacktype1_txt']))
@@ -58,4 +90,41 @@ if raw_data is not None:
     )
 
     # Save the figure
-    plt.savefig('Terrorism_Analysis_Project/figures_and_statistics/Attacktype_Frequency_And_Success.png', bbox_inches='tight')
+    plt.savefig(figure_path, bbox_inches='tight')
+    plt.close()
+
+def render_tasks(attack_stats):
+    """
+    Returns the (plot function, arguments) pairs that render this analysis' figure.
+    """
+    return [(plot_attacktype_success, (attack_stats, FIGURE_PATH))]
+
+def run(data, render=True):
+    """
+    Computes the attack type statistics from the cleaned dataset and, unless render=False, saves the figure.
+    """
+    with stage('attacktype_frequency.compute', rows=len(data)):
+        attack_stats = compute_attacktype_success(data)
+    if render:
+        for plot, args in render_tasks(attack_stats):
+            with stage(f'attacktype_frequency.{plot.__name__}'):
+                plot(*args)
+    return attack_stats
+
+def run_from_cube(cube, render=True):
+    """
+    Computes the attack type statistics from the aggregate cube and, unless render=False, saves the figure.
+    """
+    with stage('attacktype_frequency.compute', rows=len(cube)):
+        attack_stats = compute_attacktype_success_from_cube(cube)
+    if render:
+        for plot, args in render_tasks(attack_stats):
+            with stage(f'attacktype_frequency.{plot.__name__}'):
+                plot(*args)
+    return attack_stats
+
+if __name__ == '__main__':
+    # Load and clean the dataset
+    raw_data = load_dataset()
+    if raw_data is not None:
+        run(clean_dataset(raw_data))
@@ -1,19 +1,48 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-from dataset_loader import load_dataset
-from dataset_cleaner import clean_dataset
+try:
+    from dataset_loader import load_dataset
+    from dataset_cleaner import clean_dataset
+    from instrumentation import stage
+    from figure_cache import cached_figure, pyplot
+    from aggregate_cube import rollup
+except ImportError:
+    from scripts.dataset_loader import load_dataset
+    from scripts.dataset_cleaner import clean_dataset
+    from scripts.instrumentation import stage
+    from scripts.figure_cache import cached_figure, pyplot
+    from scripts.aggregate_cube import rollup
 
-# Load and clean the dataset
-raw_data = load_dataset()
-if raw_data is not None:
-    data = clean_dataset(raw_data)
+# Output path of the region figure
+FIGURE_PATH = 'Terrorism_Analysis_Project/figures_and_statistics/No_Incidents_And_Success_Rate_By_Region.png'
 
+def compute_region_success(data):
+    """
+    Returns the number of incidents and the success rate per region, sorted by incidents.
+    """
     # Calculate the total number of incidents and success rate per region
     region_data = data.groupby('region_txt').agg(
         incidents=('eventid', 'count'),
         success_rate=('success', 'mean')
     ).sort_values(by='incidents', ascending=False)
+    return region_data
 
+def compute_region_success_from_cube(cube):
+    """
+    Returns the same table as compute_region_success, rolled up from the aggregate cube.
+    """
+    rolled = rollup(cube, ['region_txt'])
+    region_data = pd.DataFrame({
+        'incidents': rolled['count'],
+        'success_rate': rolled['success_rate'],
+    }).sort_values(by='incidents', ascending=False)
+    return region_data
+
+@cached_figure
+def plot_region_success(region_data, figure_path=FIGURE_PATH):
+    """
+    Plots incidents (bars) and success rate (line) per region on a dual axis and saves the figure.
+    """
+    plt = pyplot()
     # Create a dual-axis plot
     fig, ax1 = plt.subplots(figsize=(14, 7))
 
@@ -45,4 +74,41 @@ if raw_data is not None:
 
     plt.title('Number of Incidents and Success Rate by Region')
     # Save the figure
-    plt.savefig('Terrorism_Analysis_Project/figures_and_statistics/No_Incidents_And_Success_Rate_By_Region.png', bbox_inches='tight')
+    plt.savefig(figure_path, bbox_inches='tight')
+    plt.close(fig)
+
+def render_tasks(region_data):
+    """
+    Returns the (plot function, arguments) pairs that render this analysis' figure.
+    """
+    return [(plot_region_success, (region_data, FIGURE_PATH))]
+
+def run(data, render=True):
+    """
+    Computes the region statistics from the cleaned dataset and, unless render=False, saves the figure.
+    """
+    with stage('region_success.compute', rows=len(data)):
+        region_data = compute_region_success(data)
+    if render:
+        for plot, args in render_tasks(region_data):
+            with stage(f'region_success.{plot.__name__}'):
+                plot(*args)
+    return region_data
+
+def run_from_cube(cube, render=True):
+    """
+    Computes the region statistics from the aggregate cube and, unless render=False, saves the figure.
+    """
+    with stage('region_success.compute', rows=len(cube)):
+        region_data = compute_region_success_from_cube(cube)
+    if render:
+        for plot, args in render_tasks(region_data):
+            with stage(f'region_success.{plot.__name__}'):
+                plot(*args)
+    return region_data
+
+if __name__ == '__main__':
+    # Load and clean the dataset
+    raw_data = load_dataset()
+    if raw_data is not None:
+        run(clean_dataset(raw_data))
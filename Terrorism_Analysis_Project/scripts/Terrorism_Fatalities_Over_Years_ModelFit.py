@@ -1,36 +1,72 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.stats import pearsonr
-from dataset_loader import load_dataset
-from dataset_cleaner import clean_dataset
-
-# Load and clean the dataset
-raw_data = load_dataset()
-if raw_data is not None:
-    data = clean_dataset(raw_data)
-
+try:
+    from dataset_loader import load_dataset
+    from dataset_cleaner import clean_dataset
+    from instrumentation import stage
+    from figure_cache import cached_figure, pyplot
+    from aggregate_cube import rollup
+    from trend_fits import fit_log_linear
+    from results_store import get_or_compute, store_path_for, write_statistics_view
+except ImportError:
+    from scripts.dataset_loader import load_dataset
+    from scripts.dataset_cleaner import clean_dataset
+    from scripts.instrumentation import stage
+    from scripts.figure_cache import cached_figure, pyplot
+    from scripts.aggregate_cube import rollup
+    from scripts.trend_fits import fit_log_linear
+    from scripts.results_store import get_or_compute, store_path_for, write_statistics_view
+
+# Output paths of the model fit figures and the statistics file
+FIGURE_PATH = 'Terrorism_Analysis_Project/figures_and_statistics/Terrorism_Fatalities_Over_Years_ModelFit.png'
+RESIDUALS_FIGURE_PATH = 'Terrorism_Analysis_Project/figures_and_statistics/Boxplot_of_Residuals.png'
+STATISTICS_FILE = 'Terrorism_Analysis_Project/figures_and_statistics/statistics.txt'
+
+def compute_model_fit(data):
+    """
+    Fits the exponential model y = a * e^(b * (t - 1970)) to the yearly fatalities.
+
+    Returns a dict with the yearly data (X, y), parameters (a, b), predictions, residuals
+    and the Pearson correlation of the log-transformed fit.
+    """
+    return fit_exponential_model(*yearly_fatalities(data))
+
+def compute_model_fit_from_cube(cube):
+    """
+    Returns the same fit as compute_model_fit, using yearly fatalities rolled up from the aggregate cube.
+    """
+    return fit_exponential_model(*yearly_fatalities_from_cube(cube))
+
+def yearly_fatalities(data):
+    """
+    Returns the years (X) and total fatalities per year (y) of the cleaned dataset.
+    """
     # Aggregate fatalities by year
     yearly_data = data.groupby('iyear')['nkill'].sum().reset_index()
 
     # Extract year (X) and total fatalities (y)
-    X = yearly_data['iyear'].values
-    y = yearly_data['nkill'].values
+    return yearly_data['iyear'].values, yearly_data['nkill'].values
 
-    # Normalise year for numerical stability
-    X_normalised = X - 1970
+def yearly_fatalities_from_cube(cube):
+    """
+    Returns the same yearly fatalities as yearly_fatalities, rolled up from the aggregate cube.
+    """
+    yearly_data = rollup(cube, ['iyear'])
+    return yearly_data.index.to_numpy(), yearly_data['nkill_sum'].to_numpy()
 
-    # Log-transform fatalities for linear regression
-    log_y = np.log(y)
+def fit_exponential_model(X, y):
+    """
+    Fits y = a * e^(b * (X - 1970)) by linear regression on log(y) and returns the fit dict.
 
-    # Perform linear regression
-    X_with_intercept = np.c_[np.ones(X_normalised.shape[0]), X_normalised]
-    beta = np.linalg.inv(X_with_intercept.T @ X_with_intercept) @ X_with_intercept.T @ log_y
+    Years with zero fatalities are left out of the regression, since log(0) is undefined.
+    """
+    # Normalise year for numerical stability
+    X_normalised = X - 1970
 
-    # Extract parameters
-    ln_a = beta[0]
-    b = beta[1]
-    a = np.exp(ln_a)
+    # Least-squares fit of log(y) on the normalised year, with the Pearson r of the transformed variables
+    fit = fit_log_linear(X, y).iloc[0]
+    a = fit['a']
+    b = fit['b']
 
     # Generate predictions
     y_pred = a * np.exp(b * X_normalised)
@@ -38,6 +74,28 @@ if raw_data is not None:
     # Calculate residuals of modelfit
     residuals = y - y_pred
 
+    # Calculate correlation
+    correlation_coefficient, p_value = fit['r'], fit['p_value']
+
+    return {
+        'X': X,
+        'y': y,
+        'a': a,
+        'b': b,
+        'y_pred': y_pred,
+        'residuals': residuals,
+        'correlation_coefficient': correlation_coefficient,
+        'p_value': p_value,
+    }
+
+@cached_figure
+def plot_model_fit(fit, figure_path=FIGURE_PATH):
+    """
+    Plots the yearly fatalities with the exponential model fit and saves the figure.
+    """
+    plt = pyplot()
+    X, y, y_pred, a, b = fit['X'], fit['y'], fit['y_pred'], fit['a'], fit['b']
+
     # Plot the results
     plt.figure(figsize=(10, 6))
     plt.scatter(X, y, alpha=0.7, label="Actual Fatalities", color='blue', marker='x')
@@ -50,19 +108,25 @@ if raw_data is not None:
     plt.legend()
     plt.grid(True)
 
-    plt.figtext(0.5, -0.1, 'Figure 1: An exponential model fit over a scatterplot that explores changes in total fatalities\n' 
+    plt.figtext(0.5, -0.1, 'Figure 1: An exponential model fit over a scatterplot that explores changes in total fatalities\n'
             'resulted from terrorist incidents every year, from 1970 to 2020. The model of equation:\n'
-            'y = 820.55 * e^(0.0738 * (t - 1970)), suggests an exponential average increasing trend, of approx 7.38% rise in\n' 
+            'y = 820.55 * e^(0.0738 * (t - 1970)), suggests an exponential average increasing trend, of approx 7.38% rise in\n'
             'terrorism related fatalities per year.',
             wrap=True, horizontalalignment='center', fontsize=10)
-        
-    # Save the figure
-    plt.savefig('Terrorism_Analysis_Project/figures_and_statistics/Terrorism_Fatalities_Over_Years_ModelFit.png', bbox_inches='tight')
-
 
+    # Save the figure
+    plt.savefig(figure_path, bbox_inches='tight')
+    plt.close()
+
+@cached_figure
+def plot_residuals(fit, figure_path=RESIDUALS_FIGURE_PATH):
+    """
+    Plots a boxplot of the model fit residuals and saves the figure.
+    """
+    plt = pyplot()
     # Create a vertical boxplot with labeled axes and a caption
     plt.figure(figsize=(8, 6))
-    plt.boxplot(residuals, vert=True, patch_artist=True, boxprops=dict(facecolor="lightblue"))
+    plt.boxplot(fit['residuals'], vert=True, patch_artist=True, boxprops=dict(facecolor="lightblue"))
     plt.title("Boxplot of Residuals", fontsize=14)
     plt.xlabel("Residuals", fontsize=12)
     plt.ylabel("Residual Values", fontsize=12)
@@ -70,35 +134,73 @@ if raw_data is not None:
     plt.figtext(0.5, -0.09, 'Sub-Figure 1: This boxplot illustrates the spread and variability of the residuals from the exponential model fit.\n'
             'The y-axis represents the residual values. There appears to be a relatively normal distribution to the residuals of\n'
             'the model, with a relatively symmetrical structure around/close to 0. The 2 positive outlier points highlight the\n'
-            'extreme nature of terrorism and terrorist attacks - with some years far exceeding the predictions of the model fit.', 
+            'extreme nature of terrorism and terrorist attacks - with some years far exceeding the predictions of the model fit.',
             wrap=True, horizontalalignment='center', fontsize=10)
-    plt.savefig('Terrorism_Analysis_Project/figures_and_statistics/Boxplot_of_Residuals.png', bbox_inches='tight')
-
+    plt.savefig(figure_path, bbox_inches='tight')
+    plt.close()
 
+def format_model_statistics(fit):
+    """
+    Returns the statistics file section of the model equation and the correlation analysis.
+    """
     # Exponential model equation as a string
-    model_equation = f"Exponential Model Equation: y(t) = {a:.2f} * e^({b:.4f} * (t - 1970))"
-
-    # Path to the statistics.txt file
-    statistics_file = 'Terrorism_Analysis_Project/figures_and_statistics/statistics.txt'
-
-    # Print and append the model equation to the statistics file
-    with open(statistics_file, 'a') as f:
-        f.write("\n--- Exponential Model Equation ---\n")
-        f.write(model_equation + "\n")
-    
-# Calculate correlation
-correlation_coefficient, p_value = pearsonr(X_normalised, log_y)
-
-# Prepare the result as a string
-correlation_result = (
-    "\nCorrelation Analysis: Correlation between transformed variables\n"
-    "-----------------------------------------------------\n"
-    f"Pearson Correlation Coefficient: {correlation_coefficient:.3f}\n"
-    f"P-Value: {p_value:.2e}\n\n"
-)
-
-# Append the result to the statistics.txt file
-with open(statistics_file, "a") as f:
-     f.write(correlation_result)
-
-print("Correlation results added to statistics.txt")
+    model_equation = f"Exponential Model Equation: y(t) = {fit['a']:.2f} * e^({fit['b']:.4f} * (t - 1970))"
+
+    # Prepare the result as a string
+    correlation_result = (
+        "\nCorrelation Analysis: Correlation between transformed variables\n"
+        "-----------------------------------------------------\n"
+        f"Pearson Correlation Coefficient: {fit['correlation_coefficient']:.3f}\n"
+        f"P-Value: {fit['p_value']:.2e}\n\n"
+    )
+    return "\n--- Exponential Model Equation ---\n" + model_equation + "\n" + correlation_result
+
+def stored_model_fit(X, y, statistics_file=STATISTICS_FILE):
+    """
+    Returns the exponential model fit of the yearly fatalities, reusing the stored fit of identical yearly totals.
+    """
+    # The fit itself is computed by trend_fits, so its source is part of the key too
+    return get_or_compute('model_fit', (X, y), fit_exponential_model, format_model_statistics,
+                          store_path_for(statistics_file), depends=(fit_log_linear,))
+
+def render_tasks(fit):
+    """
+    Returns the (plot function, arguments) pairs that render the model fit and residual figures.
+    """
+    return [(plot_model_fit, (fit, FIGURE_PATH)), (plot_residuals, (fit, RESIDUALS_FIGURE_PATH))]
+
+def run(data, render=True):
+    """
+    Fits the exponential model to the cleaned dataset, records the statistics and, unless render=False, saves both figures.
+    """
+    with stage('model_fit.compute', rows=len(data)):
+        fit = stored_model_fit(*yearly_fatalities(data), STATISTICS_FILE)
+    if render:
+        for plot, args in render_tasks(fit):
+            with stage(f'model_fit.{plot.__name__}'):
+                plot(*args)
+    with stage('model_fit.write_statistics'):
+        write_statistics_view(STATISTICS_FILE)
+    print("Correlation results added to statistics.txt")
+    return fit
+
+def run_from_cube(cube, render=True):
+    """
+    Fits the exponential model from the aggregate cube, records the statistics and, unless render=False, saves both figures.
+    """
+    with stage('model_fit.compute', rows=len(cube)):
+        fit = stored_model_fit(*yearly_fatalities_from_cube(cube), STATISTICS_FILE)
+    if render:
+        for plot, args in render_tasks(fit):
+            with stage(f'model_fit.{plot.__name__}'):
+                plot(*args)
+    with stage('model_fit.write_statistics'):
+        write_statistics_view(STATISTICS_FILE)
+    print("Correlation results added to statistics.txt")
+    return fit
+
+if __name__ == '__main__':
+    # Load and clean the dataset
+    raw_data = load_dataset()
+    if raw_data is not None:
+        run(clean_dataset(raw_data))
@@ -1,29 +1,155 @@
-from scipy import stats
+import numpy as np
 import pandas as pd
-from pingouin import welch_anova
-from dataset_loader import load_dataset
-from dataset_cleaner import clean_dataset
+try:
+    from dataset_loader import load_dataset
+    from dataset_cleaner import clean_dataset
+    from instrumentation import stage
+    from aggregate_cube import rollup
+    from results_store import get_or_compute, store_path_for, write_statistics_view
+except ImportError:
+    from scripts.dataset_loader import load_dataset
+    from scripts.dataset_cleaner import clean_dataset
+    from scripts.instrumentation import stage
+    from scripts.aggregate_cube import rollup
+    from scripts.results_store import get_or_compute, store_path_for, write_statistics_view
 
-# Load and clean the dataset
-raw_data = load_dataset()
-if raw_data is not None:
-    data = clean_dataset(raw_data)
+# Path to the statistics.txt file
+STATISTICS_FILE = 'Terrorism_Analysis_Project/figures_and_statistics/statistics.txt'
 
-    # Perform Welch's ANOVA
+def welch_anova_from_summary(count, mean, var, source='attacktype1_txt'):
+    """
+    Performs Welch's ANOVA from per-group sample sizes, means and variances (ddof=1).
+
+    Uses the same formulas as pingouin.welch_anova, so the full data never has to be in memory.
+    Returns a one-row DataFrame with the Source, ddof1, ddof2, F, p-unc and np2 columns.
+    """
+    count = np.asarray(count, dtype='float64')
+    mean = np.asarray(mean, dtype='float64')
+    var = np.asarray(var, dtype='float64')
+    if (count < 2).any() or (var == 0).any():
+        raise ValueError("Each group must have at least two observations and a non-zero variance.")
+
+    # Number of groups
+    r = count.size
+    ddof1 = r - 1
+
+    # Compute weights and adjusted grand mean
+    weights = count / var
+    adj_grandmean = np.sum(weights * mean) / np.sum(weights)
+
+    # Sums of squares: the residual term is recovered from the group variances
+    grandmean = np.sum(count * mean) / np.sum(count)
+    ss_res = np.sum((count - 1) * var)
+    ss_bet = np.sum(count * (mean - grandmean) ** 2)
+    ms_betadj = np.sum(weights * (mean - adj_grandmean) ** 2) / ddof1
+
+    # Calculate lambda, F-value, p-value and np2
+    lamb = 3 * np.sum((1 - weights / np.sum(weights)) ** 2 / (count - 1)) / (r ** 2 - 1)
+    ddof2 = 1 / lamb
+    fval = ms_betadj / (1 + 2 * lamb * (r - 2) / 3)
+    from scipy import stats
+    pval = stats.f.sf(fval, ddof1, ddof2)
+    np2 = ss_bet / (ss_bet + ss_res)
+
+    return pd.DataFrame({
+        'Source': source,
+        'ddof1': ddof1,
+        'ddof2': ddof2,
+        'F': fval,
+        'p-unc': pval,
+        'np2': np2,
+    }, index=[0])
+
+def compute_welch_anova_from_statistics(group_stats, source='attacktype1_txt'):
+    """
+    Returns the descriptive statistics and Welch's ANOVA results from per-group count, mean and var columns,
+    such as the output of GroupAccumulator.to_frame().
+    """
+    welch_results = welch_anova_from_summary(group_stats['count'], group_stats['mean'], group_stats['var'], source)
+
+    # Descriptive statistics
+    desc_stats = pd.DataFrame({
+        'count': group_stats['count'].astype('int64'),
+        'mean': group_stats['mean'],
+        'std': np.sqrt(group_stats['var']),
+    }).round(2)
+    desc_stats.index.name = source
+    return desc_stats, welch_results
+
+def attacktype_statistics(data):
+    """
+    Returns the count, mean and variance of fatalities per attack type.
+    """
+    # One grouped pass gives every statistic the test needs
     filtered_data = data[['nkill', 'attacktype1_txt']].dropna()
-    welch_results = welch_anova(data=filtered_data, dv='nkill', between='attacktype1_txt')
+    return filtered_data.groupby('attacktype1_txt', observed=True)['nkill'].agg(['count', 'mean', 'var'])
+
+def attacktype_statistics_from_cube(cube):
+    """
+    Returns the same statistics as attacktype_statistics, rolled up from the aggregate cube.
+    """
+    rolled = rollup(cube, ['attacktype1_txt'])
+    return pd.DataFrame({'count': rolled['count'], 'mean': rolled['nkill_mean'], 'var': rolled['nkill_var']})
+
+def compute_welch_anova(data):
+    """
+    Returns the descriptive statistics of fatalities by attack type and the Welch's ANOVA results.
+    """
+    return compute_welch_anova_from_statistics(attacktype_statistics(data))
+
+def compute_welch_anova_from_cube(cube):
+    """
+    Returns the same results as compute_welch_anova, using fatality statistics rolled up from the aggregate cube.
+    """
+    return compute_welch_anova_from_statistics(attacktype_statistics_from_cube(cube))
+
+def format_welch_statistics(results):
+    """
+    Returns the statistics file section of the descriptive statistics and Welch's ANOVA results.
+    """
+    desc_stats, welch_results = results
+    return (
+        "\n--- Descriptive Statistics of fatalities by Attack Type ---\n"
+        f"{desc_stats.to_string(index=True)}"
+        "\n\n--- Welch ANOVA Results ---\n"
+        f"{welch_results.to_string(index=False)}\n"
+    )
+
+def stored_welch_anova(group_stats, statistics_file=STATISTICS_FILE):
+    """
+    Returns the Welch's ANOVA results of the per-group statistics, reusing the stored results of identical statistics.
+    """
+    return get_or_compute('welch_anova', (group_stats,), compute_welch_anova_from_statistics,
+                          format_welch_statistics, store_path_for(statistics_file))
 
-    # Calculate descriptive statistics
-    desc_stats = filtered_data.groupby('attacktype1_txt')['nkill'].agg(['count', 'mean', 'std']).round(2)
+def render_tasks(results):
+    """
+    Returns the (plot function, arguments) pairs of this analysis; Welch's ANOVA has no figure.
+    """
+    return []
 
-    # Path to the statistics.txt file
-    statistics_file = 'Terrorism_Analysis_Project/figures_and_statistics/statistics.txt'
+def run(data, render=True):
+    """
+    Runs Welch's ANOVA on the cleaned dataset and records the results in the statistics file.
+    """
+    with stage('welch_anova.compute', rows=len(data)):
+        desc_stats, welch_results = stored_welch_anova(attacktype_statistics(data), STATISTICS_FILE)
+    with stage('welch_anova.write_statistics'):
+        write_statistics_view(STATISTICS_FILE)
+    return desc_stats, welch_results
 
+def run_from_cube(cube, render=True):
+    """
+    Runs Welch's ANOVA from the aggregate cube and records the results in the statistics file.
+    """
+    with stage('welch_anova.compute', rows=len(cube)):
+        desc_stats, welch_results = stored_welch_anova(attacktype_statistics_from_cube(cube), STATISTICS_FILE)
+    with stage('welch_anova.write_statistics'):
+        write_statistics_view(STATISTICS_FILE)
+    return desc_stats, welch_results
 
-    # Append results to statistics.txt
-    with open(statistics_file, 'a') as f:
-        f.write("\n--- Descriptive Statistics of fatalities by Attack Type ---\n")
-        f.write(desc_stats.to_string(index=True))  # Write descriptive statistics as a string
-        f.write("\n\n--- Welch ANOVA Results ---\n")
-        f.write(welch_results.to_string(index=False))  # Write Welch ANOVA results as a string
-        f.write("\n")  # Add a newline for better readability
+if __name__ == '__main__':
+    # Load and clean the dataset
+    raw_data = load_dataset()
+    if raw_data is not None:
+        run(clean_dataset(raw_data))
@@ -0,0 +1,143 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+try:
+    from dataset_loader import DATASET_PATH
+    from dataset_cache import cleaning_rules_hash, load_cleaned_dataset, source_content_hash
+except ImportError:
+    from scripts.dataset_loader import DATASET_PATH
+    from scripts.dataset_cache import cleaning_rules_hash, load_cleaned_dataset, source_content_hash
+
+# Default location of the persisted cube, next to the dataset
+CUBE_PATH = 'Terrorism_Analysis_Project/dataset/gtd_aggregate_cube.parquet'
+
+# Grain of the cube and the additive measures stored per cell
+CUBE_DIMENSIONS = ['iyear', 'region_txt', 'attacktype1_txt']
+CUBE_MEASURES = ['count', 'success_sum', 'nkill_sum', 'nkill_sumsq']
+
+def build_cube(data):
+    """
+    Materialises the incident count, success sum, nkill sum and nkill sum of squares per
+    year x region x attack type cell of the cleaned dataset.
+    """
+    nkill = data['nkill'].to_numpy().astype('int64')
+    cells = pd.DataFrame({
+        'iyear': data['iyear'].to_numpy(),
+        # Plain strings keep the cube independent of the categories a particular load produced
+        'region_txt': data['region_txt'].astype(str).to_numpy(),
+        'attacktype1_txt': data['attacktype1_txt'].astype(str).to_numpy(),
+        'success': data['success'].to_numpy().astype('int64'),
+        'nkill': nkill,
+        'nkill_sq': nkill * nkill,
+    })
+    cube = cells.groupby(CUBE_DIMENSIONS, sort=True).agg(
+        count=('nkill', 'size'),
+        success_sum=('success', 'sum'),
+        nkill_sum=('nkill', 'sum'),
+        nkill_sumsq=('nkill_sq', 'sum')
+    ).reset_index()
+    cube['count'] = cube['count'].astype('int64')
+    return cube
+
+def rollup(cube, dimensions):
+    """
+    Rolls the cube up to any subset of its dimensions (an empty list gives the grand total).
+
+    Returns the summed measures plus success_rate and the nkill mean, var and std (ddof=1),
+    indexed by the given dimensions.
+    """
+    dimensions = list(dimensions)
+    unknown = [dimension for dimension in dimensions if dimension not in CUBE_DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown cube dimension(s): {', '.join(unknown)}")
+    if dimensions:
+        rolled = cube.groupby(dimensions, sort=True)[CUBE_MEASURES].sum()
+    else:
+        rolled = cube[CUBE_MEASURES].sum().to_frame().T
+
+    count = rolled['count']
+    rolled['success_rate'] = rolled['success_sum'] / count
+    rolled['nkill_mean'] = rolled['nkill_sum'] / count
+    # Exact integer numerator n*sum(x^2) - sum(x)^2 avoids the cancellation of the naive formula
+    numerator = (count.astype(object) * rolled['nkill_sumsq'].astype(object)
+                 - rolled['nkill_sum'].astype(object) ** 2)
+    denominator = (count.astype(object) * (count.astype(object) - 1))
+    variance = pd.Series(np.nan, index=rolled.index)
+    multiple = count > 1
+    variance[multiple] = (numerator[multiple] / denominator[multiple]).astype('float64')
+    rolled['nkill_var'] = variance
+    rolled['nkill_std'] = np.sqrt(variance)
+    return rolled
+
+def save_cube(cube, cube_path=CUBE_PATH, source=None):
+    """
+    Writes the cube to Parquet, with an optional JSON sidecar describing the source it was built from.
+    """
+    os.makedirs(os.path.dirname(cube_path) or '.', exist_ok=True)
+    temp_path = cube_path + '.tmp'
+    cube.to_parquet(temp_path, index=False)
+    os.replace(temp_path, cube_path)
+    if source is not None:
+        with open(cube_path + '.json', 'w') as f:
+            json.dump(source, f, indent=2, sort_keys=True)
+
+def load_cube(cube_path=CUBE_PATH):
+    """
+    Loads a persisted cube, returning None if it does not exist.
+    """
+    try:
+        return pd.read_parquet(cube_path)
+    except FileNotFoundError:
+        print(f"Cube not found. Please check the file path: {cube_path}")
+        return None
+
+def load_or_build_cube(file_path=DATASET_PATH, cube_path=None, use_cache=False):
+    """
+    Returns the cube for the given CSV, rebuilding and persisting it when the CSV or cleaning rules changed.
+
+    cube_path defaults to CUBE_PATH. use_cache is passed to load_cleaned_dataset when the cube is rebuilt,
+    so the cleaned snapshot is only written when asked for.
+    """
+    if cube_path is None:
+        cube_path = CUBE_PATH
+    if not os.path.exists(file_path):
+        print(f"File not found. Please check the file path: {file_path}")
+        return None
+
+    source_key = os.path.abspath(file_path)
+    sidecar_path = cube_path + '.json'
+    try:
+        with open(sidecar_path, 'r') as f:
+            source = json.load(f)
+    except (OSError, ValueError):
+        # A missing or corrupt sidecar only costs a rebuild
+        source = {}
+    if not isinstance(source, dict):
+        source = {}
+    stat = os.stat(file_path)
+    content_hash = source_content_hash(file_path, {source_key: source} if source.get('path') == source_key else {})
+    rules_hash = cleaning_rules_hash()
+    if source.get('sha256') == content_hash and source.get('rules') == rules_hash and os.path.exists(cube_path):
+        print("Aggregate cube loaded.")
+        return load_cube(cube_path)
+
+    data = load_cleaned_dataset(file_path, use_cache=use_cache)
+    if data is None:
+        return None
+    cube = build_cube(data)
+    save_cube(cube, cube_path, {
+        'path': source_key,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': content_hash,
+        'rules': rules_hash,
+    })
+    print(f"Aggregate cube built with {len(cube)} cells.")
+    return cube
+
+if __name__ == '__main__':
+    cube = load_or_build_cube()
+    if cube is not None:
+        print(rollup(cube, ['attacktype1_txt']).to_string())
@@ -0,0 +1,89 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+# Defaults of the bootstrap engine
+DEFAULT_RESAMPLES = 10_000
+DEFAULT_BATCH_SIZE = 1_000
+
+def value_histograms(data, group_column='attacktype1_txt', value_column='nkill'):
+    """
+    Returns group -> (distinct values, counts) of the value column, sorted by group.
+
+    A group's resamples only depend on this histogram, so the rows themselves never have to be
+    copied or shipped to the worker processes.
+    """
+    filtered_data = data[[group_column, value_column]].dropna()
+    histograms = {}
+    for group, values in filtered_data.groupby(group_column, observed=True, sort=True)[value_column]:
+        distinct, counts = np.unique(values.to_numpy(), return_counts=True)
+        histograms[group] = (distinct.astype('float64'), counts.astype('int64'))
+    return histograms
+
+def bootstrap_means(values, counts, n_resamples=DEFAULT_RESAMPLES, batch_size=DEFAULT_BATCH_SIZE, seed=None):
+    """
+    Draws n_resamples bootstrap means of the sample described by a (values, counts) histogram.
+
+    Each resample is a multinomial count vector over the distinct values, so a batch costs
+    batch_size x len(values) draws rather than batch_size x sample size.
+    """
+    rng = np.random.default_rng(seed)
+    n = int(counts.sum())
+    probabilities = counts / n
+    means = np.empty(n_resamples)
+    for start in range(0, n_resamples, batch_size):
+        size = min(batch_size, n_resamples - start)
+        draws = rng.multinomial(n, probabilities, size=size)
+        means[start:start + size] = draws @ values / n
+    return means
+
+def _bootstrap_interval(values, counts, n_resamples, batch_size, seed, confidence):
+    means = bootstrap_means(values, counts, n_resamples, batch_size, seed)
+    alpha = (1 - confidence) / 2
+    return np.quantile(means, [alpha, 1 - alpha])
+
+def bootstrap_confidence_intervals(data, group_column='attacktype1_txt', value_column='nkill',
+                                   n_resamples=DEFAULT_RESAMPLES, confidence=0.95, seed=0, workers=None,
+                                   batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Returns the mean, count, std and percentile bootstrap confidence interval of the value column per group.
+
+    Every group gets its own child of SeedSequence(seed), so the result is reproducible and does not
+    depend on how the groups are spread over the `workers` processes (workers=1 runs in this process).
+    """
+    histograms = value_histograms(data, group_column, value_column)
+    # Groups with a single data point have no sampling variability to resample
+    histograms = {group: histogram for group, histogram in histograms.items() if histogram[1].sum() > 1}
+    groups = list(histograms)
+    seeds = np.random.SeedSequence(seed).spawn(len(groups))
+    jobs = [(*histograms[group], n_resamples, batch_size, child, confidence) for group, child in zip(groups, seeds)]
+
+    if workers == 1 or len(jobs) <= 1:
+        intervals = [_bootstrap_interval(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            intervals = list(pool.map(_bootstrap_interval, *zip(*jobs)))
+
+    rows = []
+    for group, (lower, upper) in zip(groups, intervals):
+        values, counts = histograms[group]
+        n = counts.sum()
+        mean = counts @ values / n
+        rows.append({
+            group_column: group,
+            'mean': mean,
+            'count': int(n),
+            'std': np.sqrt(counts @ (values - mean) ** 2 / (n - 1)),
+            'ci_lower': lower,
+            'ci_upper': upper,
+        })
+    return pd.DataFrame(rows, columns=[group_column, 'mean', 'count', 'std', 'ci_lower', 'ci_upper'])
+
+if __name__ == '__main__':
+    try:
+        from dataset_cache import load_cleaned_dataset
+    except ImportError:
+        from scripts.dataset_cache import load_cleaned_dataset
+    cleaned_data = load_cleaned_dataset()
+    if cleaned_data is not None:
+        print(bootstrap_confidence_intervals(cleaned_data).to_string(index=False))
@@ -0,0 +1,141 @@
+import hashlib
+import inspect
+import json
+import os
+import sys
+import pandas as pd
+
+try:
+    from dataset_loader import DATASET_PATH, load_dataset
+    from dataset_cleaner import clean_dataset
+    from instrumentation import stage
+except ImportError:
+    from scripts.dataset_loader import DATASET_PATH, load_dataset
+    from scripts.dataset_cleaner import clean_dataset
+    from scripts.instrumentation import stage
+
+# Directory holding the cleaned snapshots and their manifest
+CACHE_DIR = 'Terrorism_Analysis_Project/dataset/.cache'
+MANIFEST_NAME = 'manifest.json'
+
+def hash_file(file_path, block_size=1 << 20):
+    """
+    Returns the SHA-256 hex digest of a file, read in blocks so large CSVs are never held in memory.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def cleaning_rules_hash():
+    """
+    Returns a digest of the cleaning module source, so any edit to the cleaning rules invalidates the cache.
+    """
+    source = inspect.getsource(sys.modules[clean_dataset.__module__])
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+def _read_manifest(cache_dir):
+    manifest_path = os.path.join(cache_dir, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        # A corrupt manifest only costs a rebuild
+        return {}
+
+def _write_manifest(cache_dir, manifest):
+    manifest_path = os.path.join(cache_dir, MANIFEST_NAME)
+    temp_path = manifest_path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(temp_path, manifest_path)
+
+def source_content_hash(file_path, manifest):
+    """
+    Returns the content hash of the source CSV, reusing the manifest entry when size and mtime are unchanged.
+    """
+    stat = os.stat(file_path)
+    entry = manifest.get(os.path.abspath(file_path), {})
+    if entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns:
+        return entry['sha256']
+    return hash_file(file_path)
+
+def load_cleaned_dataset(file_path=DATASET_PATH, cache_dir=None, use_cache=True):
+    """
+    Returns the cleaned dataset, served from a Parquet snapshot keyed on the CSV content and cleaning rules.
+
+    The snapshot is rebuilt automatically whenever the source file or the cleaning module changes.
+    cache_dir defaults to CACHE_DIR. Pass use_cache=False to load and clean the CSV directly.
+    """
+    if cache_dir is None:
+        cache_dir = CACHE_DIR
+    if not use_cache:
+        raw_data = load_dataset(file_path)
+        return clean_dataset(raw_data) if raw_data is not None else None
+
+    if not os.path.exists(file_path):
+        print(f"File not found. Please check the file path: {file_path}")
+        return None
+
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = _read_manifest(cache_dir)
+    source_key = os.path.abspath(file_path)
+    stat = os.stat(file_path)
+    content_hash = source_content_hash(file_path, manifest)
+    rules_hash = cleaning_rules_hash()
+    snapshot_name = f"{content_hash[:16]}_{rules_hash[:12]}.parquet"
+    snapshot_path = os.path.join(cache_dir, snapshot_name)
+
+    entry = manifest.get(source_key, {})
+    if entry.get('snapshot') == snapshot_name and os.path.exists(snapshot_path):
+        try:
+            with stage('read_snapshot') as timing:
+                data = pd.read_parquet(snapshot_path)
+                timing.rows = len(data)
+            if entry.get('size') != stat.st_size or entry.get('mtime_ns') != stat.st_mtime_ns:
+                # Touched but unchanged file: refresh the fingerprint so the next call skips hashing
+                entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                _write_manifest(cache_dir, manifest)
+            print("Cleaned dataset loaded from cache.")
+            return data
+        except ImportError as e:
+            print(f"Dataset cache unavailable ({e}); loading without cache.")
+            return load_cleaned_dataset(file_path, use_cache=False)
+        except Exception as e:
+            print(f"Cached snapshot could not be read ({e}); rebuilding.")
+
+    raw_data = load_dataset(file_path)
+    if raw_data is None:
+        return None
+    data = clean_dataset(raw_data)
+
+    try:
+        temp_path = snapshot_path + '.tmp'
+        data.to_parquet(temp_path)
+        os.replace(temp_path, snapshot_path)
+    except ImportError as e:
+        print(f"Dataset cache unavailable ({e}); returning uncached data.")
+        return data
+
+    # Drop the snapshot this source pointed at before, unless another source still shares it
+    previous = entry.get('snapshot')
+    if previous and previous != snapshot_name:
+        still_used = any(other.get('snapshot') == previous
+                         for key, other in manifest.items() if key != source_key)
+        previous_path = os.path.join(cache_dir, previous)
+        if not still_used and os.path.exists(previous_path):
+            os.remove(previous_path)
+
+    manifest[source_key] = {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': content_hash,
+        'rules': rules_hash,
+        'snapshot': snapshot_name,
+    }
+    _write_manifest(cache_dir, manifest)
+    print("Cleaned dataset snapshot written to cache.")
+    return data
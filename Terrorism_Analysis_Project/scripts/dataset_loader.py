@@ -1,12 +1,84 @@
+import tracemalloc
 import pandas as pd
+try:
+    from instrumentation import peak_rss_mb, stage
+except ImportError:
+    from scripts.instrumentation import peak_rss_mb, stage
 
-def load_dataset(file_path='Terrorism_Analysis_Project/dataset/globalterrorismdatabase_1970_2020_F.csv'):
+# Default location of the Global Terrorism Database CSV
+DATASET_PATH = 'Terrorism_Analysis_Project/dataset/globalterrorismdatabase_1970_2020_F.csv'
+
+# Compact dtypes for the only columns the cleaner keeps; pass as `schema` to load_dataset.
+# 'string[pyarrow]' can be used instead of 'category' for the textual columns.
+# The integer columns are nullable so a blank cell is parsed as missing rather than failing the
+# whole load; clean_dataset drops or fills those rows and downcasts to plain int8/int16/int64.
+GTD_SCHEMA = {
+    'nkill': 'Int16',
+    'success': 'Int8',
+    'attacktype1_txt': 'category',
+    'iyear': 'Int16',
+    'region_txt': 'category',
+    'eventid': 'Int64',
+}
+
+# Rows parsed per chunk when load_dataset filters rows; only the matching rows of each chunk are kept
+FILTER_CHUNKSIZE = 100_000
+
+def row_filter_mask(frame, years=None, regions=None, attacktypes=None):
+    """
+    Returns a boolean mask of the rows within the (first, last) year range and among the given regions and attack types.
+
+    A filter left as None matches every row.
+    """
+    mask = pd.Series(True, index=frame.index)
+    if years is not None:
+        first, last = years
+        mask &= frame['iyear'].between(first, last)
+    if regions is not None:
+        mask &= frame['region_txt'].isin(regions)
+    if attacktypes is not None:
+        mask &= frame['attacktype1_txt'].isin(attacktypes)
+    return mask
+
+def load_dataset(file_path=DATASET_PATH, schema=None, report_memory=False, years=None, regions=None,
+                 attacktypes=None, chunksize=FILTER_CHUNKSIZE):
     """
     Loads the dataset from the given file path and returns it as a pandas DataFrame.
+
+    If a schema (column -> dtype mapping, e.g. GTD_SCHEMA) is given, only those columns are read
+    and they are parsed straight into the given dtypes. With report_memory=True the peak memory
+    used while loading is printed.
+
+    years (an inclusive (first, last) range), regions and attacktypes filter the rows as the CSV is
+    read in chunks, so only the matching rows are ever held in memory.
     """
     try:
-        data = pd.read_csv(file_path, low_memory=False)
+        if report_memory:
+            tracemalloc.start()
+        try:
+            with stage('load_dataset') as timing:
+                options = {'low_memory': False} if schema is None else {'usecols': list(schema), 'dtype': schema}
+                if years is None and regions is None and attacktypes is None:
+                    data = pd.read_csv(file_path, **options)
+                else:
+                    chunks = [chunk[row_filter_mask(chunk, years, regions, attacktypes)]
+                              for chunk in pd.read_csv(file_path, chunksize=chunksize, **options)]
+                    data = pd.concat(chunks, ignore_index=True)
+                    if schema is not None:
+                        # Chunks with different categories concatenate to object columns
+                        data = data.astype(schema)
+                if schema is not None:
+                    data = data[list(schema)]
+                timing.rows = len(data)
+        finally:
+            if report_memory:
+                _, traced_peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
         print("Dataset loaded successfully.")
+        if report_memory:
+            print(f"Peak memory during load: {traced_peak / (1024 * 1024):.1f} MB allocated, "
+                  f"{peak_rss_mb():.1f} MB process peak RSS, "
+                  f"{data.memory_usage(deep=True).sum() / (1024 * 1024):.1f} MB resident frame.")
         return data
     except FileNotFoundError:
         print(f"File not found. Please check the file path: {file_path}")
@@ -0,0 +1,101 @@
+import functools
+import inspect
+import json
+import os
+import sys
+
+# Each figure gets a sidecar next to it, e.g. Boxplot_of_Residuals.render.json
+SIDECAR_SUFFIX = '.render.json'
+
+# Set by set_force() to re-render every figure regardless of its sidecar
+_force = False
+
+def set_force(enabled=True):
+    """
+    Makes every cached figure function render even when an identical PNG exists.
+    """
+    global _force
+    _force = enabled
+
+def pyplot():
+    """
+    Returns matplotlib.pyplot, imported on first use with the Agg backend unless a backend was already chosen.
+
+    The analysis scripts only ever save figures to files, so they never need an interactive backend.
+    """
+    import matplotlib
+    if 'matplotlib.pyplot' not in sys.modules and 'MPLBACKEND' not in os.environ:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+def _hashing():
+    # The hashing helpers pull in pandas, so they are imported at the first render rather than with the scripts
+    try:
+        from dataset_cache import hash_file
+        from results_store import input_hash
+    except ImportError:
+        from scripts.dataset_cache import hash_file
+        from scripts.results_store import input_hash
+    return hash_file, input_hash
+
+def sidecar_path(figure_path):
+    """
+    Returns the path of the sidecar that records the render key and PNG digest of a figure.
+    """
+    return os.path.splitext(figure_path)[0] + SIDECAR_SUFFIX
+
+def style_digest():
+    """
+    Returns the matplotlib version and a digest of the rcParams that can change a saved figure.
+    """
+    import matplotlib
+    _, input_hash = _hashing()
+    # The backend does not change the saved PNG, so render workers using Agg share keys with this process
+    params = sorted((key, repr(value)) for key, value in matplotlib.rcParams.items() if not key.startswith('backend'))
+    return {'matplotlib': matplotlib.__version__, 'rcparams': input_hash([params])}
+
+def render_key(plot, inputs):
+    """
+    Returns the digest of a figure's input tables, the source of its plot function and the matplotlib style.
+    """
+    _, input_hash = _hashing()
+    return input_hash(inputs, {'plot': f'{plot.__module__}.{plot.__qualname__}',
+                               'source': inspect.getsource(plot), **style_digest()})
+
+def is_current(figure_path, key):
+    """
+    Returns True if the figure exists and is the PNG its sidecar recorded for this render key.
+    """
+    hash_file, _ = _hashing()
+    try:
+        with open(sidecar_path(figure_path), 'r') as f:
+            sidecar = json.load(f)
+        return sidecar.get('key') == key and sidecar.get('png_sha256') == hash_file(figure_path)
+    except (OSError, ValueError):
+        # A missing figure or sidecar, or a corrupt sidecar, only costs a render
+        return False
+
+def cached_figure(plot):
+    """
+    Decorates a plot function taking its input tables and a figure_path, so it skips rendering when the
+    figure already holds the PNG rendered from identical inputs, plot source and matplotlib style.
+
+    The decorated function also accepts force=True to render regardless.
+    """
+    signature = inspect.signature(plot)
+
+    @functools.wraps(plot)
+    def render(*args, force=False, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        figure_path = bound.arguments['figure_path']
+        inputs = [value for name, value in bound.arguments.items() if name != 'figure_path']
+        key = render_key(plot, inputs)
+        if not (force or _force) and is_current(figure_path, key):
+            return
+        plot(*bound.args, **bound.kwargs)
+        hash_file, _ = _hashing()
+        with open(sidecar_path(figure_path), 'w') as f:
+            json.dump({'key': key, 'png_sha256': hash_file(figure_path), **style_digest()}, f, indent=2)
+    return render
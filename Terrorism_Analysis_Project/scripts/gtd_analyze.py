@@ -0,0 +1,155 @@
+import argparse
+import contextlib
+
+try:
+    from pipeline import STAGES, outputs_in, run_pipeline
+except ImportError:
+    from scripts.pipeline import STAGES, outputs_in, run_pipeline
+
+# Filtered queries write their figures and statistics here unless an output directory is given,
+# so they never overwrite the full-dataset results in figures_and_statistics/
+FILTERED_OUTPUT_DIR = 'Terrorism_Analysis_Project/figures_and_statistics/filtered'
+
+def parse_years(text):
+    """
+    Parses a year ('2001') or an inclusive year range ('1990-2000') into a (first, last) pair.
+    """
+    try:
+        first, separator, last = text.partition('-')
+        years = (int(first), int(last if separator else first))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a year or a range such as 1990-2000, not {text!r}")
+    if years[0] > years[1]:
+        raise argparse.ArgumentTypeError(f"the range {text!r} ends before it starts")
+    return years
+
+def load_filtered_dataset(years=None, regions=None, attacktypes=None, source='csv', file_path=None, store_dir=None):
+    """
+    Returns the cleaned rows within the year range and among the given regions and attack types.
+
+    With source='csv' the filters are applied to each chunk as the CSV is read, and only the columns
+    the analyses use are parsed. With source='partitions' only the partitions of the selected years
+    are read, and the region and attack type filters are pushed down to the Parquet reader.
+    Returns None if the data could not be loaded.
+    """
+    if source == 'partitions':
+        try:
+            from partition_store import PARTITION_DIR, load_partitions, read_manifest
+        except ImportError:
+            from scripts.partition_store import PARTITION_DIR, load_partitions, read_manifest
+        store_dir = store_dir or PARTITION_DIR
+        if not read_manifest(store_dir):
+            print(f"No partitioned store found in {store_dir}; build it with partition_store.py first.")
+            return None
+        selected_years = None if years is None else range(years[0], years[1] + 1)
+        return load_partitions(store_dir, years=selected_years, regions=regions, attacktypes=attacktypes)
+    if source != 'csv':
+        raise ValueError(f"source must be 'csv' or 'partitions', not {source!r}")
+
+    try:
+        from dataset_loader import DATASET_PATH, GTD_SCHEMA, load_dataset
+        from dataset_cleaner import clean_dataset
+    except ImportError:
+        from scripts.dataset_loader import DATASET_PATH, GTD_SCHEMA, load_dataset
+        from scripts.dataset_cleaner import clean_dataset
+    raw_data = load_dataset(file_path or DATASET_PATH, schema=GTD_SCHEMA, years=years, regions=regions,
+                            attacktypes=attacktypes)
+    if raw_data is None:
+        return None
+    return clean_dataset(raw_data)
+
+def matching_text(data, query, file_path=None, index_dir=None):
+    """
+    Returns the rows of data whose summary, motive or weapon detail match a text query (see TextIndex.search).
+
+    The text index of the CSV is built on first use and rebuilt when the CSV changes.
+    Returns None if the index could not be built.
+    """
+    try:
+        from dataset_loader import DATASET_PATH
+        from text_index import INDEX_DIR, load_or_build_index
+    except ImportError:
+        from scripts.dataset_loader import DATASET_PATH
+        from scripts.text_index import INDEX_DIR, load_or_build_index
+    text_index = load_or_build_index(file_path or DATASET_PATH, index_dir or INDEX_DIR)
+    if text_index is None:
+        return None
+    return data[data['eventid'].isin(text_index.search(query))]
+
+def analyze(stages=None, years=None, regions=None, attacktypes=None, source='csv', file_path=None, store_dir=None,
+            output_dir=None, force_render=False, text=None, index_dir=None):
+    """
+    Runs the selected analyses (all by default) on the incidents matching the filters.
+
+    text is a query over the incident summaries, motives and weapon details, such as
+    '"car bomb" AND (market OR bazaar)', answered from the text index in index_dir.
+
+    Figures and statistics go to output_dir, which defaults to FILTERED_OUTPUT_DIR when any filter is
+    given and to figures_and_statistics/ otherwise. A stage whose test cannot run on the filtered data
+    (e.g. Welch's ANOVA with a single incident of some attack type) is skipped with a message.
+
+    Returns a dict of stage name -> stage result, or None if no data could be loaded.
+    """
+    selected = list(STAGES) if not stages else list(stages)
+    unknown = [name for name in selected if name not in STAGES]
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {', '.join(unknown)}. Available stages: {', '.join(STAGES)}")
+
+    data = load_filtered_dataset(years, regions, attacktypes, source, file_path, store_dir)
+    if data is not None and text is not None:
+        data = matching_text(data, text, file_path, index_dir)
+    if data is None:
+        return None
+    if data.empty:
+        print("No incidents match the filters.")
+        return None
+    print(f"{len(data)} incident(s) match the filters.")
+
+    results = {}
+    filtered = years is not None or regions is not None or attacktypes is not None or text is not None
+    if output_dir is None and filtered:
+        output_dir = FILTERED_OUTPUT_DIR
+    with outputs_in(output_dir, selected) if output_dir else contextlib.nullcontext():
+        for name in selected:
+            try:
+                results.update(run_pipeline([name], data=data, force_render=force_render))
+            except ValueError as e:
+                print(f"Stage {name} skipped: {e}")
+    if output_dir:
+        print(f"Figures and statistics written to {output_dir}")
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the terrorism analyses on a filtered subset of the GTD.")
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), metavar='STAGE',
+                        help=f"Analyses to run (default: all). Choices: {', '.join(STAGES)}")
+    parser.add_argument('--years', type=parse_years, default=None, metavar='FIRST[-LAST]',
+                        help="Year or inclusive year range, e.g. 2001 or 1990-2000.")
+    parser.add_argument('--region', nargs='+', default=None, metavar='REGION',
+                        help="Regions to keep, e.g. 'South Asia' 'Middle East & North Africa'.")
+    parser.add_argument('--attacktype', nargs='+', default=None, metavar='ATTACKTYPE',
+                        help="Attack types to keep, e.g. 'Bombing/Explosion'.")
+    parser.add_argument('--text', default=None, metavar='QUERY',
+                        help="Text query over summaries, motives and weapon details, e.g. "
+                             "'\"car bomb\" AND (market OR bazaar) AND NOT motive:unknown'.")
+    parser.add_argument('--source', choices=['csv', 'partitions'], default='csv',
+                        help="Read the GTD CSV (default) or the year-partitioned store.")
+    parser.add_argument('--file-path', default=None, help="Path to the GTD CSV file.")
+    parser.add_argument('--store-dir', default=None, help="Directory of the partitioned store.")
+    parser.add_argument('--index-dir', default=None, help="Directory of the text index.")
+    parser.add_argument('--output-dir', default=None,
+                        help=f"Directory of the figures and statistics (default: {FILTERED_OUTPUT_DIR} "
+                             "when filtering, figures_and_statistics/ otherwise).")
+    parser.add_argument('--force-render', action='store_true',
+                        help="Re-render every figure, even when an identical PNG already exists.")
+    args = parser.parse_args(argv)
+    try:
+        results = analyze(args.stages, args.years, args.region, args.attacktype, args.source, args.file_path,
+                          args.store_dir, args.output_dir, args.force_render, args.text, args.index_dir)
+    except ValueError as e:
+        # A malformed text query is reported like any other invalid argument
+        parser.error(str(e))
+    return 0 if results is not None else 1
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,238 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from dataset_loader import DATASET_PATH
+    from dataset_cleaner import RELEVANT_COLUMNS
+    from streaming_stats import DEFAULT_CHUNKSIZE, iter_clean_chunks
+except ImportError:
+    from scripts.dataset_loader import DATASET_PATH
+    from scripts.dataset_cleaner import RELEVANT_COLUMNS
+    from scripts.streaming_stats import DEFAULT_CHUNKSIZE, iter_clean_chunks
+
+# High-cardinality columns whose most frequent values are tracked: perpetrator group and target type
+ITEM_COLUMNS = ['gname', 'targtype1_txt']
+
+# What an item is ranked by: its number of incidents or its total fatalities
+MEASURES = ('incidents', 'nkill')
+
+# Every (year, region) slice gets its own sketches, so any set of years and regions is a merge away
+SLICE_COLUMNS = ['iyear', 'region_txt']
+
+# Counters kept per sketch; the error of any count is at most total / (capacity + 1)
+DEFAULT_CAPACITY = 64
+
+class HeavyHitterSketch:
+    """
+    Mergeable Space-Saving summary (in its Misra-Gries form) of the weights of a stream of items.
+
+    At most `capacity` counters are kept. A counter never exceeds its item's true weight, and falls short of it
+    by at most `offset`, which stays below total / (capacity + 1); unmonitored items weigh at most `offset`.
+    Sketches built over different chunks, files or processes can be merged in any order with the same bound.
+    With capacity=None every item is counted exactly, for validation.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        if capacity is not None and capacity < 1:
+            raise ValueError("capacity must be at least 1, or None for exact counts")
+        self.capacity = capacity
+        self.counts = pd.Series(dtype='float64')
+        self.offset = 0.0
+        self.total = 0.0
+
+    def update(self, items, weights=None):
+        """
+        Folds one chunk of items (with their weights, 1 each by default) into the sketch and returns self.
+
+        The chunk is counted exactly first, so the cost is one group-by per chunk rather than one step per row.
+        Missing items and non-positive weights are ignored.
+        """
+        weights = np.ones(len(items)) if weights is None else np.asarray(weights, dtype='float64')
+        chunk = pd.Series(weights).groupby(np.asarray(items, dtype=object), dropna=True).sum()
+        chunk = chunk[chunk > 0]
+        return self.merge(self.from_counts(chunk, self.capacity))
+
+    @classmethod
+    def from_counts(cls, counts, capacity=DEFAULT_CAPACITY):
+        """
+        Returns a sketch of exact per-item weights (a Series indexed by item).
+        """
+        sketch = cls(capacity)
+        sketch.counts = counts.astype('float64')
+        sketch.total = float(counts.sum())
+        sketch._prune()
+        return sketch
+
+    def merge(self, other):
+        """
+        Merges another sketch into this one and returns self.
+        """
+        self.counts = self.counts.add(other.counts, fill_value=0.0)
+        self.offset += other.offset
+        self.total += other.total
+        self._prune()
+        return self
+
+    @classmethod
+    def combine(cls, sketches, capacity=DEFAULT_CAPACITY):
+        """
+        Returns the merge of many sketches at once, with a single pruning step (same bound as pairwise merges).
+        """
+        sketches = list(sketches)
+        merged = cls(capacity)
+        if sketches:
+            merged.counts = pd.concat([sketch.counts for sketch in sketches]).groupby(level=0).sum()
+            merged.offset = float(sum(sketch.offset for sketch in sketches))
+            merged.total = float(sum(sketch.total for sketch in sketches))
+            merged._prune()
+        return merged
+
+    def _prune(self):
+        # Subtracting the (capacity + 1)-th largest counter from every counter removes at least capacity + 1
+        # times that amount from the counted weight, which is what bounds the offset
+        if self.capacity is None or len(self.counts) <= self.capacity:
+            return
+        values = self.counts.to_numpy()
+        cut = np.partition(values, len(values) - self.capacity - 1)[len(values) - self.capacity - 1]
+        self.counts = self.counts[values > cut] - cut
+        self.offset += cut
+
+    def estimate(self, item):
+        """
+        Returns the (lower, upper) bounds of an item's weight.
+        """
+        count = float(self.counts.get(item, 0.0))
+        return count, count + self.offset
+
+    def top(self, n=10):
+        """
+        Returns the n heaviest items with the lower and upper bounds of their weights, heaviest first.
+
+        An item is `guaranteed` when its lower bound reaches the upper bound of every item left out,
+        so it is in the true top n whatever the error. attrs holds the total weight and the maximum error.
+        """
+        bounds = pd.DataFrame({'lower': self.counts, 'upper': self.counts + self.offset})
+        bounds = bounds.rename_axis('item').reset_index()
+        bounds = bounds.sort_values(['upper', 'item'], ascending=[False, True], kind='stable')
+        top, rest = bounds.iloc[:n], bounds.iloc[n:]
+        # Items outside the top n, monitored or not, weigh at most this much
+        threshold = max(rest['upper'].max() if not rest.empty else 0.0, self.offset)
+        top = top.assign(guaranteed=top['lower'] >= threshold).set_index('item')
+        top.attrs['total'] = self.total
+        top.attrs['max_error'] = self.offset
+        return top
+
+class SlicedHeavyHitters:
+    """
+    Heavy-hitter sketches of one item column and measure for every (year, region) slice.
+
+    top() merges the sketches of the selected slices, so the top items of any years and regions are
+    answered without another pass over the data.
+    """
+
+    def __init__(self, item_column, measure='incidents', capacity=DEFAULT_CAPACITY):
+        if measure not in MEASURES:
+            raise ValueError(f"measure must be one of {', '.join(MEASURES)}, not {measure!r}")
+        self.item_column = item_column
+        self.measure = measure
+        self.capacity = capacity
+        self.sketches = {}
+
+    def update(self, chunk):
+        """
+        Folds one cleaned chunk into the sketches of the slices it covers and returns self.
+        """
+        weights = np.ones(len(chunk)) if self.measure == 'incidents' else chunk[self.measure].to_numpy('float64')
+        grouped = pd.Series(weights, index=chunk.index).groupby(
+            [chunk[column] for column in SLICE_COLUMNS] + [chunk[self.item_column]], observed=True, dropna=True).sum()
+        grouped = grouped[grouped > 0]
+        if grouped.empty:
+            return self
+        # The group-by output is sorted by slice, so each slice is a contiguous run of items
+        slices = grouped.index.droplevel(-1)
+        items = grouped.index.get_level_values(-1).to_numpy(dtype=object)
+        values = grouped.to_numpy()
+        starts = np.flatnonzero(np.append(True, slices[1:] != slices[:-1]))
+        for start, end in zip(starts, np.append(starts[1:], len(grouped))):
+            key = slices[start]
+            sketch = HeavyHitterSketch.from_counts(pd.Series(values[start:end], index=items[start:end]), self.capacity)
+            if key in self.sketches:
+                self.sketches[key].merge(sketch)
+            else:
+                self.sketches[key] = sketch
+        return self
+
+    def merge(self, other):
+        """
+        Merges the sketches of another SlicedHeavyHitters of the same item column and measure, and returns self.
+        """
+        for key, sketch in other.sketches.items():
+            if key in self.sketches:
+                self.sketches[key].merge(sketch)
+            else:
+                self.sketches[key] = HeavyHitterSketch(self.capacity).merge(sketch)
+        return self
+
+    def sketch(self, years=None, regions=None):
+        """
+        Returns the merged sketch of the slices within the (first, last) year range and among the regions.
+        """
+        return HeavyHitterSketch.combine(
+            (sketch for (year, region), sketch in self.sketches.items()
+             if (years is None or years[0] <= year <= years[1]) and (regions is None or region in regions)),
+            self.capacity)
+
+    def top(self, n=10, years=None, regions=None):
+        """
+        Returns the top n items of the selected slices (see HeavyHitterSketch.top), indexed by the item column.
+        """
+        return self.sketch(years, regions).top(n).rename_axis(self.item_column)
+
+def stream_heavy_hitters(file_path=DATASET_PATH, capacity=DEFAULT_CAPACITY, chunksize=DEFAULT_CHUNKSIZE,
+                         item_columns=ITEM_COLUMNS, deduplicate=False):
+    """
+    Builds the sliced sketches of every item column and measure in one chunked pass over the CSV.
+
+    Memory stays bounded by the chunk size and the sketches: duplicate eventids are dropped within each chunk
+    only. deduplicate=True also drops incidents repeated across chunks (see iter_clean_chunks), at the cost
+    of keeping every eventid seen in memory.
+
+    Returns a dict of (item column, measure) -> SlicedHeavyHitters, or None if the file cannot be read.
+    """
+    sketches = {(column, measure): SlicedHeavyHitters(column, measure, capacity)
+                for column in item_columns for measure in MEASURES}
+    rows = 0
+    try:
+        for chunk in iter_clean_chunks(file_path, chunksize=chunksize, columns=RELEVANT_COLUMNS + list(item_columns),
+                                       deduplicate=deduplicate):
+            rows += len(chunk)
+            for sliced in sketches.values():
+                sliced.update(chunk)
+    except FileNotFoundError:
+        print(f"File not found. Please check the file path: {file_path}")
+        return None
+    except Exception as e:
+        print(f"An error occurred while streaming the dataset: {e}")
+        return None
+    print(f"Streamed heavy-hitter sketches over {rows} cleaned rows.")
+    return sketches
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Top perpetrator groups and target types by incidents and fatalities.")
+    parser.add_argument('--file-path', default=DATASET_PATH, help="Path to the GTD CSV file.")
+    parser.add_argument('--capacity', type=int, default=DEFAULT_CAPACITY, help="Counters kept per sketch.")
+    parser.add_argument('--exact', action='store_true', help="Count every item exactly instead of sketching.")
+    parser.add_argument('--top', type=int, default=10, help="Number of items to list.")
+    parser.add_argument('--years', type=int, nargs=2, default=None, metavar=('FIRST', 'LAST'))
+    parser.add_argument('--region', nargs='+', default=None, metavar='REGION')
+    parser.add_argument('--deduplicate', action='store_true',
+                        help="Drop incidents repeated across chunks, keeping every eventid in memory.")
+    args = parser.parse_args()
+    results = stream_heavy_hitters(args.file_path, None if args.exact else args.capacity,
+                                   deduplicate=args.deduplicate)
+    for (column, measure), sliced in (results or {}).items():
+        top = sliced.top(args.top, args.years, args.region)
+        print(f"\n--- Top {column} by {measure} (max error {top.attrs['max_error']:g} "
+              f"of {top.attrs['total']:g}) ---")
+        print(top.to_string())
@@ -0,0 +1,181 @@
+import json
+import os
+import sys
+import time
+
+# Instrumentation is off unless enabled; disabled stages cost one function call and no measurement
+_enabled = False
+_records = []
+_active = []
+_origin = None
+
+def reset_peak_rss():
+    """
+    Resets the kernel's peak RSS counter for this process where supported (Linux), returning True on success.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def peak_rss_mb():
+    """
+    Returns the peak resident set size of this process in megabytes.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    # ru_maxrss is reported in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+class _DisabledStage:
+    """Stand-in returned by stage() while instrumentation is off."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        # Row counts assigned inside a disabled stage are simply dropped
+        pass
+
+_DISABLED_STAGE = _DisabledStage()
+
+class _Stage:
+    """A measured stage: wall time, CPU time, peak RSS and row count."""
+
+    def __init__(self, name, rows):
+        self.name = name
+        self.rows = rows
+        self.child_peak = 0.0
+
+    def __enter__(self):
+        self.depth = len(_active)
+        self.parent = _active[-1].name if _active else None
+        if _active:
+            # The parent's peak so far is lost when the counter is reset below
+            _active[-1].child_peak = max(_active[-1].child_peak, peak_rss_mb())
+        _active.append(self)
+        reset_peak_rss()
+        self.started_wall = time.perf_counter()
+        self.started_cpu = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.started_wall
+        cpu = time.process_time() - self.started_cpu
+        # A nested stage resets the peak counter, so a parent also takes the peaks of its children
+        peak = max(peak_rss_mb(), self.child_peak)
+        _active.pop()
+        if _active:
+            _active[-1].child_peak = max(_active[-1].child_peak, peak)
+        _records.append({
+            'stage': self.name,
+            'parent': self.parent,
+            'depth': self.depth,
+            'start': self.started_wall - _origin,
+            'wall_seconds': wall,
+            'cpu_seconds': cpu,
+            'peak_rss_mb': peak,
+            'rows': None if self.rows is None else int(self.rows),
+            'failed': exc_type is not None,
+        })
+        return False
+
+def stage(name, rows=None):
+    """
+    Returns a context manager that records the wall time, CPU time, peak RSS and rows of a pipeline stage.
+
+    The row count can also be set inside the block (`with stage('load') as timing: ... timing.rows = n`).
+    While instrumentation is disabled this returns a shared no-op object.
+    """
+    if not _enabled:
+        return _DISABLED_STAGE
+    return _Stage(name, rows)
+
+def enable(reset=True):
+    """
+    Turns instrumentation on, by default discarding earlier records.
+    """
+    global _enabled, _origin
+    if reset:
+        _records.clear()
+    if _origin is None or reset:
+        _origin = time.perf_counter()
+    _enabled = True
+
+def disable():
+    """
+    Turns instrumentation off; recorded stages are kept until the next enable().
+    """
+    global _enabled
+    _enabled = False
+
+def is_enabled():
+    return _enabled
+
+def records():
+    """
+    Returns the recorded stages in completion order.
+    """
+    return list(_records)
+
+def summary_table(stage_records=None):
+    """
+    Returns the recorded stages as a DataFrame in start order, indented by nesting depth.
+    """
+    import pandas as pd
+    stage_records = records() if stage_records is None else stage_records
+    columns = ['stage', 'wall_seconds', 'cpu_seconds', 'peak_rss_mb', 'rows']
+    if not stage_records:
+        return pd.DataFrame(columns=columns)
+    table = pd.DataFrame(stage_records).sort_values('start', kind='stable')
+    table['stage'] = ['  ' * depth + name for depth, name in zip(table['depth'], table['stage'])]
+    return table[columns].reset_index(drop=True)
+
+def format_summary(stage_records=None):
+    """
+    Returns the human-readable summary table of the recorded stages.
+    """
+    table = summary_table(stage_records)
+    if table.empty:
+        return "No stages recorded."
+    table['rows'] = table['rows'].map(lambda rows: '' if rows is None or rows != rows else f'{int(rows):,}')
+    return table.to_string(index=False, formatters={
+        'stage': lambda name: name.ljust(table['stage'].str.len().max()),
+        'wall_seconds': '{:.3f}'.format,
+        'cpu_seconds': '{:.3f}'.format,
+        'peak_rss_mb': '{:.1f}'.format,
+    })
+
+def write_trace(trace_path, stage_records=None):
+    """
+    Writes the recorded stages to a JSON trace.
+
+    The file holds the raw stage records and the same stages as Chrome trace events, so it can also
+    be opened in chrome://tracing or Perfetto.
+    """
+    stage_records = records() if stage_records is None else stage_records
+    events = [{
+        'name': record['stage'],
+        'ph': 'X',
+        'ts': record['start'] * 1e6,
+        'dur': record['wall_seconds'] * 1e6,
+        'pid': os.getpid(),
+        'tid': 0,
+        'args': {key: record[key] for key in ('cpu_seconds', 'peak_rss_mb', 'rows')},
+    } for record in stage_records]
+    os.makedirs(os.path.dirname(trace_path) or '.', exist_ok=True)
+    with open(trace_path, 'w') as f:
+        json.dump({'stages': stage_records, 'traceEvents': events}, f, indent=2)
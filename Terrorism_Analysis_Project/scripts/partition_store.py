@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import shutil
+import pandas as pd
+
+try:
+    from dataset_loader import DATASET_PATH, load_dataset
+    from dataset_cleaner import RELEVANT_COLUMNS, TEXT_COLUMNS, clean_dataset
+    from aggregate_cube import CUBE_DIMENSIONS, build_cube, rollup
+except ImportError:
+    from scripts.dataset_loader import DATASET_PATH, load_dataset
+    from scripts.dataset_cleaner import RELEVANT_COLUMNS, TEXT_COLUMNS, clean_dataset
+    from scripts.aggregate_cube import CUBE_DIMENSIONS, build_cube, rollup
+
+# Root of the year-partitioned store: one iyear=YYYY directory per year plus the combined cube
+PARTITION_DIR = 'Terrorism_Analysis_Project/dataset/partitions'
+MANIFEST_NAME = 'manifest.json'
+COMBINED_CUBE_NAME = 'cube.parquet'
+
+def partition_path(store_dir, year, name='data.parquet'):
+    """
+    Returns the path of a file inside the partition of the given year.
+    """
+    return os.path.join(store_dir, f'iyear={int(year)}', name)
+
+def partition_digest(rows):
+    """
+    Returns a digest of a year's cleaned rows that is independent of their order in the CSV.
+    """
+    ordered = rows.sort_values('eventid', kind='stable')
+    row_hashes = pd.util.hash_pandas_object(ordered[RELEVANT_COLUMNS], index=False).to_numpy()
+    return hashlib.sha256(row_hashes.tobytes()).hexdigest()
+
+def read_manifest(store_dir):
+    """
+    Returns the store manifest (year -> row count and digest), empty for a new store.
+    """
+    manifest_path = os.path.join(store_dir, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, 'r') as f:
+        return json.load(f)
+
+def _write_manifest(store_dir, manifest):
+    manifest_path = os.path.join(store_dir, MANIFEST_NAME)
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+def _write_parquet(frame, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    frame.to_parquet(path + '.tmp', index=False)
+    os.replace(path + '.tmp', path)
+
+def diff_partition(stored, incoming):
+    """
+    Compares a stored and an incoming partition by eventid, returning the added, removed and modified counts.
+    """
+    stored_hashes = pd.Series(pd.util.hash_pandas_object(stored[RELEVANT_COLUMNS], index=False).to_numpy(),
+                              index=stored['eventid'].to_numpy())
+    incoming_hashes = pd.Series(pd.util.hash_pandas_object(incoming[RELEVANT_COLUMNS], index=False).to_numpy(),
+                                index=incoming['eventid'].to_numpy())
+    common = stored_hashes.index.intersection(incoming_hashes.index)
+    return {
+        'added': int((~incoming_hashes.index.isin(stored_hashes.index)).sum()),
+        'removed': int((~stored_hashes.index.isin(incoming_hashes.index)).sum()),
+        'modified': int((stored_hashes[common] != incoming_hashes[common]).sum()),
+    }
+
+def update_partitions(file_path=DATASET_PATH, store_dir=PARTITION_DIR):
+    """
+    Brings the year-partitioned store up to date with a (new release of the) GTD CSV.
+
+    Each year's cleaned rows are compared with the stored partition by eventid; only years that
+    were added, changed or removed are rewritten, together with their slice of the aggregate cube.
+    Returns a per-year report (status, rows, added, removed, modified), or None if the CSV cannot be loaded.
+    """
+    raw_data = load_dataset(file_path)
+    if raw_data is None:
+        return None
+    data = clean_dataset(raw_data)
+    # Plain strings keep every partition's schema identical whatever categories a load produced
+    data = data.assign(**{column: data[column].astype(str) for column in TEXT_COLUMNS})
+
+    os.makedirs(store_dir, exist_ok=True)
+    manifest = read_manifest(store_dir)
+    # Read the current combined cube before any partition is touched
+    combined = load_partition_cube(store_dir) if manifest else None
+    report = []
+    changed_cubes = {}
+
+    incoming_years = {int(year): rows for year, rows in data.groupby('iyear', sort=True)}
+    for year, rows in incoming_years.items():
+        entry = manifest.get(str(year))
+        digest = partition_digest(rows)
+        if entry is not None and entry['digest'] == digest:
+            report.append({'iyear': year, 'status': 'unchanged', 'rows': len(rows), 'added': 0, 'removed': 0, 'modified': 0})
+            continue
+        if entry is None:
+            status, counts = 'added', {'added': len(rows), 'removed': 0, 'modified': 0}
+        else:
+            status, counts = 'changed', diff_partition(pd.read_parquet(partition_path(store_dir, year)), rows)
+        rows = rows.sort_values('eventid', kind='stable')
+        _write_parquet(rows, partition_path(store_dir, year))
+        changed_cubes[year] = build_cube(rows)
+        _write_parquet(changed_cubes[year], partition_path(store_dir, year, 'cube.parquet'))
+        manifest[str(year)] = {'rows': len(rows), 'digest': digest}
+        report.append({'iyear': year, 'status': status, 'rows': len(rows), **counts})
+
+    for year in sorted(int(year) for year in manifest if int(year) not in incoming_years):
+        # A year missing from the new release is dropped from the store
+        shutil.rmtree(os.path.dirname(partition_path(store_dir, year)), ignore_errors=True)
+        report.append({'iyear': year, 'status': 'removed', 'rows': 0, 'added': 0,
+                       'removed': manifest.pop(str(year))['rows'], 'modified': 0})
+        changed_cubes[year] = None
+
+    if changed_cubes:
+        # Replace only the changed years' cells in the combined cube
+        if combined is not None:
+            combined = combined[~combined['iyear'].isin(list(changed_cubes))]
+        pieces = [combined] + [cube for cube in changed_cubes.values() if cube is not None]
+        pieces = [piece for piece in pieces if piece is not None and not piece.empty]
+        combined = pd.concat(pieces, ignore_index=True) if pieces else build_cube(data.iloc[:0])
+        combined = combined.sort_values(CUBE_DIMENSIONS, kind='stable').reset_index(drop=True)
+        _write_parquet(combined, os.path.join(store_dir, COMBINED_CUBE_NAME))
+    _write_manifest(store_dir, manifest)
+
+    report = pd.DataFrame(report, columns=['iyear', 'status', 'rows', 'added', 'removed', 'modified'])
+    report = report.sort_values('iyear').reset_index(drop=True)
+    rewritten = (report['status'] != 'unchanged').sum()
+    print(f"Partition store updated: {rewritten} of {len(report)} year(s) rewritten.")
+    return report
+
+def load_partitions(store_dir=PARTITION_DIR, years=None, regions=None, attacktypes=None):
+    """
+    Loads the cleaned rows of the stored years (all by default), reading only those partitions.
+
+    regions and attacktypes are pushed down to the Parquet reader, which skips row groups whose
+    statistics rule them out and drops the other non-matching rows before they reach pandas.
+    """
+    manifest = read_manifest(store_dir)
+    selected = sorted(int(year) for year in manifest)
+    if years is not None:
+        wanted = {int(year) for year in years}
+        selected = [year for year in selected if year in wanted]
+    filters = [(column, 'in', list(values)) for column, values in
+               (('region_txt', regions), ('attacktype1_txt', attacktypes)) if values is not None]
+    frames = [pd.read_parquet(partition_path(store_dir, year), filters=filters or None) for year in selected]
+    if not frames:
+        return pd.DataFrame(columns=RELEVANT_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+def load_partition_cube(store_dir=PARTITION_DIR):
+    """
+    Returns the combined aggregate cube of the store, reassembling it from the per-year cubes if needed.
+    """
+    combined_path = os.path.join(store_dir, COMBINED_CUBE_NAME)
+    if os.path.exists(combined_path):
+        return pd.read_parquet(combined_path)
+    cubes = [pd.read_parquet(partition_path(store_dir, year, 'cube.parquet'))
+             for year in sorted(int(year) for year in read_manifest(store_dir))]
+    if not cubes:
+        return None
+    combined = pd.concat(cubes, ignore_index=True)
+    _write_parquet(combined, combined_path)
+    return combined
+
+def yearly_fatalities(store_dir=PARTITION_DIR):
+    """
+    Returns total fatalities per year from the store's aggregate cube.
+    """
+    cube = load_partition_cube(store_dir)
+    if cube is None:
+        return pd.Series(dtype='int64', name='nkill')
+    return rollup(cube, ['iyear'])['nkill_sum'].rename('nkill')
+
+def group_statistics(dimensions, store_dir=PARTITION_DIR):
+    """
+    Returns the cube measures and derived statistics rolled up to the given dimensions.
+    """
+    cube = load_partition_cube(store_dir)
+    if cube is None:
+        return None
+    return rollup(cube, dimensions)
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Update the year-partitioned store from a GTD release.")
+    parser.add_argument('--file-path', default=DATASET_PATH, help="Path to the GTD CSV file.")
+    parser.add_argument('--store-dir', default=PARTITION_DIR, help="Directory of the partitioned store.")
+    args = parser.parse_args()
+    update_report = update_partitions(args.file_path, args.store_dir)
+    if update_report is not None:
+        print(update_report[update_report['status'] != 'unchanged'].to_string(index=False))
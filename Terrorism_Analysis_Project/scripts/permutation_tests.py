@@ -0,0 +1,171 @@
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import numpy as np
+import pandas as pd
+try:
+    from shared_frame import attach_arrays, shared_frame
+except ImportError:
+    from scripts.shared_frame import attach_arrays, shared_frame
+
+# Group comparisons tested by run_permutation_tests: name -> (group column, value column)
+PERMUTATION_TESTS = {
+    'attacktype_nkill': ('attacktype1_txt', 'nkill'),   # Fatalities by attack type (Welch's ANOVA)
+    'region_success': ('region_txt', 'success'),        # Success rate by region
+}
+
+# Defaults of the permutation engine
+DEFAULT_PERMUTATIONS = 10_000
+DEFAULT_BATCH_SIZE = 100
+# Upper bound on the labels shuffled at once (batch size x rows), which bounds the memory of a batch
+MAX_BATCH_CELLS = 4_000_000
+
+def clopper_pearson(successes, trials, confidence=0.99):
+    """
+    Returns the exact (Clopper-Pearson) confidence interval of a binomial proportion.
+    """
+    from scipy import stats
+    alpha = 1 - confidence
+    lower = stats.beta.ppf(alpha / 2, successes, trials - successes + 1) if successes > 0 else 0.0
+    upper = stats.beta.ppf(1 - alpha / 2, successes + 1, trials - successes) if successes < trials else 1.0
+    return float(lower), float(upper)
+
+def between_group_ss(codes, values, sizes):
+    """
+    Returns the between-group sum of squares of values grouped by integer codes, for one or a batch of labellings.
+
+    The grand total and group sizes do not change under permutation, so only the group sums have to be
+    recomputed; they come from a single bincount even for a whole batch of labellings.
+    """
+    codes = np.atleast_2d(codes)
+    batch, n = codes.shape
+    n_groups = sizes.size
+    offsets = (np.arange(batch) * n_groups)[:, None]
+    sums = np.bincount((codes + offsets).ravel(), weights=np.tile(values, batch),
+                       minlength=batch * n_groups).reshape(batch, n_groups)
+    total = values.sum()
+    return (sums ** 2 / sizes).sum(axis=1) - total ** 2 / n
+
+# Arrays of the labels and values seen by _count_exceedances in a pool worker
+_worker_data = {}
+
+def _init_worker(directory, sizes):
+    # Every worker maps the one published copy of the labels and values instead of receiving its own
+    arrays, _ = attach_arrays(directory)
+    _worker_data.update(codes=arrays['codes'], values=arrays['values'], sizes=sizes)
+
+def _count_exceedances(seed, size, observed, batch_size, data=None):
+    """
+    Shuffles the group labels `size` times with the given seed and counts statistics at least as large as observed.
+
+    data holds the codes, values and sizes; pool workers leave it out and use the arrays they attached.
+    """
+    data = _worker_data if data is None else data
+    codes, values, sizes = data['codes'], data['values'], data['sizes']
+    rng = np.random.default_rng(seed)
+    exceedances = 0
+    for start in range(0, size, batch_size):
+        shuffled = rng.permuted(np.broadcast_to(codes, (min(batch_size, size - start), codes.size)), axis=1)
+        statistics = between_group_ss(shuffled, values, sizes)
+        # A relative tolerance keeps ties with the observed labelling from being lost to rounding
+        exceedances += int((statistics >= observed - 1e-12 * abs(observed)).sum())
+    return exceedances
+
+def permutation_test(labels, values, n_permutations=DEFAULT_PERMUTATIONS, seed=0, workers=None,
+                     batch_size=DEFAULT_BATCH_SIZE, alpha=0.05, tolerance=None, confidence=0.99,
+                     min_permutations=1_000):
+    """
+    Tests whether the values differ between the groups of `labels` by permuting the labels.
+
+    The statistic is the between-group sum of squares, which ranks labellings exactly as the one-way
+    ANOVA F statistic does. Permutations run in blocks of batch_size, each block with its own child of
+    SeedSequence(seed), spread over `workers` processes (workers=1 runs in this process) that all map one
+    shared copy of the labels and values; the result depends only on the seed. After min_permutations,
+    the test stops early once the Clopper-Pearson interval of the p-value excludes alpha or is narrower
+    than tolerance (pass alpha=None and tolerance=None to always run all n_permutations).
+
+    Returns a dict with the observed statistic, permutations run, p-value, its confidence interval
+    and whether the test stopped early.
+    """
+    codes, categories = pd.factorize(np.asarray(labels, dtype=object), sort=True)
+    values = np.asarray(values, dtype='float64')
+    valid = codes >= 0
+    codes, values = codes[valid].astype('int64'), values[valid]
+    sizes = np.bincount(codes, minlength=len(categories)).astype('float64')
+
+    observed = float(between_group_ss(codes, values, sizes)[0])
+    batch_size = max(1, min(batch_size, MAX_BATCH_CELLS // max(codes.size, 1)))
+    blocks = [min(batch_size, n_permutations - start) for start in range(0, n_permutations, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(blocks))
+
+    def stop(exceedances, permutations):
+        if permutations < min_permutations:
+            return False
+        lower, upper = clopper_pearson(exceedances, permutations, confidence)
+        decided = alpha is not None and (upper < alpha or lower > alpha)
+        precise = tolerance is not None and (upper - lower) < tolerance
+        return decided or precise
+
+    exceedances = permutations = 0
+    stopped_early = False
+    pool = None
+    futures = []
+    published = contextlib.ExitStack()
+    if workers == 1:
+        # In this process the arrays are passed directly, so no module state outlives the test
+        data = {'codes': codes, 'values': values, 'sizes': sizes}
+        counts = (_count_exceedances(child, size, observed, batch_size, data) for child, size in zip(seeds, blocks))
+    else:
+        directory = published.enter_context(shared_frame(pd.DataFrame({'codes': codes, 'values': values})))
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(directory, sizes))
+        futures = [pool.submit(_count_exceedances, child, size, observed, batch_size)
+                   for child, size in zip(seeds, blocks)]
+        counts = (future.result() for future in futures)
+    try:
+        # Blocks are folded in order, so where the test stops does not depend on the number of workers
+        for size, count in zip(blocks, counts):
+            exceedances += count
+            permutations += size
+            if permutations < n_permutations and stop(exceedances, permutations):
+                stopped_early = True
+                break
+    finally:
+        # Blocks not yet started are no longer needed once the test has stopped
+        for future in futures:
+            future.cancel()
+        if pool is not None:
+            pool.shutdown()
+        published.close()
+
+    lower, upper = clopper_pearson(exceedances, permutations, confidence)
+    return {
+        'statistic': observed,
+        'n_groups': len(categories),
+        'permutations': permutations,
+        # Counting the observed labelling keeps the p-value valid (never exactly zero)
+        'p_value': (exceedances + 1) / (permutations + 1),
+        'p_lower': lower,
+        'p_upper': upper,
+        'stopped_early': stopped_early,
+    }
+
+def run_permutation_tests(data, tests=PERMUTATION_TESTS, **options):
+    """
+    Runs the permutation tests of the given group comparisons on the cleaned dataset.
+
+    Returns one row per test with its group and value columns and the results of permutation_test.
+    """
+    rows = []
+    for name, (group_column, value_column) in tests.items():
+        filtered_data = data[[group_column, value_column]].dropna()
+        result = permutation_test(filtered_data[group_column], filtered_data[value_column], **options)
+        rows.append({'test': name, 'groups': group_column, 'values': value_column, **result})
+    return pd.DataFrame(rows)
+
+if __name__ == '__main__':
+    try:
+        from dataset_cache import load_cleaned_dataset
+    except ImportError:
+        from scripts.dataset_cache import load_cleaned_dataset
+    cleaned_data = load_cleaned_dataset()
+    if cleaned_data is not None:
+        print(run_permutation_tests(cleaned_data).to_string(index=False))
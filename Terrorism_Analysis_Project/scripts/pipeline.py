@@ -0,0 +1,233 @@
+import argparse
+import contextlib
+import importlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Only lightweight modules are imported here; pandas and the analysis stack load with the stages that run
+try:
+    import instrumentation
+    import figure_cache
+except ImportError:
+    from scripts import instrumentation
+    from scripts import figure_cache
+
+# Registered analysis stages, in run order: stage name -> module exposing run(data, render) and render_tasks(result)
+STAGES = {
+    'confidence_interval': '95_ConfidenceInterval_Fatalities_By_Attacktype',
+    'attacktype_frequency': 'Attacktype_Frequency_And_Success',
+    'region_success': 'No_Incidents_And_Success_Rate_By_Region',
+    'model_fit': 'Terrorism_Fatalities_Over_Years_ModelFit',
+    'welch_anova': 'Welchs_ANOVA_Test',
+}
+
+# Execution backends of the aggregations: pandas on the cleaned rows, or SQL in an embedded DuckDB
+BACKENDS = ('pandas', 'duckdb')
+
+# Module attributes holding a stage's output paths
+OUTPUT_ATTRIBUTES = ('FIGURE_PATH', 'RESIDUALS_FIGURE_PATH', 'STATISTICS_FILE')
+
+def load_stage(name):
+    """
+    Imports and returns the module of a registered stage.
+    """
+    module_name = STAGES[name]
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        return importlib.import_module(f'scripts.{module_name}')
+
+@contextlib.contextmanager
+def outputs_in(output_dir, stages=None):
+    """
+    Temporarily points the figure and statistics paths of the given stages (all by default) into output_dir.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    previous = []
+    try:
+        for name in stages or STAGES:
+            stage = load_stage(name)
+            for attribute in OUTPUT_ATTRIBUTES:
+                if hasattr(stage, attribute):
+                    path = getattr(stage, attribute)
+                    previous.append((stage, attribute, path))
+                    setattr(stage, attribute, os.path.join(output_dir, os.path.basename(path)))
+        yield output_dir
+    finally:
+        for stage, attribute, path in reversed(previous):
+            setattr(stage, attribute, path)
+
+@contextlib.contextmanager
+def copy_on_write():
+    """
+    Switches on pandas Copy-on-Write while the stages share the cleaned frame, so no stage's changes leak
+    to the others, and restores the caller's setting afterwards.
+    """
+    import pandas as pd
+    # Copy-on-Write is always on from pandas 3.0; older versions need it switched on
+    if int(pd.__version__.split('.')[0]) >= 3:
+        yield
+        return
+    with pd.option_context('mode.copy_on_write', True):
+        yield
+
+def _init_render_worker(force_render):
+    # Workers only ever draw to files
+    import matplotlib
+    matplotlib.use('Agg')
+    figure_cache.set_force(force_render)
+
+def render_in_pool(tasks, workers=None, force_render=False):
+    """
+    Runs (plot function, arguments) render tasks across a process pool, one figure per task.
+    """
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker,
+                             initargs=(force_render,)) as pool:
+        futures = [pool.submit(plot, *args) for plot, args in tasks]
+        for future in futures:
+            # Re-raise any rendering error in the parent
+            future.result()
+
+def run_pipeline(stages=None, file_path=None, use_cache=False, data=None, parallel=False, workers=None,
+                 source='frame', stage_options=None, force_render=False, backend='pandas'):
+    """
+    Loads and cleans the dataset once, then runs the selected stages (all by default) on the shared frame.
+
+    With source='cube', stages that support it run from the persisted year x region x attack type
+    aggregate cube instead, and the cleaned frame is only loaded for stages that need the rows.
+
+    With backend='duckdb' the stages run from a cube whose group-bys are computed by SQL in an embedded
+    DuckDB, straight from the CSV (or a cleaned .parquet file or partition store directory given as
+    file_path), so the rows are never loaded into pandas; this implies source='cube'.
+
+    With parallel=True every stage's aggregate table is computed first in this process, and the
+    figures are then rendered in a pool of `workers` processes that receive only those aggregates.
+
+    stage_options maps a stage name to extra keyword arguments for its run function (e.g.
+    {'confidence_interval': {'method': 'bootstrap'}}); such stages always run on the cleaned rows.
+
+    Figures whose input tables, plot code and matplotlib style are unchanged are not re-rendered,
+    unless force_render=True.
+
+    file_path defaults to the GTD CSV at DATASET_PATH.
+
+    Returns a dict of stage name -> stage result, or None if the dataset could not be loaded.
+    """
+    selected = list(STAGES) if not stages else list(stages)
+    unknown = [name for name in selected if name not in STAGES]
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {', '.join(unknown)}. Available stages: {', '.join(STAGES)}")
+
+    if source not in ('frame', 'cube'):
+        raise ValueError(f"source must be 'frame' or 'cube', not {source!r}")
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {', '.join(BACKENDS)}, not {backend!r}")
+    stage_modules = {name: load_stage(name) for name in selected}
+    if file_path is None:
+        try:
+            from dataset_loader import DATASET_PATH
+        except ImportError:
+            from scripts.dataset_loader import DATASET_PATH
+        file_path = DATASET_PATH
+    stage_options = stage_options or {}
+
+    def from_cube(name):
+        return cube is not None and hasattr(stage_modules[name], 'run_from_cube') and not stage_options.get(name)
+
+    cube = None
+    if backend == 'duckdb':
+        try:
+            from sql_backend import build_cube
+        except ImportError:
+            from scripts.sql_backend import build_cube
+        cube = build_cube(file_path)
+        if cube is None:
+            return None
+    elif source == 'cube':
+        try:
+            from aggregate_cube import load_or_build_cube
+        except ImportError:
+            from scripts.aggregate_cube import load_or_build_cube
+        with instrumentation.stage('load_cube') as timing:
+            cube = load_or_build_cube(file_path, use_cache=use_cache)
+            timing.rows = None if cube is None else len(cube)
+        if cube is None:
+            return None
+
+    needs_frame = not all(from_cube(name) for name in stage_modules)
+    if data is None and needs_frame:
+        try:
+            from dataset_cache import load_cleaned_dataset
+        except ImportError:
+            from scripts.dataset_cache import load_cleaned_dataset
+        data = load_cleaned_dataset(file_path, use_cache=use_cache)
+        if data is None:
+            return None
+
+    results = {}
+    tasks = []
+    figure_cache.set_force(force_render)
+    try:
+        with copy_on_write() if data is not None else contextlib.nullcontext():
+            for name, stage in stage_modules.items():
+                print(f"Running stage: {name}")
+                if from_cube(name):
+                    results[name] = stage.run_from_cube(cube, render=not parallel)
+                else:
+                    results[name] = stage.run(data, render=not parallel, **stage_options.get(name, {}))
+                if parallel:
+                    tasks.extend(stage.render_tasks(results[name]))
+    finally:
+        figure_cache.set_force(False)
+
+    if tasks:
+        print(f"Rendering {len(tasks)} figure(s) in parallel.")
+        with instrumentation.stage('render_pool'):
+            render_in_pool(tasks, workers, force_render)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the terrorism analysis stages on a single load of the dataset.")
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), metavar='STAGE',
+                        help=f"Stages to run (default: all). Choices: {', '.join(STAGES)}")
+    parser.add_argument('--file-path', default=None,
+                        help="Path to the GTD CSV file (default: dataset/globalterrorismdatabase_1970_2020_F.csv).")
+    parser.add_argument('--cache', action='store_true', help="Serve the cleaned dataset from the snapshot cache.")
+    parser.add_argument('--parallel', action='store_true', help="Render the figures in a process pool.")
+    parser.add_argument('--workers', type=int, default=None, help="Number of render processes (default: CPU count).")
+    parser.add_argument('--source', choices=['frame', 'cube'], default='frame',
+                        help="Run the stages from the cleaned rows (default) or the aggregate cube.")
+    parser.add_argument('--backend', choices=list(BACKENDS), default='pandas',
+                        help="Compute the aggregations with pandas (default) or as SQL in an embedded DuckDB.")
+    parser.add_argument('--ci-method', choices=['normal', 'bootstrap'], default='normal',
+                        help="Confidence interval method of the confidence_interval stage (default: normal).")
+    parser.add_argument('--resamples', type=int, default=None, help="Bootstrap resamples per attack type.")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the bootstrap resamples.")
+    parser.add_argument('--force-render', action='store_true',
+                        help="Re-render every figure, even when an identical PNG already exists.")
+    parser.add_argument('--trace', default=None, metavar='PATH',
+                        help="Time every stage, print a summary table and write a JSON trace to PATH.")
+    args = parser.parse_args(argv)
+    stage_options = {}
+    if args.ci_method == 'bootstrap':
+        stage_options['confidence_interval'] = {'method': 'bootstrap', 'seed': args.seed, 'workers': args.workers}
+        if args.resamples is not None:
+            stage_options['confidence_interval']['n_resamples'] = args.resamples
+    if args.trace:
+        instrumentation.enable()
+    try:
+        with instrumentation.stage('pipeline'):
+            results = run_pipeline(args.stages, file_path=args.file_path, use_cache=args.cache,
+                                   parallel=args.parallel, workers=args.workers, source=args.source,
+                                   stage_options=stage_options, force_render=args.force_render,
+                                   backend=args.backend)
+    finally:
+        if args.trace:
+            instrumentation.disable()
+            instrumentation.write_trace(args.trace)
+            print(instrumentation.format_summary())
+            print(f"Stage trace written to {args.trace}")
+    return 0 if results is not None else 1
+
+if __name__ == '__main__':
+    raise SystemExit(main())
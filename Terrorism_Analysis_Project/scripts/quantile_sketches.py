@@ -0,0 +1,282 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from dataset_loader import DATASET_PATH
+    from streaming_stats import DEFAULT_CHUNKSIZE, iter_clean_chunks
+    from partition_store import PARTITION_DIR, load_partitions, read_manifest
+    from figure_cache import cached_figure, pyplot
+except ImportError:
+    from scripts.dataset_loader import DATASET_PATH
+    from scripts.streaming_stats import DEFAULT_CHUNKSIZE, iter_clean_chunks
+    from scripts.partition_store import PARTITION_DIR, load_partitions, read_manifest
+    from scripts.figure_cache import cached_figure, pyplot
+
+# Output path of the fatality boxplot rendered from the sketches
+FIGURE_PATH = 'Terrorism_Analysis_Project/figures_and_statistics/Fatalities_Boxplot_By_Attacktype.png'
+
+# Groups with a quantile sketch of their fatalities
+GROUP_COLUMNS = ['attacktype1_txt', 'region_txt', 'iyear']
+
+# Size of the top compactor; the rank error of a quantile is about 2 / k, so 200 gives about 1%
+DEFAULT_K = 200
+
+# Each compactor below the top holds this fraction of the one above it
+CAPACITY_DECAY = 2 / 3
+
+# Quantiles reported by quantile_summary
+SUMMARY_QUANTILES = {'p25': 0.25, 'median': 0.5, 'p75': 0.75, 'p99': 0.99}
+
+class KLLSketch:
+    """
+    Mergeable KLL quantile sketch of a stream of numbers (Karnin, Lang and Liberty, 2016).
+
+    Values are kept in compactors of growing weight: a full compactor is sorted and every other value
+    (from a random start) moves up one level with twice the weight. Memory stays under 3 * k values
+    however long the stream, and sketches built over different chunks or partitions merge level by level.
+    The minimum and maximum are exact; quantiles are within a rank error of about 2 / k.
+    """
+
+    def __init__(self, k=DEFAULT_K, seed=0):
+        if k < 2:
+            raise ValueError("k must be at least 2")
+        self.k = k
+        self.levels = [np.empty(0, dtype='float64')]
+        self.count = 0
+        self.min = np.nan
+        self.max = np.nan
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.count
+
+    def retained(self):
+        """
+        Returns the number of values held by the compactors.
+        """
+        return sum(level.size for level in self.levels)
+
+    def update(self, values):
+        """
+        Folds a chunk of values into the sketch and returns self. Missing values are ignored.
+        """
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        self.count += values.size
+        self.min = np.fmin(self.min, values.min())
+        self.max = np.fmax(self.max, values.max())
+        self.levels[0] = np.concatenate((self.levels[0], values))
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """
+        Merges another sketch into this one, level by level, and returns self.
+        """
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype='float64'))
+        for level, values in enumerate(other.levels):
+            self.levels[level] = np.concatenate((self.levels[level], values))
+        self.count += other.count
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        self._compress()
+        return self
+
+    def _capacity(self, level):
+        return max(int(np.ceil(self.k * CAPACITY_DECAY ** (len(self.levels) - level - 1))), 2)
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            values = self.levels[level]
+            if values.size > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype='float64'))
+                values = np.sort(values)
+                # An odd value out stays behind, so the promoted pairs keep the total weight exact
+                odd = values.size % 2
+                promoted = values[odd + self.rng.integers(2)::2]
+                self.levels[level] = values[:odd]
+                self.levels[level + 1] = np.concatenate((self.levels[level + 1], promoted))
+            level += 1
+
+    def weighted_values(self):
+        """
+        Returns the retained values in ascending order and their cumulative weights, which end at count.
+        """
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(level.size, 2 ** height, dtype='int64')
+                                  for height, level in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        return values[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        """
+        Returns the approximate q-quantile (a scalar or an array for an array of q) of the values seen.
+
+        q=0 and q=1 give the exact minimum and maximum. An empty sketch gives NaN.
+        """
+        q = np.asarray(q, dtype='float64')
+        if np.any((q < 0) | (q > 1)):
+            raise ValueError("quantiles must be between 0 and 1")
+        if self.count == 0:
+            return np.full(q.shape, np.nan)[()]
+        values, cumulative = self.weighted_values()
+        positions = np.minimum(np.searchsorted(cumulative, q * self.count, side='left'), values.size - 1)
+        result = np.where(q == 0, self.min, np.where(q == 1, self.max, values[positions]))
+        return result[()]
+
+    def rank(self, value):
+        """
+        Returns the approximate fraction of the values seen that are at most value.
+        """
+        if self.count == 0:
+            return np.nan
+        values, cumulative = self.weighted_values()
+        position = np.searchsorted(values, value, side='right')
+        return float(cumulative[position - 1] / self.count) if position else 0.0
+
+    def boxplot_stats(self, label=None, whis=1.5):
+        """
+        Returns the statistics of a Tukey boxplot as matplotlib's Axes.bxp takes them: quartiles, whiskers
+        at the most extreme values within whis * IQR of the box, and the retained values beyond as fliers.
+        """
+        q1, median, q3 = self.quantile([0.25, 0.5, 0.75])
+        low, high = q1 - whis * (q3 - q1), q3 + whis * (q3 - q1)
+        values = np.unique(np.concatenate(self.levels + [np.array([self.min, self.max])]))
+        inside = values[(values >= low) & (values <= high)]
+        return {
+            'label': label,
+            'med': median,
+            'q1': q1,
+            'q3': q3,
+            'whislo': inside.min() if inside.size else q1,
+            'whishi': inside.max() if inside.size else q3,
+            'fliers': values[(values < low) | (values > high)],
+        }
+
+def build_quantile_sketches(chunks, group_columns=GROUP_COLUMNS, value_column='nkill', k=DEFAULT_K, seed=0):
+    """
+    Builds a sketch of value_column for every group of every group column in one pass over the chunks.
+
+    Returns a dict of group column -> {group: KLLSketch}.
+    """
+    sketches = {column: {} for column in group_columns}
+    for chunk in chunks:
+        values = chunk[value_column].to_numpy('float64')
+        for column in group_columns:
+            codes, groups = pd.factorize(chunk[column], sort=True)
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(groups) + 1))
+            for code, group in enumerate(groups):
+                group = group.item() if isinstance(group, np.generic) else group
+                if group not in sketches[column]:
+                    sketches[column][group] = KLLSketch(k, seed)
+                sketches[column][group].update(values[order[bounds[code]:bounds[code + 1]]])
+    return sketches
+
+def merge_quantile_sketches(sketches, other):
+    """
+    Merges the sketches of `other` (as returned by build_quantile_sketches) into `sketches` and returns it.
+    """
+    for column, groups in other.items():
+        merged = sketches.setdefault(column, {})
+        for group, sketch in groups.items():
+            if group in merged:
+                merged[group].merge(sketch)
+            else:
+                merged[group] = KLLSketch(sketch.k).merge(sketch)
+    return sketches
+
+def stream_quantile_sketches(source='csv', file_path=DATASET_PATH, store_dir=PARTITION_DIR, k=DEFAULT_K,
+                             chunksize=DEFAULT_CHUNKSIZE, deduplicate=False):
+    """
+    Builds the fatality sketches of every attack type, region and year in one streaming pass.
+
+    source='csv' reads the CSV in chunks, dropping duplicate eventids within each chunk only so memory stays
+    bounded; deduplicate=True also drops incidents repeated across chunks (see iter_clean_chunks), at the
+    cost of keeping every eventid seen in memory. source='partitions' sketches the yearly partitions of the
+    store, which are deduplicated when written, one at a time and merges them.
+    Returns the sketches, or None if the data cannot be read.
+    """
+    if source not in ('csv', 'partitions'):
+        raise ValueError(f"source must be 'csv' or 'partitions', not {source!r}")
+    try:
+        if source == 'csv':
+            sketches = build_quantile_sketches(
+                iter_clean_chunks(file_path, chunksize=chunksize, deduplicate=deduplicate), k=k)
+        else:
+            sketches = {column: {} for column in GROUP_COLUMNS}
+            for year in sorted(int(year) for year in read_manifest(store_dir)):
+                merge_quantile_sketches(sketches, build_quantile_sketches([load_partitions(store_dir, [year])], k=k))
+    except FileNotFoundError:
+        print(f"File not found. Please check the file path: {file_path}")
+        return None
+    except Exception as e:
+        print(f"An error occurred while streaming the dataset: {e}")
+        return None
+    print(f"Streamed quantile sketches over {sum(map(len, sketches[GROUP_COLUMNS[0]].values()))} cleaned rows.")
+    return sketches
+
+def quantile_summary(groups):
+    """
+    Returns the count, minimum, quartiles, IQR, 99th percentile and maximum of each sketch in {group: KLLSketch}.
+    """
+    rows = {}
+    for group, sketch in sorted(groups.items()):
+        quantiles = dict(zip(SUMMARY_QUANTILES, sketch.quantile(list(SUMMARY_QUANTILES.values()))))
+        rows[group] = {'count': len(sketch), 'min': sketch.min, 'p25': quantiles['p25'],
+                       'median': quantiles['median'], 'p75': quantiles['p75'],
+                       'iqr': quantiles['p75'] - quantiles['p25'], 'p99': quantiles['p99'], 'max': sketch.max}
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+@cached_figure
+def plot_sketch_boxplots(stats, fliers, figure_path=FIGURE_PATH):
+    """
+    Plots boxplots of fatalities per group from sketch statistics (one row per group) and saves the figure.
+    """
+    plt = pyplot()
+    boxes = [dict(row, label=label, fliers=fliers[label]) for label, row in stats.to_dict('index').items()]
+    fig, ax = plt.subplots(figsize=(12, 6))
+    ax.bxp(boxes, patch_artist=True, boxprops=dict(facecolor="lightblue"))
+    # Fatality counts span several orders of magnitude, with most incidents at zero
+    ax.set_yscale('symlog', linthresh=1)
+    ax.set_title("Fatalities per Incident by Attack Type", fontsize=14)
+    ax.set_xlabel("Attack Type", fontsize=12)
+    ax.set_ylabel("Fatalities (symmetric log scale)", fontsize=12)
+    ax.grid(True, axis='y')
+    plt.xticks(rotation=45, ha='right')
+    plt.savefig(figure_path, bbox_inches='tight')
+    plt.close(fig)
+
+def render_boxplots(groups, figure_path=FIGURE_PATH, force=False):
+    """
+    Renders the boxplots of {group: KLLSketch} to figure_path, skipping the render when it is current.
+    """
+    stats = {str(group): sketch.boxplot_stats() for group, sketch in sorted(groups.items())}
+    fliers = {label: box.pop('fliers') for label, box in stats.items()}
+    frame = pd.DataFrame.from_dict({label: {key: value for key, value in box.items() if key != 'label'}
+                                    for label, box in stats.items()}, orient='index')
+    plot_sketch_boxplots(frame, fliers, figure_path=figure_path, force=force)
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Fatality quantiles and boxplots per group from KLL sketches.")
+    parser.add_argument('--source', choices=['csv', 'partitions'], default='csv')
+    parser.add_argument('--file-path', default=DATASET_PATH, help="Path to the GTD CSV file.")
+    parser.add_argument('--store-dir', default=PARTITION_DIR, help="Directory of the partitioned store.")
+    parser.add_argument('-k', type=int, default=DEFAULT_K, help="Sketch size; the rank error is about 2 / k.")
+    parser.add_argument('--deduplicate', action='store_true',
+                        help="Drop incidents repeated across CSV chunks, keeping every eventid in memory.")
+    args = parser.parse_args()
+    quantile_sketches = stream_quantile_sketches(args.source, args.file_path, args.store_dir, args.k,
+                                                 deduplicate=args.deduplicate)
+    if quantile_sketches is not None:
+        for column in GROUP_COLUMNS:
+            print(f"\n--- Fatality quantiles by {column} ---")
+            print(quantile_summary(quantile_sketches[column]).to_string())
+        render_boxplots(quantile_sketches['attacktype1_txt'])
+        print(f"\nBoxplots saved to {FIGURE_PATH}")
@@ -0,0 +1,170 @@
+import contextlib
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import re
+import sqlite3
+import sys
+import numpy as np
+import pandas as pd
+
+# The store lives next to the statistics file it renders, as figures_and_statistics/results.sqlite
+RESULTS_STORE_NAME = 'results.sqlite'
+
+# A statistics file section starts at a "--- Title ---" line, with the blank line before it
+_SECTION_START = re.compile(r'(?=\n--- [^\n]+ ---\n)')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    analysis TEXT NOT NULL,
+    input_hash TEXT NOT NULL,
+    params TEXT NOT NULL,
+    result BLOB NOT NULL,
+    report TEXT NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (analysis, input_hash)
+)
+"""
+
+def store_path_for(statistics_file):
+    """
+    Returns the path of the results store that backs the given statistics file.
+    """
+    return os.path.join(os.path.dirname(statistics_file), RESULTS_STORE_NAME)
+
+def _update_digest(digest, value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        frame = value.to_frame() if isinstance(value, pd.Series) else value
+        digest.update(json.dumps([[str(column), str(dtype)] for column, dtype in frame.dtypes.items()]).encode('utf-8'))
+        digest.update(json.dumps([str(name) for name in frame.index.names]).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(f'{value.dtype.str}{value.shape}'.encode('utf-8'))
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        # Arrays inside a dict (such as a model fit) are hashed in full, not through their truncated repr
+        for key in sorted(value, key=str):
+            digest.update(json.dumps(str(key)).encode('utf-8'))
+            _update_digest(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(f'{type(value).__name__}{len(value)}'.encode('utf-8'))
+        for item in value:
+            _update_digest(digest, item)
+    else:
+        digest.update(json.dumps(value, sort_keys=True, default=str).encode('utf-8'))
+
+def input_hash(inputs, params=None, compute=None, depends=()):
+    """
+    Returns a digest of an analysis' input aggregates, its parameters and the source of its compute function's module.
+
+    Including the module source means editing an analysis invalidates its stored results, as editing the
+    cleaning rules invalidates the dataset cache. depends lists functions from other modules the computation
+    relies on; their modules' source is included too.
+    """
+    digest = hashlib.sha256()
+    for value in inputs:
+        _update_digest(digest, value)
+    digest.update(json.dumps(params or {}, sort_keys=True, default=str).encode('utf-8'))
+    for function in ([compute] if compute is not None else []) + list(depends):
+        digest.update(inspect.getsource(sys.modules[function.__module__]).encode('utf-8'))
+    return digest.hexdigest()
+
+def _connect(store_path):
+    os.makedirs(os.path.dirname(store_path) or '.', exist_ok=True)
+    connection = sqlite3.connect(store_path)
+    connection.execute(_SCHEMA)
+    return connection
+
+def get_or_compute(analysis, inputs, compute, render, store_path, params=None, depends=()):
+    """
+    Returns the result of compute(*inputs, **params), served from the results store when the same analysis
+    has already run on the same input aggregates and parameters.
+
+    render(result) gives the analysis' section of the statistics file, which is stored with the result.
+    Every call marks its entry as the analysis' current result, the one shown by write_statistics_view.
+    depends is passed to input_hash, so editing a module compute delegates to also recomputes.
+    """
+    params = params or {}
+    key = input_hash(inputs, params, compute, depends)
+    with contextlib.closing(_connect(store_path)) as connection, connection:
+        row = connection.execute('SELECT result FROM results WHERE analysis = ? AND input_hash = ?',
+                                 (analysis, key)).fetchone()
+        result = None
+        if row is not None:
+            try:
+                result = pickle.loads(row[0])
+                print(f"Loaded stored {analysis} results.")
+            except Exception as e:
+                # A result pickled by incompatible library versions only costs a recomputation
+                print(f"Stored {analysis} results could not be read ({e}); recomputing.")
+        if result is None:
+            result = compute(*inputs, **params)
+            connection.execute(
+                'INSERT OR REPLACE INTO results (analysis, input_hash, params, result, report, last_used) '
+                'VALUES (?, ?, ?, ?, ?, 0)',
+                (analysis, key, json.dumps(params, sort_keys=True, default=str),
+                 pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL), render(result)))
+        connection.execute('UPDATE results SET last_used = (SELECT COALESCE(MAX(last_used), 0) + 1 FROM results) '
+                           'WHERE analysis = ? AND input_hash = ?', (analysis, key))
+    return result
+
+def current_reports(store_path):
+    """
+    Returns the statistics file section of each analysis' current result, ordered by analysis name.
+    """
+    if not os.path.exists(store_path):
+        return []
+    with contextlib.closing(_connect(store_path)) as connection:
+        return connection.execute(
+            'SELECT analysis, report FROM results AS r '
+            'WHERE last_used = (SELECT MAX(last_used) FROM results WHERE analysis = r.analysis) '
+            'ORDER BY analysis').fetchall()
+
+def _sections(text):
+    return [section for section in _SECTION_START.split(text) if section]
+
+def _section_title(section):
+    match = re.match(r'\n--- ([^\n]+) ---\n', section)
+    return match.group(1) if match else None
+
+def write_statistics_view(statistics_file, store_path=None):
+    """
+    Rewrites the sections of the statistics file that analyses in the store own from their current results.
+
+    Rerunning an analysis therefore replaces its section instead of appending a duplicate. Sections of
+    analyses the store holds no result for yet (say, in a fresh clone) are kept as they are; an analysis
+    whose sections are not in the file yet is appended.
+    """
+    store_path = store_path or store_path_for(statistics_file)
+    reports = dict(current_reports(store_path))
+    owners = {_section_title(section): analysis
+              for analysis, report in reports.items() for section in _sections(report)}
+    owners.pop(None, None)
+    try:
+        with open(statistics_file, 'r') as f:
+            existing = f.read()
+    except FileNotFoundError:
+        existing = ''
+    parts = []
+    for section in _sections(existing):
+        analysis = owners.get(_section_title(section))
+        if analysis is None:
+            parts.append(section)
+        elif analysis in reports:
+            # The first section of an analysis is replaced by its whole report, the others are dropped
+            parts.append(reports.pop(analysis))
+    parts.extend(reports.values())
+    temp_path = statistics_file + '.tmp'
+    with open(temp_path, 'w') as f:
+        f.write(''.join(parts))
+    os.replace(temp_path, statistics_file)
+
+if __name__ == '__main__':
+    try:
+        from Welchs_ANOVA_Test import STATISTICS_FILE
+    except ImportError:
+        from scripts.Welchs_ANOVA_Test import STATISTICS_FILE
+    write_statistics_view(STATISTICS_FILE)
+    print(f"{STATISTICS_FILE} regenerated from the results store.")
@@ -0,0 +1,133 @@
+import contextlib
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Shared frames are published under /dev/shm when it exists, so their pages live in shared memory
+SHARED_MEMORY_DIR = '/dev/shm'
+MANIFEST_NAME = 'manifest.json'
+
+def _base_dir():
+    if os.path.isdir(SHARED_MEMORY_DIR) and os.access(SHARED_MEMORY_DIR, os.W_OK):
+        return SHARED_MEMORY_DIR
+    return tempfile.gettempdir()
+
+# Nullable (masked) extension arrays, published as their NumPy values plus a boolean mask of missing entries
+MASKED_ARRAYS = (pd.arrays.IntegerArray, pd.arrays.FloatingArray, pd.arrays.BooleanArray)
+
+def _codes_dtype(n_categories):
+    # Codes need one extra value for missing (-1)
+    for dtype in ('int8', 'int16', 'int32'):
+        if n_categories < np.iinfo(dtype).max:
+            return dtype
+    return 'int64'
+
+def publish_frame(data, directory=None):
+    """
+    Writes the columns of a frame (such as the cleaned dataset) to a directory of .npy files that
+    worker processes can memory-map, and returns the directory.
+
+    Numeric columns are stored as they are; nullable ones (such as GTD_SCHEMA's Int16 and Int8 columns)
+    as their values plus a mask of the missing entries. Text and categorical columns are dictionary-encoded
+    as compact integer codes plus their categories, so every worker maps the same few bytes per row.
+    Other extension dtypes raise a ValueError.
+    The directory defaults to a new one under /dev/shm (or the temporary directory where there is none);
+    pass it to attach_frame in the workers and to release_frame once they are done.
+    """
+    directory = directory or tempfile.mkdtemp(prefix='gtd_frame_', dir=_base_dir())
+    os.makedirs(directory, exist_ok=True)
+    manifest = {'rows': len(data), 'columns': []}
+    for position, (column, series) in enumerate(data.items()):
+        entry = {'name': str(column), 'file': f'{position}.npy'}
+        if isinstance(series.array, MASKED_ARRAYS):
+            values = series.to_numpy(dtype=series.dtype.numpy_dtype, na_value=0)
+            entry.update(dtype=str(series.dtype), mask=f'{position}.mask.npy')
+            np.save(os.path.join(directory, entry['mask']), series.isna().to_numpy(), allow_pickle=False)
+        elif pd.api.types.is_numeric_dtype(series.dtype) and not isinstance(series.dtype, pd.CategoricalDtype):
+            if isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+                raise ValueError(f"Column {column!r} has dtype {series.dtype}, which cannot be shared; "
+                                 "convert it to a NumPy or nullable dtype first")
+            values = series.to_numpy()
+        else:
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes, categories = series.cat.codes.to_numpy(), series.cat.categories
+            else:
+                codes, categories = pd.factorize(series, sort=True)
+            values = codes.astype(_codes_dtype(len(categories)))
+            entry['categories'] = [str(category) for category in categories]
+        np.save(os.path.join(directory, entry['file']), np.ascontiguousarray(values), allow_pickle=False)
+        manifest['columns'].append(entry)
+    # The manifest is written last, so a directory with a manifest is always complete
+    temp_path = os.path.join(directory, MANIFEST_NAME + '.tmp')
+    with open(temp_path, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(temp_path, os.path.join(directory, MANIFEST_NAME))
+    return directory
+
+def attach_arrays(directory, columns=None):
+    """
+    Returns column name -> read-only memory-mapped array of a published frame (the codes of
+    dictionary-encoded columns), together with column name -> categories of those columns.
+
+    Nullable columns come back as masked arrays (e.g. IntegerArray) over the mapped values and mask.
+    """
+    with open(os.path.join(directory, MANIFEST_NAME), 'r') as f:
+        manifest = json.load(f)
+    wanted = None if columns is None else set(columns)
+    arrays, categories = {}, {}
+    for entry in manifest['columns']:
+        if wanted is not None and entry['name'] not in wanted:
+            continue
+        mapped = np.load(os.path.join(directory, entry['file']), mmap_mode='r', allow_pickle=False)
+        # A plain ndarray view of the mapping behaves like any other column downstream
+        arrays[entry['name']] = mapped.view(np.ndarray)
+        if 'mask' in entry:
+            mask = np.load(os.path.join(directory, entry['mask']), mmap_mode='r', allow_pickle=False)
+            array_type = pd.api.types.pandas_dtype(entry['dtype']).construct_array_type()
+            arrays[entry['name']] = array_type(arrays[entry['name']], mask.view(np.ndarray), copy=False)
+        if 'categories' in entry:
+            categories[entry['name']] = entry['categories']
+    return arrays, categories
+
+def attach_frame(directory, columns=None):
+    """
+    Returns a published frame (or the given columns of it) as a DataFrame of zero-copy views on the
+    memory-mapped files; dictionary-encoded columns come back as categoricals.
+
+    The views are read-only, so a worker can never change the data the other workers see.
+    """
+    arrays, categories = attach_arrays(directory, columns)
+    # The codes were written by publish_frame, so skip re-checking them where pandas allows it (2.1 and later)
+    version = tuple(int(part) for part in pd.__version__.split('.')[:2])
+    code_options = {'validate': False} if version >= (2, 1) else {}
+    series = []
+    for name, values in arrays.items():
+        if name in categories:
+            values = pd.Categorical.from_codes(values, categories=pd.Index(categories[name]), **code_options)
+        series.append(pd.Series(values, name=name, copy=False))
+    if not series:
+        return pd.DataFrame()
+    # Side by side concatenation keeps every column a view instead of consolidating them into a new block;
+    # before pandas 3 (and Copy-on-Write) concat copies unless told not to
+    options = {'copy': False} if int(pd.__version__.split('.')[0]) < 3 else {}
+    return pd.concat(series, axis=1, **options)
+
+def release_frame(directory):
+    """
+    Removes a published frame. Workers that still have it mapped keep their views until they exit.
+    """
+    shutil.rmtree(directory, ignore_errors=True)
+
+@contextlib.contextmanager
+def shared_frame(data, directory=None):
+    """
+    Publishes a frame for the duration of a with block, yielding the directory to hand to the workers.
+    """
+    directory = publish_frame(data, directory)
+    try:
+        yield directory
+    finally:
+        release_frame(directory)
@@ -0,0 +1,199 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from dataset_loader import DATASET_PATH, load_dataset
+    from dataset_cleaner import clean_dataset
+except ImportError:
+    from scripts.dataset_loader import DATASET_PATH, load_dataset
+    from scripts.dataset_cleaner import clean_dataset
+
+# Coordinate columns the cleaner carries through for the spatial analyses
+COORDINATE_COLUMNS = ['latitude', 'longitude']
+
+# Grid cell sizes in degrees of the default hotspot resolutions, from continental to city scale
+HOTSPOT_RESOLUTIONS = (5.0, 1.0, 0.25)
+
+# Mean Earth radius used by the radius queries
+EARTH_RADIUS_KM = 6371.0088
+
+def load_spatial_dataset(file_path=DATASET_PATH):
+    """
+    Returns the cleaned dataset with its latitude and longitude columns, or None if it could not be loaded.
+    """
+    raw_data = load_dataset(file_path)
+    if raw_data is None:
+        return None
+    return clean_dataset(raw_data, extra_columns=COORDINATE_COLUMNS)
+
+def valid_coordinates(data):
+    """
+    Returns a boolean mask of the rows whose latitude and longitude are numbers within their ranges.
+
+    The GTD has missing coordinates and a few corrupt ones (e.g. a longitude of -86185896).
+    """
+    latitude = pd.to_numeric(data['latitude'], errors='coerce').to_numpy(dtype='float64')
+    longitude = pd.to_numeric(data['longitude'], errors='coerce').to_numpy(dtype='float64')
+    with np.errstate(invalid='ignore'):
+        return (np.abs(latitude) <= 90) & (np.abs(longitude) <= 180)
+
+def grid_cells(latitude, longitude, cell_size):
+    """
+    Returns the (row, column) grid cell of each coordinate, counted from the south-west corner (-90, -180).
+
+    Points on the north pole or the antimeridian fall in the last row or column.
+    """
+    rows = int(np.ceil(180 / cell_size))
+    columns = int(np.ceil(360 / cell_size))
+    row = np.minimum(np.floor((np.asarray(latitude) + 90) / cell_size).astype('int64'), rows - 1)
+    column = np.minimum(np.floor((np.asarray(longitude) + 180) / cell_size).astype('int64'), columns - 1)
+    return row, column
+
+def haversine_km(latitude, longitude, center_latitude, center_longitude):
+    """
+    Returns the great-circle distances in km from the coordinates to a center.
+    """
+    lat1, lon1 = np.radians(latitude), np.radians(longitude)
+    lat2, lon2 = np.radians(center_latitude), np.radians(center_longitude)
+    a = np.sin((lat1 - lat2) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon1 - lon2) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+class GridIndex:
+    """
+    Uniform latitude/longitude grid over the incidents with valid coordinates.
+
+    The incidents are sorted by cell once, so every cell is a contiguous slice found by binary search.
+    A query only reads the cells overlapping its bounding box rather than scanning the whole frame.
+    Queries return the positions (as used by data.iloc) of the matching rows, in ascending order.
+    """
+
+    def __init__(self, data, cell_size=1.0):
+        self.data = data
+        self.cell_size = float(cell_size)
+        self.columns = int(np.ceil(360 / self.cell_size))
+        positions = np.flatnonzero(valid_coordinates(data))
+        latitude = pd.to_numeric(data['latitude'], errors='coerce').to_numpy(dtype='float64')[positions]
+        longitude = pd.to_numeric(data['longitude'], errors='coerce').to_numpy(dtype='float64')[positions]
+        row, column = grid_cells(latitude, longitude, self.cell_size)
+        keys = row * self.columns + column
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.positions = positions[order]
+        self.latitude = latitude[order]
+        self.longitude = longitude[order]
+
+    def __len__(self):
+        return self.positions.size
+
+    def _candidates(self, min_lat, max_lat, min_lon, max_lon):
+        # Slices of the sorted incidents covering the cells of a box that does not cross the antimeridian
+        (first_row, last_row), (first_column, last_column) = grid_cells(
+            np.array([min_lat, max_lat]), np.array([min_lon, max_lon]), self.cell_size)
+        bands = np.arange(first_row, last_row + 1) * self.columns
+        starts = np.searchsorted(self.keys, bands + first_column, side='left')
+        ends = np.searchsorted(self.keys, bands + last_column, side='right')
+        lengths = ends - starts
+        if lengths.sum() == 0:
+            return np.empty(0, dtype='int64')
+        # Concatenated ranges start:end for every band, without a Python loop over the bands
+        offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+        return np.arange(lengths.sum()) + offsets
+
+    def _boxes(self, min_lat, max_lat, min_lon, max_lon):
+        min_lat, max_lat = max(min_lat, -90.0), min(max_lat, 90.0)
+        if min_lat > max_lat:
+            return []
+        if min_lon <= max_lon:
+            return [(min_lat, max_lat, max(min_lon, -180.0), min(max_lon, 180.0))]
+        # A box crossing the antimeridian is split in two
+        return [(min_lat, max_lat, min_lon, 180.0), (min_lat, max_lat, -180.0, max_lon)]
+
+    def bbox(self, min_lat, max_lat, min_lon, max_lon):
+        """
+        Returns the positions of the incidents inside the box, edges included.
+
+        A box with min_lon > max_lon crosses the antimeridian.
+        """
+        matches = []
+        for box in self._boxes(min_lat, max_lat, min_lon, max_lon):
+            candidates = self._candidates(*box)
+            latitude, longitude = self.latitude[candidates], self.longitude[candidates]
+            inside = ((latitude >= box[0]) & (latitude <= box[1]) & (longitude >= box[2]) & (longitude <= box[3]))
+            matches.append(self.positions[candidates[inside]])
+        return np.sort(np.concatenate(matches)) if matches else np.empty(0, dtype='int64')
+
+    def radius(self, latitude, longitude, radius_km):
+        """
+        Returns the positions of the incidents within radius_km of a point, by great-circle distance.
+        """
+        dlat = np.degrees(radius_km / EARTH_RADIUS_KM)
+        min_lat, max_lat = latitude - dlat, latitude + dlat
+        if min_lat <= -90 or max_lat >= 90:
+            # The circle covers a pole, so every longitude can be within reach
+            boxes = self._boxes(min_lat, max_lat, -180.0, 180.0)
+        else:
+            # Widest longitude span of the circle, reached at its tangent latitude
+            dlon = np.degrees(np.arcsin(min(1.0, np.sin(radius_km / EARTH_RADIUS_KM) / np.cos(np.radians(latitude)))))
+            if dlon >= 180 or radius_km / EARTH_RADIUS_KM >= np.pi / 2:
+                boxes = self._boxes(min_lat, max_lat, -180.0, 180.0)
+            else:
+                west = (longitude - dlon + 180) % 360 - 180
+                east = (longitude + dlon + 180) % 360 - 180
+                boxes = self._boxes(min_lat, max_lat, west, east)
+        matches = []
+        for box in boxes:
+            candidates = self._candidates(*box)
+            distances = haversine_km(self.latitude[candidates], self.longitude[candidates], latitude, longitude)
+            matches.append(self.positions[candidates[distances <= radius_km]])
+        return np.sort(np.concatenate(matches)) if matches else np.empty(0, dtype='int64')
+
+    def rows(self, positions):
+        """
+        Returns the rows of the indexed frame at the given positions.
+        """
+        return self.data.iloc[positions]
+
+def hotspot_aggregates(data, cell_size=1.0):
+    """
+    Returns the incident count, nkill sum, success sum and success rate of every occupied grid cell,
+    with the cell's bounds and center, sorted by incident count (most incidents first).
+
+    Cells are found by binning the coordinates, and the measures come from bincounts over the cell
+    numbers, so no Python-level loop or group-by over the rows is needed.
+    """
+    valid = valid_coordinates(data)
+    latitude = pd.to_numeric(data['latitude'], errors='coerce').to_numpy(dtype='float64')[valid]
+    longitude = pd.to_numeric(data['longitude'], errors='coerce').to_numpy(dtype='float64')[valid]
+    row, column = grid_cells(latitude, longitude, cell_size)
+    columns = int(np.ceil(360 / cell_size))
+    cells, inverse = np.unique(row * columns + column, return_inverse=True)
+    incidents = np.bincount(inverse, minlength=cells.size)
+    nkill_sum = np.bincount(inverse, weights=data['nkill'].to_numpy()[valid], minlength=cells.size)
+    success_sum = np.bincount(inverse, weights=data['success'].to_numpy()[valid], minlength=cells.size)
+    min_lat = (cells // columns) * cell_size - 90
+    min_lon = (cells % columns) * cell_size - 180
+    hotspots = pd.DataFrame({
+        'cell_size': cell_size,
+        'min_lat': min_lat,
+        'min_lon': min_lon,
+        'center_lat': np.minimum(min_lat + cell_size / 2, 90.0),
+        'center_lon': np.minimum(min_lon + cell_size / 2, 180.0),
+        'incidents': incidents.astype('int64'),
+        'nkill_sum': nkill_sum.astype('int64'),
+        'success_sum': success_sum.astype('int64'),
+        'success_rate': success_sum / incidents,
+    })
+    return hotspots.sort_values(['incidents', 'nkill_sum'], ascending=False, kind='stable').reset_index(drop=True)
+
+def multi_resolution_hotspots(data, resolutions=HOTSPOT_RESOLUTIONS):
+    """
+    Returns the hotspot aggregates at each resolution, as one frame with a cell_size column.
+    """
+    return pd.concat([hotspot_aggregates(data, cell_size) for cell_size in resolutions], ignore_index=True)
+
+if __name__ == '__main__':
+    spatial_data = load_spatial_dataset()
+    if spatial_data is not None:
+        for cell_size, top in multi_resolution_hotspots(spatial_data).groupby('cell_size', sort=False):
+            print(f"\n--- Top hotspots at {cell_size:g} degree cells ---")
+            print(top.head(10).to_string(index=False))
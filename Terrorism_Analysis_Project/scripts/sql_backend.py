@@ -0,0 +1,133 @@
+import os
+import numpy as np
+
+try:
+    from dataset_loader import DATASET_PATH
+    from dataset_cleaner import NUMERIC_DTYPES, RELEVANT_COLUMNS, TEXT_COLUMNS
+    from aggregate_cube import CUBE_DIMENSIONS
+    from instrumentation import stage
+except ImportError:
+    from scripts.dataset_loader import DATASET_PATH
+    from scripts.dataset_cleaner import NUMERIC_DTYPES, RELEVANT_COLUMNS, TEXT_COLUMNS
+    from scripts.aggregate_cube import CUBE_DIMENSIONS
+    from scripts.instrumentation import stage
+
+# Strings pandas.read_csv reads as missing by default, so both backends see the same missing values
+PANDAS_NA_VALUES = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+                    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null']
+
+# The cleaning rules of dataset_cleaner.clean_dataset, expressed over the raw CSV read as text:
+# rows missing nkill or success are dropped, unparseable numbers become 0 and fractions are truncated,
+# missing text becomes 'Unknown', and the first row of each eventid in file order is kept
+_CLEAN_CSV_SQL = """
+CREATE TEMP TABLE converted AS
+SELECT {numeric}, {text}
+FROM read_csv(?, header = true, all_varchar = true, nullstr = ?)
+WHERE nkill IS NOT NULL AND success IS NOT NULL
+"""
+
+_DEDUPE_SQL = """
+CREATE TEMP VIEW cleaned AS
+SELECT {columns} FROM converted
+QUALIFY row_number() OVER (PARTITION BY eventid ORDER BY rowid) = 1
+"""
+
+# The aggregate cube of aggregate_cube.build_cube; sums are cast back from DuckDB's 128-bit integers
+_CUBE_SQL = """
+SELECT iyear, region_txt, attacktype1_txt,
+       CAST(count(*) AS BIGINT) AS count,
+       CAST(sum(success) AS BIGINT) AS success_sum,
+       CAST(sum(nkill) AS BIGINT) AS nkill_sum,
+       CAST(sum(nkill * nkill) AS BIGINT) AS nkill_sumsq
+FROM (SELECT CAST(iyear AS BIGINT) AS iyear, CAST(region_txt AS VARCHAR) AS region_txt,
+             CAST(attacktype1_txt AS VARCHAR) AS attacktype1_txt,
+             CAST(success AS BIGINT) AS success, CAST(nkill AS BIGINT) AS nkill
+      FROM cleaned)
+GROUP BY iyear, region_txt, attacktype1_txt
+ORDER BY iyear, region_txt, attacktype1_txt
+"""
+
+def connect(threads=None):
+    """
+    Returns an in-memory DuckDB connection, or None if DuckDB is not installed.
+
+    threads caps DuckDB's worker threads (default: all cores).
+    """
+    try:
+        import duckdb
+    except ImportError:
+        print("DuckDB is not installed; install it with 'pip install duckdb' to use the SQL backend.")
+        return None
+    connection = duckdb.connect(':memory:')
+    if threads is not None:
+        connection.execute(f'SET threads = {int(threads)}')
+    return connection
+
+def _numeric_expression(column):
+    # pd.to_numeric(errors='coerce').fillna(0).astype('int64') truncates toward zero
+    return f'CAST(trunc(COALESCE(TRY_CAST("{column}" AS DOUBLE), 0)) AS BIGINT) AS "{column}"'
+
+def _literal(text):
+    # Views cannot take prepared parameters, so their paths are inlined as quoted SQL strings
+    return "'" + text.replace("'", "''") + "'"
+
+def register_cleaned_rows(connection, source=DATASET_PATH):
+    """
+    Defines the view `cleaned` of the cleaned rows of a source, without reading them into pandas.
+
+    A .csv source is cleaned in SQL by the same rules as clean_dataset. A .parquet file (such as a
+    cleaned dataset snapshot) or a partition store directory already holds cleaned rows and is read as is.
+    """
+    columns = ', '.join(f'"{column}"' for column in RELEVANT_COLUMNS)
+    if os.path.isdir(source):
+        pattern = _literal(os.path.join(source, 'iyear=*', 'data.parquet'))
+        connection.execute(f'CREATE TEMP VIEW cleaned AS SELECT {columns} '
+                           f'FROM read_parquet({pattern}, hive_partitioning = false)')
+    elif source.endswith('.parquet'):
+        connection.execute(f'CREATE TEMP VIEW cleaned AS SELECT {columns} FROM read_parquet({_literal(source)})')
+    else:
+        numeric = ', '.join(_numeric_expression(column) for column in NUMERIC_DTYPES)
+        text = ', '.join(f'COALESCE("{column}", \'Unknown\') AS "{column}"' for column in TEXT_COLUMNS)
+        # Materialising the six converted columns fixes their file order, which picks the row kept per eventid
+        connection.execute('SET preserve_insertion_order = true')
+        connection.execute(_CLEAN_CSV_SQL.format(numeric=numeric, text=text), [source, PANDAS_NA_VALUES])
+        connection.execute(_DEDUPE_SQL.format(columns=columns))
+
+def build_cube(source=DATASET_PATH, threads=None):
+    """
+    Returns the same aggregate cube as aggregate_cube.build_cube on the cleaned rows of the source,
+    computed by DuckDB straight from the CSV or Parquet.
+
+    DuckDB streams the source and spills to disk when needed, so the rows never have to fit in memory.
+    Returns None if DuckDB is not installed or the source does not exist.
+    """
+    if not os.path.exists(source):
+        print(f"File not found. Please check the file path: {source}")
+        return None
+    connection = connect(threads)
+    if connection is None:
+        return None
+    try:
+        with stage('sql_build_cube') as timing:
+            register_cleaned_rows(connection, source)
+            cube = connection.execute(_CUBE_SQL).df()
+            timing.rows = len(cube)
+    finally:
+        connection.close()
+
+    # Match the pandas cube's dtypes: iyear keeps the compact dtype the cleaner gives it
+    limits = np.iinfo(NUMERIC_DTYPES['iyear'])
+    fits = cube.empty or (cube['iyear'].min() >= limits.min and cube['iyear'].max() <= limits.max)
+    cube['iyear'] = cube['iyear'].astype(NUMERIC_DTYPES['iyear'] if fits else 'int64')
+    for dimension in CUBE_DIMENSIONS[1:]:
+        cube[dimension] = cube[dimension].astype(str)
+    return cube
+
+if __name__ == '__main__':
+    try:
+        from aggregate_cube import rollup
+    except ImportError:
+        from scripts.aggregate_cube import rollup
+    cube = build_cube()
+    if cube is not None:
+        print(rollup(cube, ['attacktype1_txt']).to_string())
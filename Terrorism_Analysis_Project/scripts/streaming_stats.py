@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from dataset_loader import DATASET_PATH
+    from dataset_cleaner import RELEVANT_COLUMNS, clean_dataset
+except ImportError:
+    from scripts.dataset_loader import DATASET_PATH
+    from scripts.dataset_cleaner import RELEVANT_COLUMNS, clean_dataset
+
+# Rows parsed per chunk; peak memory scales with this, not with the file size
+DEFAULT_CHUNKSIZE = 100_000
+
+# Grouped statistics used by the analysis scripts: name -> (group column, value column)
+GROUPED_STATISTICS = {
+    'attacktype_nkill': ('attacktype1_txt', 'nkill'),      # 95% CI plot and Welch's ANOVA
+    'attacktype_success': ('attacktype1_txt', 'success'),  # Attack type frequency and success
+    'region_success': ('region_txt', 'success'),           # Incidents and success rate by region
+    'yearly_nkill': ('iyear', 'nkill'),                    # Exponential model fit
+}
+
+class GroupAccumulator:
+    """
+    Mergeable per-group count, sum, mean and M2 (sum of squared deviations from the mean).
+
+    Chunks are folded in with Chan et al.'s parallel form of Welford's update, so accumulators
+    built over different chunks, files or processes can be merged in any order.
+    """
+
+    def __init__(self):
+        self.count = pd.Series(dtype='int64')
+        self.sum = pd.Series(dtype='float64')
+        self.mean = pd.Series(dtype='float64')
+        self.m2 = pd.Series(dtype='float64')
+
+    def update(self, keys, values):
+        """
+        Folds one chunk of (group key, value) pairs into the accumulator.
+        """
+        grouped = pd.Series(np.asarray(values)).groupby(np.asarray(keys))
+        chunk = GroupAccumulator()
+        chunk.count = grouped.count().astype('int64')
+        chunk.sum = grouped.sum()
+        chunk.mean = grouped.mean()
+        chunk.m2 = grouped.var(ddof=0) * chunk.count
+        return self.merge(chunk)
+
+    def merge(self, other):
+        """
+        Merges another accumulator into this one and returns self.
+        """
+        if self.count.empty:
+            # Adopt the other side as-is so integer sums keep their exact integer dtype
+            self.count, self.sum, self.mean, self.m2 = other.count, other.sum, other.mean, other.m2
+            return self
+        groups = self.count.index.union(other.count.index)
+        n_a = self.count.reindex(groups, fill_value=0).to_numpy()
+        n_b = other.count.reindex(groups, fill_value=0).to_numpy()
+        mean_a = self.mean.reindex(groups, fill_value=0.0).to_numpy()
+        mean_b = other.mean.reindex(groups, fill_value=0.0).to_numpy()
+        n = n_a + n_b
+        delta = mean_b - mean_a
+        # n is never zero: every group in the union was seen by at least one side
+        self.mean = pd.Series(mean_a + delta * (n_b / n), index=groups)
+        self.m2 = pd.Series(self.m2.reindex(groups, fill_value=0.0).to_numpy()
+                            + other.m2.reindex(groups, fill_value=0.0).to_numpy()
+                            + delta ** 2 * (n_a * n_b / n), index=groups)
+        self.sum = self.sum.reindex(groups, fill_value=0).add(other.sum.reindex(groups, fill_value=0))
+        self.count = pd.Series(n, index=groups)
+        return self
+
+    def to_frame(self):
+        """
+        Returns count, sum, mean, var and std (sample, ddof=1) per group, sorted by group.
+        """
+        count = self.count.sort_index()
+        m2 = self.m2.reindex(count.index)
+        var = (m2 / (count - 1)).where(count > 1)
+        frame = pd.DataFrame({
+            'count': count,
+            'sum': self.sum.reindex(count.index),
+            # sum / count reproduces the pandas group mean exactly for integer columns
+            'mean': self.sum.reindex(count.index) / count,
+            'var': var,
+            'std': np.sqrt(var),
+        })
+        frame.index.name = count.index.name
+        return frame
+
+def iter_clean_chunks(file_path=DATASET_PATH, chunksize=DEFAULT_CHUNKSIZE, columns=RELEVANT_COLUMNS,
+                      deduplicate=False):
+    """
+    Yields cleaned chunks of the dataset, reading only the given columns.
+
+    Duplicate eventids are dropped within each chunk, so memory stays bounded by the chunk size. An incident
+    repeated in a later chunk is yielded again; the GTD releases hold no such duplicates. Pass deduplicate=True
+    to drop them as clean_dataset does for the whole file, at the cost of keeping every eventid seen in memory.
+    """
+    seen = set()
+    extra_columns = [column for column in columns if column not in RELEVANT_COLUMNS]
+    reader = pd.read_csv(file_path, usecols=lambda column: column in columns, chunksize=chunksize, low_memory=False)
+    for chunk in reader:
+        cleaned = clean_dataset(chunk, verbose=False)
+        if extra_columns:
+            cleaned = cleaned.join(chunk[extra_columns])
+        if deduplicate and not cleaned.empty:
+            # Duplicates within the chunk are already gone; drop those seen in earlier chunks
+            first_seen = (~cleaned['eventid'].isin(seen)).to_numpy()
+            cleaned = cleaned[first_seen]
+            seen.update(cleaned['eventid'].tolist())
+        yield cleaned
+
+def stream_grouped_statistics(file_path=DATASET_PATH, chunksize=DEFAULT_CHUNKSIZE, statistics=GROUPED_STATISTICS,
+                              deduplicate=False):
+    """
+    Computes the grouped statistics of the analysis scripts in one chunked pass over the CSV.
+
+    Returns a dict of name -> DataFrame (count, sum, mean, var, std per group), or None if the file cannot be read.
+    On a file without duplicate eventids across chunks (or with deduplicate=True, see iter_clean_chunks),
+    counts, sums and means equal the in-memory group-by exactly; std agrees to floating-point rounding.
+    """
+    accumulators = {name: GroupAccumulator() for name in statistics}
+    rows = 0
+    try:
+        for chunk in iter_clean_chunks(file_path, chunksize=chunksize, deduplicate=deduplicate):
+            rows += len(chunk)
+            for name, (group_column, value_column) in statistics.items():
+                accumulators[name].update(chunk[group_column], chunk[value_column])
+    except FileNotFoundError:
+        print(f"File not found. Please check the file path: {file_path}")
+        return None
+    except Exception as e:
+        print(f"An error occurred while streaming the dataset: {e}")
+        return None
+
+    results = {}
+    for name, (group_column, _) in statistics.items():
+        results[name] = accumulators[name].to_frame()
+        results[name].index.name = group_column
+    print(f"Streamed grouped statistics over {rows} cleaned rows.")
+    return results
+
+if __name__ == '__main__':
+    for name, frame in (stream_grouped_statistics() or {}).items():
+        print(f"\n--- {name} ---")
+        print(frame.to_string())
@@ -0,0 +1,356 @@
+import hashlib
+import inspect
+import json
+import os
+import re
+import shutil
+import sys
+import numpy as np
+
+try:
+    from dataset_loader import DATASET_PATH, load_dataset
+    from dataset_cleaner import clean_dataset
+    from dataset_cache import cleaning_rules_hash, source_content_hash
+except ImportError:
+    from scripts.dataset_loader import DATASET_PATH, load_dataset
+    from scripts.dataset_cleaner import clean_dataset
+    from scripts.dataset_cache import cleaning_rules_hash, source_content_hash
+
+# Free-text columns indexed for every incident, in field order
+TEXT_COLUMNS = ['summary', 'motive', 'weapdetail']
+
+# Default location of the on-disk index, next to the dataset
+INDEX_DIR = 'Terrorism_Analysis_Project/dataset/text_index'
+MANIFEST_NAME = 'manifest.json'
+
+# Positions of field i start at i * FIELD_POSITION_GAP, so phrases never span two fields
+FIELD_POSITION_GAP = 1 << 20
+
+# Tokens are lowercased runs of letters and digits
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# Query syntax: parentheses, optionally field-qualified "quoted phrases", and other whitespace-separated words
+QUERY_TOKEN_PATTERN = re.compile(r'\(|\)|(?:\w+:)?"[^"]*"|[^\s()]+')
+OPERATORS = ('AND', 'OR', 'NOT')
+
+def tokenize(text):
+    """
+    Returns the lowercased word tokens of a text.
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+def encode_varints(values):
+    """
+    Encodes non-negative integers as LEB128 varints (7 bits per byte, high bit set on all but the last byte).
+
+    Returns the encoded bytes as a uint8 array and the number of bytes of each value.
+    """
+    values = np.asarray(values, dtype='uint64')
+    lengths = np.ones(values.size, dtype='int64')
+    remaining = values >> np.uint64(7)
+    while remaining.any():
+        lengths += remaining > 0
+        remaining >>= np.uint64(7)
+    encoded = np.empty(int(lengths.sum()), dtype='uint8')
+    starts = np.cumsum(lengths) - lengths
+    for k in range(int(lengths.max()) if values.size else 0):
+        has_byte = lengths > k
+        byte = (values[has_byte] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        more = (lengths[has_byte] > k + 1).astype('uint64') << np.uint64(7)
+        encoded[starts[has_byte] + k] = (byte | more).astype('uint8')
+    return encoded, lengths
+
+def decode_varints(encoded):
+    """
+    Decodes a uint8 array of LEB128 varints into an int64 array, without a Python loop over the values.
+    """
+    encoded = np.asarray(encoded, dtype='uint8')
+    if encoded.size == 0:
+        return np.empty(0, dtype='int64')
+    ends = np.flatnonzero(encoded < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    shifts = (np.arange(encoded.size) - np.repeat(starts, ends - starts + 1)) * 7
+    chunks = (encoded & 0x7F).astype('uint64') << shifts.astype('uint64')
+    return np.add.reduceat(chunks, starts).astype('int64')
+
+def _deltas(values, group_starts):
+    # Differences to the previous value, restarting from zero at the start of every group
+    deltas = np.diff(values, prepend=0)
+    deltas[group_starts] = values[group_starts]
+    return deltas
+
+def _undeltas(deltas, lengths):
+    # Inverse of _deltas for consecutive groups of the given lengths
+    totals = np.cumsum(deltas)
+    group_starts = np.cumsum(lengths) - lengths
+    return totals - np.repeat(totals[group_starts] - deltas[group_starts], lengths)
+
+def build_index(data, index_dir=INDEX_DIR, source=None):
+    """
+    Builds the positional inverted index of the text columns of a cleaned frame into index_dir.
+
+    Each term maps to the incidents containing it (as delta-encoded varints of their document numbers,
+    which follow eventid order), how often it occurs in each, and its delta-encoded positions.
+    """
+    data = data.sort_values('eventid', kind='stable')
+    vocabulary = {}
+    terms, documents, positions = [], [], []
+    for document, texts in enumerate(zip(*(data[column].tolist() for column in TEXT_COLUMNS))):
+        for field, text in enumerate(texts):
+            if not isinstance(text, str):
+                continue
+            tokens = tokenize(text)[:FIELD_POSITION_GAP - 1]
+            terms.extend(vocabulary.setdefault(token, len(vocabulary)) for token in tokens)
+            documents.extend([document] * len(tokens))
+            positions.extend(range(field * FIELD_POSITION_GAP, field * FIELD_POSITION_GAP + len(tokens)))
+
+    # Term ids follow the sorted vocabulary, so prefix queries are a range of the lexicon
+    lexicon = np.array(sorted(vocabulary), dtype=str)
+    rank = np.empty(len(vocabulary), dtype='int64')
+    rank[[vocabulary[term] for term in lexicon]] = np.arange(len(vocabulary))
+    terms = rank[np.asarray(terms, dtype='int64')] if terms else np.empty(0, dtype='int64')
+    documents = np.asarray(documents, dtype='int64')
+    positions = np.asarray(positions, dtype='int64')
+    order = np.lexsort((positions, documents, terms))
+    terms, documents, positions = terms[order], documents[order], positions[order]
+
+    # Boundaries of every term and of every (term, document) pair in the sorted occurrences
+    new_term = np.ones(terms.size, dtype=bool)
+    new_term[1:] = terms[1:] != terms[:-1]
+    new_pair = new_term.copy()
+    new_pair[1:] |= documents[1:] != documents[:-1]
+    pair_starts = np.flatnonzero(new_pair)
+    pair_terms = terms[pair_starts]
+    frequencies = np.diff(np.append(pair_starts, terms.size))
+    # Index of each term's first pair and first occurrence; every term has at least one
+    pair_bounds = np.searchsorted(pair_terms, np.arange(len(lexicon) + 1))
+    occurrence_bounds = np.searchsorted(terms, np.arange(len(lexicon) + 1))
+
+    streams = {
+        'documents': (_deltas(documents[pair_starts], pair_bounds[:-1]), pair_bounds),
+        'frequencies': (frequencies, pair_bounds),
+        'positions': (_deltas(positions, pair_starts), occurrence_bounds),
+    }
+    if os.path.exists(index_dir):
+        shutil.rmtree(index_dir)
+    os.makedirs(index_dir)
+    offsets = {}
+    for name, (values, term_starts) in streams.items():
+        encoded, lengths = encode_varints(values)
+        encoded.tofile(os.path.join(index_dir, f'{name}.bin'))
+        # Byte offset of each term's slice of the stream
+        offsets[name] = np.concatenate(([0], np.cumsum(lengths)))[term_starts]
+    np.savez(os.path.join(index_dir, 'lexicon.npz'), terms=lexicon,
+             document_counts=np.diff(pair_bounds),
+             **{f'{name}_offsets': value for name, value in offsets.items()})
+    np.save(os.path.join(index_dir, 'eventids.npy'), data['eventid'].to_numpy().astype('int64'))
+    with open(os.path.join(index_dir, MANIFEST_NAME), 'w') as f:
+        json.dump({'documents': len(data), 'terms': len(lexicon), 'columns': TEXT_COLUMNS, **(source or {})},
+                  f, indent=2, sort_keys=True)
+    return TextIndex(index_dir)
+
+def index_rules_hash():
+    """
+    Returns a digest of the cleaning rules and of this module, so editing either rebuilds the index.
+    """
+    source = inspect.getsource(sys.modules[__name__]) + cleaning_rules_hash()
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+def _mapped_bytes(path):
+    # Zero-length files cannot be memory-mapped
+    return np.memmap(path, dtype='uint8', mode='r') if os.path.getsize(path) else np.empty(0, dtype='uint8')
+
+class TextIndex:
+    """
+    Read-only view of an index built by build_index. The posting streams are memory-mapped, so a query
+    only reads the slices of the terms it names.
+    """
+
+    def __init__(self, index_dir=INDEX_DIR):
+        self.index_dir = index_dir
+        with np.load(os.path.join(index_dir, 'lexicon.npz')) as lexicon:
+            self.terms = lexicon['terms']
+            self.document_counts = lexicon['document_counts']
+            self.offsets = {name: lexicon[f'{name}_offsets'] for name in ('documents', 'frequencies', 'positions')}
+        self.streams = {name: _mapped_bytes(os.path.join(index_dir, f'{name}.bin')) for name in self.offsets}
+        self.eventids = np.load(os.path.join(index_dir, 'eventids.npy'))
+
+    def __len__(self):
+        return self.eventids.size
+
+    def _slice(self, name, term):
+        return decode_varints(self.streams[name][self.offsets[name][term]:self.offsets[name][term + 1]])
+
+    def term_ids(self, word):
+        """
+        Returns the lexicon ids of a word, or of every term starting with it when it ends with '*'.
+        """
+        if word.endswith('*'):
+            prefix = word[:-1].lower()
+            first = np.searchsorted(self.terms, prefix, side='left')
+            last = np.searchsorted(self.terms, prefix + '\U0010FFFF', side='left')
+            return np.arange(first, last)
+        term = word.lower()
+        position = np.searchsorted(self.terms, term)
+        if position < self.terms.size and self.terms[position] == term:
+            return np.array([position])
+        return np.empty(0, dtype='int64')
+
+    def documents(self, term):
+        """
+        Returns the sorted document numbers of a term id.
+        """
+        return np.cumsum(self._slice('documents', term))
+
+    def occurrences(self, term):
+        """
+        Returns the occurrences of a term id as sorted (document << 32 | position) keys.
+        """
+        documents = self.documents(term)
+        frequencies = self._slice('frequencies', term)
+        positions = _undeltas(self._slice('positions', term), frequencies)
+        return (np.repeat(documents, frequencies) << 32) | positions
+
+    def _word_keys(self, word, field):
+        keys = [self.occurrences(term) for term in self.term_ids(word)]
+        keys = np.unique(np.concatenate(keys)) if keys else np.empty(0, dtype='int64')
+        if field is not None:
+            keys = keys[(keys & 0xFFFFFFFF) // FIELD_POSITION_GAP == field]
+        return keys
+
+    def _match(self, text, field=None):
+        # Documents containing a word (or a prefix*), or every word of a phrase in order and adjacent;
+        # a word that tokenizes to several tokens (al-qaida) is matched as a phrase
+        words = tokenize(text)
+        if text.endswith('*') and words:
+            words[-1] += '*'
+        if not words:
+            raise ValueError(f"Nothing to search for in {text!r}")
+        if len(words) == 1 and field is None:
+            documents = [self.documents(term) for term in self.term_ids(words[0])]
+            return np.unique(np.concatenate(documents)) if documents else np.empty(0, dtype='int64')
+        # A phrase matches where word i occurs i positions after the first word
+        keys = self._word_keys(words[0], field)
+        for offset, word in enumerate(words[1:], start=1):
+            keys = np.intersect1d(keys, self._word_keys(word, field) - offset, assume_unique=True)
+        return np.unique(keys >> 32)
+
+    def search(self, query):
+        """
+        Returns the sorted eventids of the incidents matching a query.
+
+        A query combines words, prefixes (bomb*) and "quoted phrases" with AND, OR, NOT and parentheses;
+        words next to each other must all match. Prefix a word or phrase with a text column name
+        (summary:"car bomb", motive:retaliation) to match it in that column only.
+        """
+        return self.eventids[self.search_documents(query)]
+
+    def search_documents(self, query):
+        """
+        Returns the sorted document numbers of the incidents matching a query (see search).
+        """
+        tokens = QUERY_TOKEN_PATTERN.findall(query)
+        if not tokens:
+            raise ValueError("Empty text query.")
+        position = 0
+
+        def peek():
+            return tokens[position] if position < len(tokens) else None
+
+        def advance():
+            nonlocal position
+            position += 1
+            return tokens[position - 1]
+
+        def parse_or():
+            result = parse_and()
+            while peek() == 'OR':
+                advance()
+                result = np.union1d(result, parse_and())
+            return result
+
+        def parse_and():
+            result = parse_not()
+            while peek() is not None and peek() not in ('OR', ')'):
+                if peek() == 'AND':
+                    advance()
+                result = np.intersect1d(result, parse_not(), assume_unique=True)
+            return result
+
+        def parse_not():
+            if peek() == 'NOT':
+                advance()
+                return np.setdiff1d(np.arange(len(self)), parse_not(), assume_unique=True)
+            return parse_atom()
+
+        def parse_atom():
+            token = peek()
+            if token is None or token in OPERATORS or token == ')':
+                raise ValueError(f"Malformed text query {query!r}: unexpected {token or 'end of query'!r}")
+            advance()
+            if token == '(':
+                result = parse_or()
+                if peek() != ')':
+                    raise ValueError(f"Malformed text query {query!r}: missing ')'")
+                advance()
+                return result
+            field = None
+            name, separator, rest = token.partition(':')
+            if separator and name.lower() in TEXT_COLUMNS and rest:
+                field, token = TEXT_COLUMNS.index(name.lower()), rest
+            return self._match(token.strip('"'), field)
+
+        result = parse_or()
+        if peek() is not None:
+            raise ValueError(f"Malformed text query {query!r}: unexpected {peek()!r}")
+        return result
+
+def load_or_build_index(file_path=DATASET_PATH, index_dir=INDEX_DIR):
+    """
+    Returns the text index of the given CSV, rebuilding it when the CSV, the cleaning rules or the
+    indexing code changed. Returns None if the CSV could not be loaded.
+    """
+    if not os.path.exists(file_path):
+        print(f"File not found. Please check the file path: {file_path}")
+        return None
+    source_key = os.path.abspath(file_path)
+    try:
+        with open(os.path.join(index_dir, MANIFEST_NAME), 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        # A missing or corrupt manifest (say, from an interrupted build) only costs a rebuild
+        manifest = {}
+    if not isinstance(manifest, dict):
+        manifest = {}
+    content_hash = source_content_hash(file_path, {source_key: manifest} if manifest.get('path') == source_key else {})
+    rules_hash = index_rules_hash()
+    if manifest.get('sha256') == content_hash and manifest.get('rules') == rules_hash:
+        return TextIndex(index_dir)
+
+    raw_data = load_dataset(file_path)
+    if raw_data is None:
+        return None
+    data = clean_dataset(raw_data, extra_columns=TEXT_COLUMNS)
+    stat = os.stat(file_path)
+    index = build_index(data, index_dir, {
+        'path': source_key,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': content_hash,
+        'rules': rules_hash,
+    })
+    print(f"Text index built over {len(index)} incidents.")
+    return index
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Search the GTD summaries, motives and weapon details.")
+    parser.add_argument('query', help="Query, e.g. '\"car bomb\" AND (market OR bazaar) AND NOT motive:unknown'.")
+    parser.add_argument('--file-path', default=DATASET_PATH, help="Path to the GTD CSV file.")
+    parser.add_argument('--index-dir', default=INDEX_DIR, help="Directory of the text index.")
+    args = parser.parse_args()
+    text_index = load_or_build_index(args.file_path, args.index_dir)
+    if text_index is not None:
+        matches = text_index.search(args.query)
+        print(f"{matches.size} incident(s) match.")
+        print('\n'.join(str(eventid) for eventid in matches[:20]))
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from dataset_loader import DATASET_PATH, load_dataset
+    from dataset_cleaner import clean_dataset
+except ImportError:
+    from scripts.dataset_loader import DATASET_PATH, load_dataset
+    from scripts.dataset_cleaner import clean_dataset
+
+# Date columns the cleaner carries through for the time series; GTD codes an unknown month or day as 0
+DATE_COLUMNS = ['imonth', 'iday']
+
+# Additive measures of the dense index, summed per period
+MEASURES = ['incidents', 'nkill', 'success']
+
+# Ways of placing incidents whose month or day is unknown (or not a real date, such as 31 February)
+UNKNOWN_DATE_POLICIES = ('drop', 'first')
+
+def load_dated_dataset(file_path=DATASET_PATH):
+    """
+    Returns the cleaned dataset with its imonth and iday columns, or None if it could not be loaded.
+    """
+    raw_data = load_dataset(file_path)
+    if raw_data is None:
+        return None
+    return clean_dataset(raw_data, extra_columns=DATE_COLUMNS)
+
+def period_ordinals(data, freq='M', unknown='drop'):
+    """
+    Returns the period ordinal of every incident (months or days since 1970-01-01, as pandas Periods
+    count them) and a mask of the incidents that could be placed.
+
+    With unknown='drop' an incident whose month (or, for daily periods, day) is unknown or invalid is
+    left out; with unknown='first' it is placed on the first month of its year or the first day of its month.
+    """
+    if freq not in ('M', 'D'):
+        raise ValueError(f"freq must be 'M' or 'D', not {freq!r}")
+    if unknown not in UNKNOWN_DATE_POLICIES:
+        raise ValueError(f"unknown must be one of {', '.join(UNKNOWN_DATE_POLICIES)}, not {unknown!r}")
+    year = data['iyear'].to_numpy().astype('int64')
+    month = pd.to_numeric(data['imonth'], errors='coerce').fillna(0).to_numpy().astype('int64')
+    known_month = (month >= 1) & (month <= 12)
+    month = np.where(known_month, month, 1)
+    months = (year - 1970) * 12 + month - 1
+    if freq == 'M':
+        return months, known_month | (unknown == 'first')
+
+    day = pd.to_numeric(data['iday'], errors='coerce').fillna(0).to_numpy().astype('int64')
+    month_start = months.astype('datetime64[M]').astype('datetime64[D]').astype('int64')
+    days_in_month = (months + 1).astype('datetime64[M]').astype('datetime64[D]').astype('int64') - month_start
+    # A day past the end of its month (e.g. 31 February) is as unknown as a day of 0
+    known_day = known_month & (day >= 1) & (day <= days_in_month)
+    days = month_start + np.where(known_day, day, 1) - 1
+    return days, known_day | (unknown == 'first')
+
+def incident_index(data, freq='M', by=None, unknown='drop'):
+    """
+    Returns a dense monthly (freq='M') or daily (freq='D') index of incident, fatality and success counts,
+    with a row for every period from the first to the last incident, including periods without any.
+
+    With by (e.g. 'region_txt') the columns are (measure, group) pairs. The number of incidents left out
+    by unknown='drop' is kept in the frame's attrs['undated'].
+    """
+    ordinals, placed = period_ordinals(data, freq, unknown)
+    ordinals = ordinals[placed]
+    if ordinals.size == 0:
+        raise ValueError("No incident has a known date at this resolution.")
+    first = int(ordinals.min())
+    offsets = ordinals - first
+    periods = int(offsets.max()) + 1
+    weights = {
+        'incidents': None,
+        'nkill': data['nkill'].to_numpy()[placed].astype('float64'),
+        'success': data['success'].to_numpy()[placed].astype('float64'),
+    }
+
+    if by is None:
+        columns = pd.Index(MEASURES)
+        slots, width = offsets, 1
+    else:
+        codes, groups = pd.factorize(data[by].to_numpy()[placed], sort=True)
+        columns = pd.MultiIndex.from_product([MEASURES, groups.astype(str)], names=['measure', by])
+        slots, width = offsets * len(groups) + codes, len(groups)
+    # One bincount per measure fills every period (and group) at once
+    values = np.column_stack([
+        np.bincount(slots, weights=weights[measure], minlength=periods * width).reshape(periods, width)
+        for measure in MEASURES
+    ]).astype('int64')
+
+    index = pd.period_range(pd.Period(ordinal=first, freq=freq), periods=periods, freq=freq, name='period')
+    frame = pd.DataFrame(values, index=index, columns=columns)
+    frame.attrs['undated'] = int((~placed).sum())
+    return frame
+
+def _window_sums(values, window):
+    # Row i of a rolling sum is cumulative[i] - cumulative[i - window]; an expanding sum is the cumulative sum
+    cumulative = np.cumsum(values, axis=0)
+    if window is None:
+        return cumulative
+    sums = cumulative.copy()
+    sums[window:] -= cumulative[:-window]
+    return sums
+
+def window_sums(index, window=None, min_periods=None):
+    """
+    Returns the rolling sums over the last `window` periods of every column of a dense index, or the
+    expanding sums from the first period when window is None.
+
+    Every window length costs one cumulative sum and one subtraction, whatever the number of windows.
+    Windows with fewer than min_periods periods (default: window) are NaN, as with DataFrame.rolling.
+    """
+    values = index.to_numpy()
+    if window is not None and window < 1:
+        raise ValueError("window must be at least 1")
+    # Integer cumulative sums are exact; the result is float so incomplete windows can be NaN
+    sums = pd.DataFrame(_window_sums(values, window).astype('float64'), index=index.index, columns=index.columns)
+    lengths = np.arange(1, len(index) + 1) if window is None else np.minimum(np.arange(1, len(index) + 1), window)
+    if min_periods is None:
+        min_periods = 1 if window is None else window
+    return sums.where(pd.Series(lengths >= min_periods, index=index.index), axis=0)
+
+def window_statistics(index, window=None, min_periods=None):
+    """
+    Returns the rolling (or, with window=None, expanding) sums and per-period means of incidents,
+    fatalities and successes, with the success rate and fatalities per incident of each window.
+
+    Works on a per-group index too, giving every statistic per group.
+    """
+    sums = window_sums(index, window, min_periods)
+    lengths = np.arange(1, len(index) + 1)
+    if window is not None:
+        lengths = np.minimum(lengths, window)
+    means = sums.div(lengths, axis=0)
+    # Windows without incidents have no rate
+    incidents = sums['incidents'].where(sums['incidents'] > 0)
+    parts = {}
+    for measure in MEASURES:
+        parts[f'{measure}_sum'] = sums[measure]
+        parts[f'{measure}_mean'] = means[measure]
+    parts['success_rate'] = sums['success'] / incidents
+    parts['nkill_per_incident'] = sums['nkill'] / incidents
+    return pd.concat(parts, axis=1)
+
+if __name__ == '__main__':
+    dated_data = load_dated_dataset()
+    if dated_data is not None:
+        monthly = incident_index(dated_data, freq='M')
+        print(f"{monthly.attrs['undated']} incident(s) without a known month left out.")
+        print("\n--- 12-month rolling incidents, fatalities and success rate ---")
+        print(window_statistics(monthly, window=12).dropna().tail(24).to_string())
@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from aggregate_cube import rollup
+except ImportError:
+    from scripts.aggregate_cube import rollup
+
+# Years are measured from 1970, as in the global model y = a * e^(b * (t - 1970))
+BASE_YEAR = 1970
+
+# Segmentations fitted by fit_segment_trends: the global trend, each region, each attack type and every combination
+SEGMENTATIONS = [[], ['region_txt'], ['attacktype1_txt'], ['region_txt', 'attacktype1_txt']]
+
+# Label of a dimension a segment is not split on
+ALL_LABEL = 'All'
+
+# Columns of the fit tables, after the segment labels
+FIT_COLUMNS = ['n_years', 'a', 'b', 'growth_rate', 'se_ln_a', 'se_b', 'r', 'p_value']
+
+def fit_log_linear(years, Y, zero_handling='drop'):
+    """
+    Fits y = a * e^(b * (t - 1970)) to every row of Y (segments x years) in one batched least-squares solve.
+
+    zero_handling='drop' leaves years with zero (or missing) fatalities out of a segment's fit, since
+    log(0) is undefined; zero_handling='offset' fits log(y + 1) over every year instead.
+    Segments with fewer than three usable years get NaN parameters. Returns a DataFrame with the
+    number of years fitted, a, b, the yearly growth rate e^b - 1, the standard errors of ln(a) and b,
+    and the Pearson r (with its p-value) of the log-transformed fit.
+    """
+    years = np.asarray(years, dtype='float64')
+    Y = np.atleast_2d(np.asarray(Y, dtype='float64'))
+    if zero_handling == 'drop':
+        usable = np.isfinite(Y) & (Y > 0)
+        log_y = np.log(np.where(usable, Y, 1.0))
+    elif zero_handling == 'offset':
+        usable = np.isfinite(Y) & (Y >= 0)
+        log_y = np.log1p(np.where(usable, Y, 0.0))
+    else:
+        raise ValueError(f"zero_handling must be 'drop' or 'offset', not {zero_handling!r}")
+
+    # Stacked design matrices with the unusable years zeroed out of both sides
+    weights = usable.astype('float64')
+    x = years - BASE_YEAR
+    design = np.stack([np.ones_like(x), x], axis=-1)[None, :, :] * weights[:, :, None]
+    targets = log_y * weights
+    n = usable.sum(axis=1)
+    fitted = n >= 3
+
+    # Solve every segment's least-squares problem through its QR decomposition
+    Q, R = np.linalg.qr(design)
+    # Segments that cannot be fitted get an identity R so the batched solve stays well defined
+    R[~fitted] = np.eye(2)
+    beta = np.linalg.solve(R, np.swapaxes(Q, 1, 2) @ targets[:, :, None])[:, :, 0]
+
+    # Standard errors from sigma^2 * (X^T X)^-1 = sigma^2 * R^-1 R^-T
+    residuals = targets - (design @ beta[:, :, None])[:, :, 0]
+    dof = np.where(fitted, n - 2, 1)
+    sigma2 = (residuals ** 2).sum(axis=1) / dof
+    R_inv = np.linalg.inv(R)
+    covariance = sigma2[:, None, None] * (R_inv @ np.swapaxes(R_inv, 1, 2))
+    standard_errors = np.sqrt(np.diagonal(covariance, axis1=1, axis2=2))
+
+    # Pearson correlation between the normalised year and log(y) over the usable years
+    count = np.where(fitted, n, 1)
+    x_mean = (weights * x).sum(axis=1) / count
+    y_mean = targets.sum(axis=1) / count
+    dx = (x[None, :] - x_mean[:, None]) * weights
+    dy = (log_y - y_mean[:, None]) * weights
+    with np.errstate(invalid='ignore', divide='ignore'):
+        r = (dx * dy).sum(axis=1) / np.sqrt((dx ** 2).sum(axis=1) * (dy ** 2).sum(axis=1))
+        r = np.clip(r, -1.0, 1.0)
+        t_statistic = r * np.sqrt(dof / (1 - r ** 2))
+    from scipy import stats
+    p_value = 2 * stats.t.sf(np.abs(t_statistic), dof)
+
+    fits = pd.DataFrame({
+        'n_years': n,
+        'a': np.exp(beta[:, 0]),
+        'b': beta[:, 1],
+        'growth_rate': np.expm1(beta[:, 1]),
+        'se_ln_a': standard_errors[:, 0],
+        'se_b': standard_errors[:, 1],
+        'r': r,
+        'p_value': p_value,
+    }, columns=FIT_COLUMNS)
+    fits.loc[~fitted, FIT_COLUMNS[1:]] = np.nan
+    return fits
+
+def segment_yearly_fatalities(cube, dimensions, years=None):
+    """
+    Returns the yearly fatality totals of every segment of the given dimensions as a segments x years table.
+
+    Years in which a segment had no incidents count as zero fatalities.
+    """
+    if years is None:
+        years = np.sort(cube['iyear'].unique())
+    totals = rollup(cube, list(dimensions) + ['iyear'])['nkill_sum']
+    if dimensions:
+        table = totals.unstack('iyear')
+    else:
+        table = totals.to_frame().T
+    return table.reindex(columns=years, fill_value=0).fillna(0)
+
+def fit_segment_trends(cube, segmentations=SEGMENTATIONS, zero_handling='drop'):
+    """
+    Fits the exponential trend of yearly fatalities for every segment of every segmentation in one solve.
+
+    Returns one row per segment, labelled by region and attack type ('All' where a segment is not
+    split on that dimension), followed by the fit columns of fit_log_linear.
+    """
+    years = np.sort(cube['iyear'].unique())
+    labels = []
+    tables = []
+    for dimensions in segmentations:
+        table = segment_yearly_fatalities(cube, dimensions, years)
+        keys = pd.DataFrame(ALL_LABEL, index=range(len(table)), columns=['region_txt', 'attacktype1_txt'])
+        for position, dimension in enumerate(dimensions):
+            keys[dimension] = table.index.get_level_values(position) if len(dimensions) > 1 else table.index
+        labels.append(keys)
+        tables.append(table.to_numpy())
+
+    fits = fit_log_linear(years, np.vstack(tables), zero_handling)
+    return pd.concat([pd.concat(labels, ignore_index=True), fits], axis=1)
+
+if __name__ == '__main__':
+    try:
+        from aggregate_cube import load_or_build_cube
+    except ImportError:
+        from scripts.aggregate_cube import load_or_build_cube
+    cube = load_or_build_cube()
+    if cube is not None:
+        trends = fit_segment_trends(cube)
+        print(trends.sort_values('growth_rate', ascending=False).to_string(index=False))